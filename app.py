@@ -1,5 +1,5 @@
 import streamlit as st
-from utils.csv_store import ensure_data_files
+from utils.store import ensure_data_files
 
 
 st.set_page_config(page_title='Banking MVP', page_icon='🏦', layout='centered')
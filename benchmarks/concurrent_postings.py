@@ -0,0 +1,85 @@
+"""
+Concurrent posting throughput benchmark.
+
+N workers (threads or processes) each post K deposits of 1.00 to the same
+account in a throwaway data directory. At the end the account balance, the
+ledger row count and the last balance_after must all equal N * K; any lost
+update shows up as a mismatch.
+
+Usage (from the repo root):  python -m benchmarks.concurrent_postings --workers 8 --postings 50 --mode process
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from utils import csv_store
+
+
+def _post(data_dir: str, account_id: int, postings: int) -> int:
+    csv_store.DATA_DIR = data_dir
+    for _ in range(postings):
+        csv_store.record_transaction(account_id, 'DEPOSIT', 1.0, note='bench')
+    return postings
+
+
+def run(workers: int, postings: int, mode: str = 'thread') -> dict:
+    data_dir = tempfile.mkdtemp(prefix='bank_bench_')
+    try:
+        csv_store.DATA_DIR = data_dir
+        csv_store.ensure_data_files()
+        cid = csv_store.create_customer('Bench Customer')
+        account_id = int(csv_store.create_account(cid, 'SAVINGS', 0.0)['account_id'])
+
+        t0 = time.perf_counter()
+        if mode == 'process':
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                list(ex.map(_post, [data_dir] * workers, [account_id] * workers, [postings] * workers))
+        else:
+            threads = [threading.Thread(target=_post, args=(data_dir, account_id, postings)) for _ in range(workers)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        elapsed = time.perf_counter() - t0
+
+        csv_store.clear_cache()
+        expected = float(workers * postings)
+        accounts = csv_store.list_accounts()
+        balance = float(accounts.loc[accounts['account_id'] == account_id, 'balance'].iloc[0])
+        tx = csv_store.transactions_for_account(account_id)
+        last_after = float(tx['balance_after'].max()) if not tx.empty else 0.0
+        ok = balance == expected and len(tx) == workers * postings and last_after == expected
+        return {
+            'mode': mode,
+            'workers': workers,
+            'postings': workers * postings,
+            'seconds': round(elapsed, 3),
+            'postings_per_sec': round(workers * postings / elapsed, 1) if elapsed else None,
+            'balance': balance,
+            'expected': expected,
+            'ledger_rows': len(tx),
+            'no_lost_updates': ok,
+        }
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument('--workers', type=int, default=8)
+    ap.add_argument('--postings', type=int, default=25, help='postings per worker')
+    ap.add_argument('--mode', choices=['thread', 'process'], default='thread')
+    args = ap.parse_args()
+    result = run(args.workers, args.postings, args.mode)
+    for k, v in result.items():
+        print(f'{k:>16}: {v}')
+    sys.exit(0 if result['no_lost_updates'] else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+"""
+Deterministic synthetic data for the banking store.
+
+Writes N customers (each with a login user), M accounts and K ledger rows into
+a data directory. Headers come from the CSV store's default files and every
+table is serialized through utils/schema.py, so the files are exactly what the
+app itself writes. The same (sizes, seed) always produces the same data.
+
+Ledger shape: every account starts with an opening deposit; the remaining
+rows are ~60% deposits / 40% withdrawals spread over a year, with a skewed
+account choice (a few busy accounts, a long tail of quiet ones). Opening
+deposits are sized so that no running balance goes negative, and
+accounts.balance equals the last balance_after of each account.
+
+Usage (from the repo root):  python -m benchmarks.datagen DATA_DIR --customers 500 --accounts 1000 --transactions 100000
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils import auth
+from utils import csv_store
+from utils import schema
+
+PASSWORD = 'bench-pass'
+OFFSET = '+05:30'
+START = pd.Timestamp('2024-01-01T09:00:00')
+CHUNK_ROWS = 1_000_000
+
+
+def _manifest_path(data_dir: str) -> str:
+    return os.path.join(data_dir, 'datagen.json')
+
+
+def _write(data_dir: str, name: str, typed: pd.DataFrame, mode: str = 'w'):
+    raw = schema.to_raw(name, typed)
+    raw.to_csv(os.path.join(data_dir, csv_store.FILES[name]), mode=mode, header=mode == 'w', index=False)
+
+
+def _seq(data_dir: str, name: str, last: int):
+    with open(os.path.join(data_dir, f'{name}.seq'), 'w', encoding='utf-8') as f:
+        f.write(f'{last}\n')
+
+
+def generate(data_dir: str, customers: int, accounts: int, transactions: int, seed: int = 0) -> dict:
+    params = {'customers': customers, 'accounts': accounts, 'transactions': transactions, 'seed': seed}
+    t0 = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    customers, accounts = max(1, customers), max(1, accounts)
+    transactions = max(transactions, accounts)
+
+    os.makedirs(data_dir, exist_ok=True)
+    for name in csv_store.FILES:
+        p = os.path.join(data_dir, csv_store.FILES[name])
+        if os.path.exists(p):
+            os.remove(p)
+    prev, csv_store.DATA_DIR = csv_store.DATA_DIR, data_dir
+    try:
+        csv_store._create_data_files()
+        cols = {name: csv_store._header(csv_store._path(name)) for name in csv_store.FILES}
+    finally:
+        csv_store.DATA_DIR = prev
+
+    year = 365 * 24 * 3600
+
+    # Customers, each with a login user (one shared hash: hashing is not what is measured here)
+    cid = np.arange(1, customers + 1)
+    cust_created = np.sort(rng.integers(0, year // 10, customers))
+    _write(data_dir, 'customers', pd.DataFrame({
+        'customer_id': cid,
+        'full_name': [f'Customer {i}' for i in cid],
+        'email': [f'customer{i}@example.com' for i in cid],
+        'phone': [f'9{i:09d}' for i in cid],
+        'address': [f'{i} Bench Street' for i in cid],
+        'dob': '1990-01-01',
+        'created_at': START + pd.to_timedelta(cust_created, unit='s'),
+        'created_at' + schema.OFFSET: OFFSET,
+    })[cols['customers'] + ['created_at' + schema.OFFSET]])
+    pw = auth.hash_password(PASSWORD)
+    users = pd.DataFrame({
+        'user_id': np.arange(1, customers + 2),
+        'username': ['admin'] + [f'customer{i}' for i in cid],
+        'password': pw,
+        'linked_customer_id': pd.array([pd.NA] + list(cid), dtype='Int64'),
+        'is_active': np.int8(1),
+    })
+    _write(data_dir, 'users', users[cols['users']])
+
+    # Accounts: every customer gets one, the rest are spread randomly
+    aid = np.arange(1, accounts + 1)
+    owner = np.concatenate([cid[:accounts], rng.integers(1, customers + 1, max(0, accounts - customers))])
+    acc_created = np.sort(rng.integers(year // 10, year // 5, accounts))
+
+    # Ledger: openings first (txn ids 1..M), then the activity in time order
+    n = transactions - accounts
+    weights = 1.0 / np.arange(1, accounts + 1) ** 0.8
+    rng.shuffle(weights)
+    act_acc = rng.choice(aid, size=n, p=weights / weights.sum())
+    act_time = np.sort(rng.integers(year // 5, year, n))
+    is_dep = rng.random(n) < 0.6
+    amt = np.where(is_dep, rng.integers(100, 5_000_000, n), rng.integers(100, 2_000_000, n))  # paise
+    signed = np.where(is_dep, amt, -amt)
+
+    activity = pd.DataFrame({'account_id': act_acc, 'signed': signed})
+    running = activity.groupby('account_id')['signed'].cumsum()
+    low = running.groupby(activity['account_id']).min().reindex(aid, fill_value=0).to_numpy()
+    opening = np.maximum(0, -low) + rng.integers(1, 1000, accounts) * 100
+    opening_by_acc = pd.Series(opening, index=aid)
+    after = running.to_numpy() + opening_by_acc.loc[act_acc].to_numpy()
+    closing = pd.Series(after, index=act_acc).groupby(level=0).last().reindex(aid)
+    closing = closing.fillna(opening_by_acc).astype('int64')
+
+    _write(data_dir, 'accounts', pd.DataFrame({
+        'account_id': aid,
+        'customer_id': owner,
+        'account_no': [f'BA-2024-{i:04d}' for i in aid],
+        'account_type': np.where(rng.random(accounts) < 0.7, 'SAVINGS', 'CURRENT'),
+        'balance': closing.to_numpy(),
+        'status': 'ACTIVE',
+        'created_at': START + pd.to_timedelta(acc_created, unit='s'),
+        'created_at' + schema.OFFSET: OFFSET,
+    })[cols['accounts'] + ['created_at' + schema.OFFSET]])
+
+    tx_cols = cols['transactions'] + ['created_at' + schema.OFFSET]
+    _write(data_dir, 'transactions', pd.DataFrame({
+        'txn_id': aid,
+        'account_id': aid,
+        'txn_type': 'DEPOSIT',
+        'amount': opening,
+        'balance_after': opening,
+        'note': 'Opening deposit',
+        'created_at': START + pd.to_timedelta(acc_created, unit='s'),
+        'created_at' + schema.OFFSET: OFFSET,
+    })[tx_cols])
+    for lo in range(0, n, CHUNK_ROWS):
+        hi = min(n, lo + CHUNK_ROWS)
+        _write(data_dir, 'transactions', pd.DataFrame({
+            'txn_id': np.arange(accounts + 1 + lo, accounts + 1 + hi),
+            'account_id': act_acc[lo:hi],
+            'txn_type': np.where(is_dep[lo:hi], 'DEPOSIT', 'WITHDRAW'),
+            'amount': amt[lo:hi],
+            'balance_after': after[lo:hi],
+            'note': np.where(is_dep[lo:hi], 'Salary', 'ATM'),
+            'created_at': START + pd.to_timedelta(act_time[lo:hi], unit='s'),
+            'created_at' + schema.OFFSET: OFFSET,
+        })[tx_cols], mode='a')
+
+    _seq(data_dir, 'customers', customers)
+    _seq(data_dir, 'accounts', accounts)
+    _seq(data_dir, 'transactions', transactions)
+
+    # accounts.csv already holds the closing balances: checkpoint the whole ledger
+    ledger = os.path.join(data_dir, csv_store.FILES['transactions'])
+    prev, csv_store.DATA_DIR = csv_store.DATA_DIR, data_dir
+    try:
+        csv_store._write_ckpt(os.stat(ledger).st_ino, os.path.getsize(ledger))
+    finally:
+        csv_store.DATA_DIR = prev
+    summary = dict(params, users=customers + 1, password=PASSWORD, seconds=round(time.perf_counter() - t0, 2),
+                   ledger_bytes=os.path.getsize(ledger))
+    with open(_manifest_path(data_dir), 'w', encoding='utf-8') as f:
+        json.dump(summary, f)
+    return summary
+
+
+def ensure_generated(data_dir: str, customers: int, accounts: int, transactions: int, seed: int = 0) -> dict:
+    # Reuses an existing dataset in data_dir when it was generated with the same
+    # parameters and nothing has been posted to it since
+    p = _manifest_path(data_dir)
+    ledger = os.path.join(data_dir, csv_store.FILES['transactions'])
+    if os.path.exists(p) and os.path.exists(ledger):
+        with open(p, 'r', encoding='utf-8') as f:
+            m = json.load(f)
+        want = {'customers': customers, 'accounts': accounts, 'transactions': transactions, 'seed': seed,
+                'ledger_bytes': os.path.getsize(ledger)}
+        if all(m.get(k) == v for k, v in want.items()):
+            return m
+    return generate(data_dir, customers, accounts, transactions, seed)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument('data_dir')
+    ap.add_argument('--customers', type=int, default=500)
+    ap.add_argument('--accounts', type=int, default=1000)
+    ap.add_argument('--transactions', type=int, default=100_000)
+    ap.add_argument('--seed', type=int, default=0)
+    args = ap.parse_args()
+    print(json.dumps(generate(args.data_dir, args.customers, args.accounts, args.transactions, args.seed)))
+
+
+if __name__ == '__main__':
+    main()
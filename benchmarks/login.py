@@ -0,0 +1,89 @@
+"""
+Login latency benchmark.
+
+For each user-table size a throwaway data directory gets that many users
+(all sharing one precomputed password hash), then validate_user is timed for
+the first login after a change to users.csv (credential index rebuild) and for
+repeated logins of random existing and unknown users. Warm latency should stay
+flat as the table grows; it is dominated by the configured hash cost
+(BANKING_AUTH_PBKDF2_ITERATIONS).
+
+Usage (from the repo root):  python -m benchmarks.login --sizes 1000 10000 100000 --logins 50
+"""
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+from utils import auth
+from utils import csv_store
+
+
+def _write_users(data_dir: str, n: int, password_hash: str):
+    with open(os.path.join(data_dir, 'users.csv'), 'w', encoding='utf-8') as f:
+        f.write('user_id,username,password,linked_customer_id,is_active\n')
+        for i in range(1, n + 1):
+            f.write(f'{i},user{i},{password_hash},,1\n')
+
+
+def _ms(samples: list) -> dict:
+    samples = sorted(samples)
+    return {
+        'p50_ms': round(statistics.median(samples) * 1000, 2),
+        'p95_ms': round(samples[int(len(samples) * 0.95) - 1 if len(samples) > 1 else 0] * 1000, 2),
+    }
+
+
+def run(size: int, logins: int, password_hash: str) -> dict:
+    data_dir = tempfile.mkdtemp(prefix='bank_login_')
+    try:
+        csv_store.DATA_DIR = data_dir
+        csv_store.clear_cache()
+        csv_store.ensure_data_files()
+        _write_users(data_dir, size, password_hash)
+
+        t0 = time.perf_counter()
+        ok = csv_store.validate_user('user1', 'secret') is not None
+        cold = time.perf_counter() - t0
+
+        hits, misses = [], []
+        for _ in range(logins):
+            name = f'user{random.randint(1, size)}'
+            t0 = time.perf_counter()
+            ok &= csv_store.validate_user(name, 'secret') is not None
+            hits.append(time.perf_counter() - t0)
+            t0 = time.perf_counter()
+            ok &= csv_store.validate_user(name + 'x', 'secret') is None
+            misses.append(time.perf_counter() - t0)
+        return {
+            'users': size,
+            'cold_ms': round(cold * 1000, 2),
+            **{f'hit_{k}': v for k, v in _ms(hits).items()},
+            **{f'miss_{k}': v for k, v in _ms(misses).items()},
+            'ok': ok,
+        }
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    ap.add_argument('--logins', type=int, default=50, help='timed logins per size')
+    ap.add_argument('--iterations', type=int, default=0, help='PBKDF2 iterations (default: config)')
+    args = ap.parse_args()
+    password_hash = auth.hash_password('secret', args.iterations)
+    print(f"hash: {password_hash.split('$')[0]}, {password_hash.split('$')[1]} iterations")
+    print(f"{'users':>8} {'cold_ms':>9} {'hit_p50':>8} {'hit_p95':>8} {'miss_p50':>9} {'miss_p95':>9}")
+    for size in args.sizes:
+        r = run(size, args.logins, password_hash)
+        print(f"{r['users']:>8} {r['cold_ms']:>9} {r['hit_p50_ms']:>8} {r['hit_p95_ms']:>8} "
+              f"{r['miss_p50_ms']:>9} {r['miss_p95_ms']:>9}{'' if r['ok'] else '  FAILED'}")
+
+
+if __name__ == '__main__':
+    main()
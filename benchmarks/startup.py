@@ -0,0 +1,119 @@
+"""
+Startup profile of the Streamlit app.
+
+Each script (app.py and every page) is rendered in a fresh Python process
+through streamlit.testing, logged in as the admin user, against a throwaway
+copy of the app and its data/ directory. For every script it reports:
+
+  first_ms    first render in a new process (module imports, store setup, first run)
+  rerun_ms    a second run of the same script (what every widget interaction costs)
+  imports_ms  time spent importing modules during the first render (python -X importtime)
+  top         the slowest of those imports, by cumulative time
+
+Usage (from the repo root):  python -m benchmarks.startup [--out startup.json] [--top 5]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MARKER = '-- startup profile: harness loaded --'
+
+# Runs inside the child process; argv: script path
+CHILD = f'''
+import json, sys, time, warnings
+warnings.simplefilter('ignore')
+from streamlit.testing.v1 import AppTest
+sys.stderr.write({MARKER!r} + '\\n')
+sys.stderr.flush()
+t0 = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.session_state['user'] = {{'user_id': 1, 'username': 'admin', 'linked_customer_id': None}}
+at.run()
+t1 = time.perf_counter()
+at.run()
+t2 = time.perf_counter()
+print(json.dumps({{'first_ms': round((t1 - t0) * 1000, 1), 'rerun_ms': round((t2 - t1) * 1000, 1),
+                  'errors': [str(e.value)[:200] for e in at.exception]}}))
+'''
+
+
+def scripts(root: str = ROOT) -> list:
+    pages = sorted(f for f in os.listdir(os.path.join(root, 'pages')) if f.endswith('.py'))
+    return ['app.py'] + [os.path.join('pages', f) for f in pages]
+
+
+def _imports(stderr: str, top: int) -> tuple:
+    # (total ms, [(module, cumulative ms)]) for top-level imports after the marker
+    lines = stderr.split(MARKER, 1)[-1].splitlines()
+    found = []
+    for line in lines:
+        if not line.startswith('import time:'):
+            continue
+        parts = line.split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        if name.startswith('  '):
+            continue  # nested import, already inside its parent's cumulative time
+        found.append((name.strip(), int(parts[1]) / 1000))
+    total = round(sum(ms for _, ms in found), 1)
+    return total, [(m, round(ms, 1)) for m, ms in sorted(found, key=lambda x: x[1], reverse=True)[:top]]
+
+
+def profile(script: str, workdir: str, top: int = 5) -> dict:
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', CHILD, script],
+                          cwd=workdir, capture_output=True, text=True)
+    out = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not out:
+        return {'script': script, 'error': proc.stderr.strip().splitlines()[-1:] or ['failed']}
+    result = json.loads(out[-1])
+    result['imports_ms'], result['top'] = _imports(proc.stderr, top)
+    return dict(script=script, **result)
+
+
+def _copy_app(dest: str):
+    # Scripts, utils and data: the profile must not touch the real data/ files
+    for name in ('app.py', 'pages', 'utils', 'data'):
+        src = os.path.join(ROOT, name)
+        if os.path.isdir(src):
+            shutil.copytree(src, os.path.join(dest, name), ignore=shutil.ignore_patterns('__pycache__', '*.lock'))
+        else:
+            shutil.copy2(src, dest)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument('--out', default='', help='also write the results to this JSON file')
+    ap.add_argument('--top', type=int, default=5, help='slowest imports listed per script')
+    args = ap.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bank_startup_')
+    try:
+        _copy_app(workdir)
+        results = []
+        print(f"{'script':<34} {'first ms':>10} {'rerun ms':>10} {'imports ms':>11}  slowest imports")
+        for script in scripts(workdir):
+            r = profile(script, workdir, args.top)
+            results.append(r)
+            if 'error' in r:
+                print(f"{script:<34} failed: {r['error']}")
+                continue
+            top = ', '.join(f'{m} {ms:.0f}' for m, ms in r['top'])
+            print(f"{script:<34} {r['first_ms']:>10.1f} {r['rerun_ms']:>10.1f} {r['imports_ms']:>11.1f}  {top}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f'results written to {args.out}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+"""
+Store benchmark suite.
+
+For each size tier (ledger rows: 1k, 100k, 10m) a synthetic dataset is
+generated with benchmarks.datagen (or reused from --workdir when unchanged),
+then these operations are timed against the CSV store:
+
+  validate_user              cold (users parse + credential index) and warm
+  list_accounts              cold (accounts parse) and warm
+  transactions_for_account   cold (ledger offset index build) and warm, busy and quiet accounts
+  build_statement_pdf        the busiest account, up to --pdf-rows rows
+  record_transaction         single postings (runs last; it appends to the dataset)
+
+Results go to a JSON file (environment, parameters, per-operation timings in
+ms and the utils.metrics counters) so runs can be compared:
+
+  python -m benchmarks.suite --sizes 1k 100k --out before.json
+  python -m benchmarks.suite --sizes 1k 100k --out after.json --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from itertools import islice
+
+import pandas as pd
+
+from benchmarks import datagen
+from utils import csv_store
+from utils import metrics
+from utils.pdf import build_statement_pdf
+
+SIZES = {'1k': 1_000, '100k': 100_000, '10m': 10_000_000}
+
+
+def tier(rows: int) -> dict:
+    accounts = max(10, rows // 100)
+    return {'customers': max(5, accounts // 2), 'accounts': accounts, 'transactions': rows}
+
+
+def _stats(samples: list) -> dict:
+    ms = sorted(s * 1000 for s in samples)
+    return {
+        'n': len(ms),
+        'mean_ms': round(statistics.fmean(ms), 3),
+        'p50_ms': round(ms[len(ms) // 2], 3),
+        'p95_ms': round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 3),
+        'max_ms': round(ms[-1], 3),
+    }
+
+
+def _time(fn, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return _stats(samples)
+
+
+def _once(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return round((time.perf_counter() - t0) * 1000, 3)
+
+
+def run_tier(data_dir: str, rows: int, repeat: int, pdf_rows: int, seed: int = 0) -> dict:
+    gen = datagen.ensure_generated(data_dir, seed=seed, **tier(rows))
+    csv_store.DATA_DIR = data_dir
+    csv_store.clear_cache()
+    metrics.reset()
+    rng = random.Random(seed)
+    accounts = tier(rows)['accounts']
+    customers = tier(rows)['customers']
+    out = {'dataset': gen, 'operations': {}}
+    ops = out['operations']
+
+    user = lambda: f'customer{rng.randint(1, customers)}'
+    ops['validate_user'] = {
+        'cold_ms': _once(lambda: csv_store.validate_user(user(), datagen.PASSWORD)),
+        **_time(lambda: csv_store.validate_user(user(), datagen.PASSWORD), repeat),
+    }
+    ops['list_accounts'] = {'cold_ms': _once(csv_store.list_accounts), **_time(csv_store.list_accounts, repeat)}
+
+    ops['transactions_for_account'] = {'cold_ms': _once(lambda: csv_store.transactions_for_account(1))}
+    metrics.enable(False)  # not part of the measurement
+    counts = {a: len(csv_store.ledger_offsets(a)) for a in range(1, accounts + 1)}
+    metrics.enable()
+    busiest = max(counts, key=counts.get)
+    out['busiest_account_rows'] = counts[busiest]
+    ops['transactions_for_account'].update(
+        busy=_time(lambda: csv_store.transactions_for_account(busiest), repeat),
+        random=_time(lambda: csv_store.transactions_for_account(rng.randint(1, accounts)), repeat),
+    )
+
+    stats = {}
+    ops['build_statement_pdf'] = {
+        'wall_ms': _once(lambda: build_statement_pdf(
+            'Bench Bank', f'BA-2024-{busiest:04d}', 'Customer',
+            islice(csv_store.iter_transactions_for_account(busiest), pdf_rows), stats=stats)),
+        **stats,
+    }
+
+    ops['record_transaction'] = _time(
+        lambda: csv_store.record_transaction(rng.randint(1, accounts), 'DEPOSIT', 1.0, note='bench'), repeat)
+
+    out['metrics'] = metrics.snapshot()
+    return out
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip()
+    except OSError:
+        commit = ''
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def _flatten(results: dict) -> dict:
+    # {(size, operation[.variant]): p50 or wall ms} for comparisons
+    flat = {}
+    for size, r in results['tiers'].items():
+        for op, v in r['operations'].items():
+            for variant, d in ([('', v)] + [(f'.{k}', s) for k, s in v.items() if isinstance(s, dict)]):
+                ms = d.get('p50_ms', d.get('wall_ms'))
+                if ms is not None:
+                    flat[f'{size} {op}{variant}'] = ms
+    return flat
+
+
+def compare(old: dict, new: dict, threshold: float = 1.2) -> list:
+    # Lines for every measurement present in both runs; slower than threshold x is flagged
+    a, b = _flatten(old), _flatten(new)
+    lines = []
+    for key in sorted(a.keys() & b.keys()):
+        ratio = b[key] / a[key] if a[key] else float('inf')
+        flag = '  REGRESSION' if ratio > threshold else ''
+        lines.append(f'{key:<45} {a[key]:>12.3f} {b[key]:>12.3f} {ratio:>7.2f}x{flag}')
+    return lines
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument('--sizes', nargs='+', default=list(SIZES), choices=list(SIZES))
+    ap.add_argument('--repeat', type=int, default=20, help='timed calls per warm measurement')
+    ap.add_argument('--pdf-rows', type=int, default=5000, help='max rows rendered into the statement PDF')
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--workdir', default='', help='keep generated datasets here and reuse them (default: temp dir)')
+    ap.add_argument('--out', default='bench_results.json')
+    ap.add_argument('--compare', default='', help='earlier results JSON to compare p50s against')
+    ap.add_argument('--threshold', type=float, default=1.2, help='slowdown ratio reported as a regression')
+    args = ap.parse_args()
+
+    metrics.enable()
+    workdir = args.workdir or tempfile.mkdtemp(prefix='bank_suite_')
+    results = {'environment': environment(), 'params': vars(args), 'tiers': {}}
+    try:
+        for size in args.sizes:
+            print(f'[{size}] generating / running ...', flush=True)
+            results['tiers'][size] = run_tier(os.path.join(workdir, size), SIZES[size], args.repeat, args.pdf_rows, args.seed)
+            for op, v in results['tiers'][size]['operations'].items():
+                summary = {k: v[k] for k in ('cold_ms', 'p50_ms', 'p95_ms', 'wall_ms', 'ms_per_row') if k in v}
+                print(f'  {op:<26} {summary}')
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, default=str)
+    print(f'results written to {args.out}')
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            old = json.load(f)
+        print(f"{'measurement':<45} {'before ms':>12} {'after ms':>12} {'ratio':>8}")
+        lines = compare(old, results, args.threshold)
+        print('\n'.join(lines))
+        return 1 if any(l.endswith('REGRESSION') for l in lines) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
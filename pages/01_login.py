@@ -17,6 +17,8 @@ Where the data comes from
 - `utils/csv_store.ensure_data_files()` creates the CSV files on first run with a demo user:
   data/users.csv  -> contains: user_id, username, password, linked_customer_id, is_active
   Example demo credentials: username = "admin", password = "admin123"
+- Passwords are stored as salted PBKDF2 hashes (utils/auth.py). Older rows that still hold a
+  plaintext password keep working; hash them with:  python -m utils.auth migrate
 
 Important concepts
 ------------------
@@ -31,13 +33,15 @@ Typical errors & fixes
   -> Always read/write the logged-in user via st.session_state['user'] (never a bare `user` variable).
 - Invalid credentials:
   -> Make sure `data/users.csv` exists (landing page calls ensure_data_files(); this page does too).
-  -> Check the row for "admin, admin123" or add your own user rows.
+  -> Check the row for "admin, admin123" or add your own user rows (then run
+     `python -m utils.auth migrate` to hash their passwords).
 
 Dependencies
 ------------
 - streamlit
 - pandas (transitively used by utils/csv_store)
-- Project file: utils/csv_store.py (provides ensure_data_files, validate_user)
+- Project file: utils/store.py (provides ensure_data_files, validate_user from the configured
+  backend; the default is utils/csv_store.py)
 
 Usage
 -----
@@ -46,7 +50,7 @@ Usage
 """
 
 import streamlit as st
-from utils.csv_store import ensure_data_files, validate_user
+from utils.store import ensure_data_files, validate_user
 
 # Configure Streamlit page (title + icon shown in the browser tab)
 st.set_page_config(page_title='Login', page_icon='🔐')
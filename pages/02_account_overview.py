@@ -1,7 +1,7 @@
 import streamlit as st
-import pandas as pd
-from utils.ui import require_login, logout_button
-from utils.csv_store import ensure_data_files, read_df, accounts_for_customer, get_customer
+from utils.ui import require_login, logout_button, paged
+from utils.store import ensure_data_files, query_page, get_customer
+from utils import directory
 
 
 st.set_page_config(page_title='Account Overview', page_icon='👤')
@@ -17,15 +17,16 @@ user = st.session_state['user']
 
 
 # Select a customer (demo support: either linked customer or pick one)
-customers = read_df('customers')
 if user.get('linked_customer_id'):
     selected_customer_id = str(user['linked_customer_id'])
 else:
+    # One page of customers at a time
+    customers, _ = paged(lambda page, size: query_page('customers', page, size, order_by='full_name'), 'customers_page', page_size=100)
     if customers.empty:
         st.info('No customers yet. Create one from "Create Account" page.')
         st.stop()
-    names = customers[['customer_id','full_name']].astype(str)
-    selected = st.selectbox('Select customer', options=names['customer_id'], format_func=lambda cid: names[names['customer_id']==cid]['full_name'].values[0])
+    labels = directory.customer_labels()
+    selected = st.selectbox('Select customer', options=customers['customer_id'].tolist(), format_func=lambda cid: labels.get(cid, str(cid)))
     selected_customer_id = selected
 
 
@@ -46,11 +47,8 @@ st.write({
 
 
 st.subheader('Accounts')
-acc_df = accounts_for_customer(int(selected_customer_id))
+acc_df, _ = paged(lambda page, size: query_page('accounts', page, size, where={'customer_id': int(selected_customer_id)}), 'accounts_page')
 if acc_df.empty:
     st.info('No accounts for this customer.')
 else:
-# Convert numeric-looking cols
-    if 'balance' in acc_df.columns:
-        acc_df['balance'] = pd.to_numeric(acc_df['balance'], errors='coerce').fillna(0.0)
     st.dataframe(acc_df[['account_no','account_type','balance','status','created_at']])
\ No newline at end of file
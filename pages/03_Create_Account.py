@@ -1,6 +1,7 @@
 import streamlit as st
 from utils.ui import require_login, logout_button
-from utils.csv_store import ensure_data_files, list_customers, create_customer, create_account
+from utils.store import ensure_data_files, create_customer, create_account
+from utils import directory
 
 st.set_page_config(page_title='Create Account', page_icon='➕')
 ensure_data_files()
@@ -16,15 +17,11 @@ with st.form('create_acc_form'):
 
     existing_cid = None
     if mode == 'Existing customer':
-        customers = list_customers()
-        if customers.empty:
+        labels = directory.customer_labels()
+        if labels.empty:
             st.info('No customers found. Switch to **New customer**.')
         else:
-            options = customers['customer_id'].astype(str).tolist()
-            def _label(cid):
-                row = customers[customers['customer_id']==cid].iloc[0]
-                return f"{row['full_name']} (ID {cid})"
-            existing_cid = st.selectbox('Select customer', options=options, format_func=_label)
+            existing_cid = st.selectbox('Select customer', options=labels.index.tolist(), format_func=labels.get)
 
     st.subheader('Customer details')
     full_name = st.text_input('Full name')
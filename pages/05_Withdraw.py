@@ -1,6 +1,7 @@
 import streamlit as st
-from utils.ui import require_login, logout_button
-from utils.csv_store import ensure_data_files, list_accounts, record_transaction
+from utils.ui import require_login, logout_button, account_picker, posting_status
+from utils.store import ensure_data_files
+from utils import directory, posting_queue
 
 st.set_page_config(page_title='Withdraw', page_icon='🏧')
 ensure_data_files()
@@ -9,14 +10,13 @@ require_login()
 st.title('🏧 Withdraw')
 logout_button()
 
-accounts = list_accounts()
-if accounts.empty:
+if not directory.has_accounts():
     st.info('No accounts exist. Create one first.')
     st.stop()
 
-accounts['label'] = accounts.apply(lambda r: f"{r['account_no']} — {r['account_type']} — Balance: ₹{float(r['balance']):.2f}", axis=1)
-selected_label = st.selectbox('Select account', options=accounts['label'])
-row = accounts[accounts['label']==selected_label].iloc[0]
+row = account_picker(directory.search, lambda r: r['balance_label'])
+if row is None:
+    st.stop()
 acc_id = int(row['account_id'])
 current_balance = float(row['balance'])
 
@@ -30,7 +30,9 @@ if st.button('Withdraw'):
         elif amount > current_balance:
             st.error('Insufficient balance.')
         else:
-            txn = record_transaction(acc_id, 'WITHDRAW', float(amount), note=note)
-            st.success(f"Withdrew ₹{amount:.2f}. New balance: ₹{txn['balance_after']:.2f}")
+            # Queued for the posting worker; the outcome is shown below
+            st.session_state['withdraw_ticket'] = posting_queue.submit(acc_id, 'WITHDRAW', float(amount), note=note)
     except Exception as e:
         st.error(f"Withdrawal failed: {e}")
+
+posting_status('withdraw_ticket', lambda txn: f"Withdrew ₹{txn['amount']:.2f}. New balance: ₹{txn['balance_after']:.2f}", 'Withdrawal failed')
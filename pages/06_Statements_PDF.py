@@ -1,9 +1,8 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime
-from utils.ui import require_login, logout_button
-from utils.csv_store import ensure_data_files, list_accounts, list_customers, transactions_for_account
-from utils.pdf import build_statement_pdf
+from utils.ui import require_login, logout_button, account_picker, paged
+from utils.store import ensure_data_files, transactions_page
+from utils import directory, statement_cache
 
 st.set_page_config(page_title='Statements', page_icon='🧾')
 ensure_data_files()
@@ -12,24 +11,17 @@ require_login()
 st.title('🧾 Account Statement')
 logout_button()
 
-accounts = list_accounts()
-customers = list_customers()
-if accounts.empty:
+if not directory.has_accounts():
     st.info('No accounts exist. Create one first.')
     st.stop()
 
-# Build label and map customer name
-def cust_name_for(acc_row):
-    cid = str(acc_row['customer_id'])
-    row = customers[customers['customer_id']==cid]
-    return row.iloc[0]['full_name'] if not row.empty else ''
-
-accounts['label'] = accounts.apply(lambda r: f"{r['account_no']} — {cust_name_for(r)}", axis=1)
-selected_label = st.selectbox('Select account', accounts['label'])
-acc_row = accounts[accounts['label']==selected_label].iloc[0]
+# Labels and customer names come precomputed from the account directory
+acc_row = account_picker(directory.search, lambda r: r['label'])
+if acc_row is None:
+    st.stop()
 acc_id = int(acc_row['account_id'])
 acc_no = acc_row['account_no']
-customer_name = cust_name_for(acc_row)
+customer_name = acc_row['full_name']
 
 col1, col2 = st.columns(2)
 with col1:
@@ -40,8 +32,8 @@ with col2:
 start_iso = start_date.isoformat() if start_date else ''
 end_iso = (datetime.combine(end_date, datetime.max.time()).isoformat() if end_date else '')
 
-# Fetch txns
-tx = transactions_for_account(acc_id, start_iso, end_iso)
+# Fetch one page of txns
+tx, _ = paged(lambda page, size: transactions_page(acc_id, start_iso, end_iso, page, size), 'tx_page')
 if tx.empty:
     st.info('No transactions in the selected period.')
 else:
@@ -54,6 +46,7 @@ if start_iso or end_iso:
     period_str = f"{start_iso or 'beginning'} to {end_iso or 'now'}"
 
 if st.button('Generate PDF'):
-    rows = tx.to_dict(orient='records')
-    pdf_bytes = build_statement_pdf('Streamlit Bank', acc_no, customer_name, rows, period=period_str)
+    # Served from the statement cache unless a posting changed the period since it was rendered
+    pdf_bytes = statement_cache.statement_pdf('Streamlit Bank', acc_id, acc_no, customer_name, start_iso, end_iso,
+                                              period=period_str)
     st.download_button('Download Statement PDF', data=pdf_bytes, file_name=f'statement_{acc_no}.pdf', mime='application/pdf')
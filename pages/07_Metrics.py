@@ -0,0 +1,56 @@
+import pandas as pd
+import streamlit as st
+from utils.ui import require_login, logout_button
+from utils.store import ensure_data_files
+from utils import metrics, posting_queue, statement_cache
+
+st.set_page_config(page_title='Metrics', page_icon='📈')
+ensure_data_files()
+require_login()
+
+st.title('📈 Operation Metrics')
+logout_button()
+
+# Staff only: users linked to a customer record are bank customers
+if st.session_state['user'].get('linked_customer_id'):
+    st.error('This page is for staff users only.')
+    st.stop()
+
+st.caption('Per-process timings of the store operations and PDF rendering (utils/metrics.py). '
+           'Counters start when metrics are enabled and reset when the app restarts.')
+
+col1, col2 = st.columns(2)
+with col1:
+    on = st.toggle('Record metrics', value=metrics.enabled())
+    if on != metrics.enabled():
+        metrics.enable(on)
+with col2:
+    if st.button('Reset'):
+        metrics.reset()
+
+# Backpressure on the Deposit/Withdraw posting queue
+q = posting_queue.stats()
+c1, c2, c3, c4 = st.columns(4)
+c1.metric('Queue depth', f"{q['depth']} / {q['capacity']}", help=f"Deepest so far: {q['max_depth']}")
+c2.metric('Oldest waiting (ms)', q['oldest_wait_ms'])
+c3.metric('Posted / failed', f"{q['completed']} / {q['failed']}")
+c4.metric('Rejected (queue full)', q['rejected'])
+
+# Rendered statement PDFs served without touching the ledger
+s = statement_cache.stats()
+c1, c2, c3, c4 = st.columns(4)
+c1.metric('Statement cache hits', s['hits'] + s['disk_hits'], help=f"Memory: {s['hits']}, disk: {s['disk_hits']}")
+c2.metric('Statement cache misses', s['misses'])
+c3.metric('Statement hit rate', f"{s['hit_rate']:.0%}")
+c4.metric('Statements in memory', s['entries'], help=f"{s['bytes'] / 1048576:.1f} of {s['max_bytes'] / 1048576:.0f} MB")
+
+rows = metrics.snapshot()
+if not rows:
+    st.info('No operations recorded yet. Enable recording (or set BANKING_METRICS=1) and use the app.')
+    st.stop()
+
+df = pd.DataFrame(rows)
+st.dataframe(df, use_container_width=True, hide_index=True)
+
+st.subheader('p95 latency by operation (ms)')
+st.bar_chart(df.set_index('operation')['p95_ms'])
@@ -0,0 +1,82 @@
+import streamlit as st
+from utils.ui import require_login, logout_button, account_picker
+from utils.store import ensure_data_files, accounts_for_customer
+from utils import analytics, directory
+
+st.set_page_config(page_title='Analytics', page_icon='📊')
+ensure_data_files()
+require_login()
+
+st.title('📊 Analytics')
+logout_button()
+
+st.caption('Daily balances and monthly flows come from precomputed rollups (utils/analytics.py); '
+           'raw transactions are not read.')
+
+user = st.session_state['user']
+
+# Customers see their own accounts; staff pick an account and may widen to its customer
+if user.get('linked_customer_id'):
+    customer_id = int(user['linked_customer_id'])
+    mine = accounts_for_customer(customer_id)
+    if mine.empty:
+        st.info('No accounts yet.')
+        st.stop()
+    options = ['All my accounts'] + mine['account_no'].tolist()
+    choice = st.selectbox('Accounts', options)
+    account_ids = mine['account_id'].tolist() if choice == options[0] else \
+        mine.loc[mine['account_no'] == choice, 'account_id'].tolist()
+    title = choice
+else:
+    if not directory.has_accounts():
+        st.info('No accounts exist. Create one first.')
+        st.stop()
+    row = account_picker(directory.search, lambda r: r['label'])
+    if row is None:
+        st.stop()
+    if st.toggle("All of this customer's accounts"):
+        account_ids = accounts_for_customer(int(row['customer_id']))['account_id'].tolist()
+        title = row['full_name'] or f"Customer {row['customer_id']}"
+    else:
+        account_ids = [int(row['account_id'])]
+        title = row['label']
+
+daily = analytics.daily_balances(account_ids)
+if daily.empty:
+    st.info('No postings yet.')
+    st.stop()
+
+st.subheader(title)
+last = daily.iloc[-1]
+c1, c2, c3 = st.columns(3)
+c1.metric('Closing balance (₹)', f"{last['closing_balance']:,.2f}")
+c2.metric('Postings', int(daily['txns'].sum()))
+c3.metric('Active days', int((daily['txns'] > 0).sum()))
+
+st.markdown('**Daily closing balance (₹)**')
+st.line_chart(daily['closing_balance'])
+
+flows = analytics.monthly_flows(account_ids)
+st.markdown('**Monthly deposits and withdrawals (₹)**')
+st.bar_chart(flows[['deposits', 'withdrawals']])
+st.dataframe(flows, use_container_width=True)
+
+# Staff only: who moved the most money this month
+if not user.get('linked_customer_id'):
+    st.subheader('Top movers')
+    months = analytics.months()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        month = st.selectbox('Month', months)
+    with col2:
+        per = st.radio('Per', ['account', 'customer'], horizontal=True)
+    with col3:
+        by = st.radio('Rank by', ['net', 'volume'], horizontal=True)
+    movers = analytics.top_movers(month, by=by, per=per)
+    if per == 'account':
+        labels = directory.account_labels(movers['account_id'])
+        movers.insert(1, 'account', movers['account_id'].map(labels))
+    else:
+        labels = directory.customer_labels()
+        movers.insert(1, 'customer', movers['customer_id'].map(labels))
+    st.dataframe(movers, use_container_width=True, hide_index=True)
@@ -0,0 +1,238 @@
+import json
+import os
+import sys
+import threading
+import time
+import numpy as np
+import pandas as pd
+from utils import fileio
+from utils import metrics
+from utils import schema
+from utils import store
+
+
+# Account analytics from precomputed rollups: per account per day and per
+# account per month, each with deposits, withdrawals, txns (money in paise)
+# and the closing balance. The rollups follow the ledger incrementally: every
+# query first folds in the rows appended since the last one (store.ledger_since),
+# so postings show up on the next view without rescanning the ledger. They are
+# saved to data/rollups_<backend>.npz and rebuilt from the raw ledger in one
+# vectorized pass when missing or when the ledger was replaced.
+#
+#   analytics.account_daily(account_id)      daily closing balance and flows
+#   analytics.customer_daily(customer_id)    the same, summed over the customer's accounts
+#   analytics.daily_balances(account_ids)    the same, summed over any accounts
+#   analytics.monthly_flows(account_ids)     deposits / withdrawals / net per month
+#   analytics.top_movers(month, by='net')    accounts (or customers) ranked for a month
+#
+# Rebuild by hand:  python -m utils.analytics rebuild
+
+
+SUMS = ('deposits', 'withdrawals', 'txns')
+COLUMNS = SUMS + ('closing',)
+SAVE_EVERY_ROWS = 10_000  # persist after folding in this many new ledger rows
+
+_lock = threading.Lock()
+_state = {'path': None, 'cursor': None, 'daily': None, 'monthly': None, 'unsaved': 0}
+
+
+def _empty(period: str) -> pd.DataFrame:
+    index = pd.MultiIndex.from_arrays([np.zeros(0, np.int64)] * 2, names=['account_id', period])
+    return pd.DataFrame({c: np.zeros(0, np.int64) for c in COLUMNS}, index=index)
+
+
+def _rollup(tx: pd.DataFrame) -> tuple:
+    # (daily, monthly) aggregates of typed ledger rows, in ledger order
+    if tx.empty:
+        return _empty('day'), _empty('month')
+    ts = tx['created_at']
+    day = (ts.dt.year * 10000 + ts.dt.month * 100 + ts.dt.day).fillna(0).astype('int64').to_numpy()
+    ttype = tx['txn_type'].astype(str).to_numpy()
+    amount = tx['amount'].to_numpy()
+    frame = pd.DataFrame({
+        'account_id': tx['account_id'].to_numpy(),
+        'day': day,
+        'month': day // 100,
+        'deposits': np.where(ttype == 'DEPOSIT', amount, 0),
+        'withdrawals': np.where(ttype == 'WITHDRAW', amount, 0),
+        'txns': np.ones(len(tx), np.int64),
+        'closing': tx['balance_after'].to_numpy(),
+    })
+    agg = {'deposits': 'sum', 'withdrawals': 'sum', 'txns': 'sum', 'closing': 'last'}
+    daily = frame.groupby(['account_id', 'day'], sort=False)[list(COLUMNS)].agg(agg)
+    monthly = frame.groupby(['account_id', 'month'], sort=False)[list(COLUMNS)].agg(agg)
+    return daily, monthly
+
+
+def _merge(old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    # Buckets present in both add their sums and take the newer closing balance
+    if old.empty:
+        return new
+    overlap = old.index.intersection(new.index)
+    if len(overlap):
+        both = new.loc[overlap].copy()
+        both[list(SUMS)] += old.loc[overlap, list(SUMS)].to_numpy()
+        new = pd.concat([new.drop(overlap), both])
+        old = old.drop(overlap)
+    return pd.concat([old, new])
+
+
+def _rollup_path() -> str:
+    name = store.backend.__name__.rsplit('.', 1)[-1]
+    return os.path.join(fileio.data_dir(), f'rollups_{name}.npz')
+
+
+def _save():
+    arrays = {'cursor': np.array(json.dumps(_state['cursor']))}
+    for period in ('daily', 'monthly'):
+        df = _state[period].reset_index()
+        for col in df.columns:
+            arrays[f'{period}.{col}'] = df[col].to_numpy(dtype=np.int64)
+    started, error = time.perf_counter(), False
+    try:
+        fileio.atomic_write(_state['path'], lambda f: np.savez(f, **arrays), binary=True)
+        _state['unsaved'] = 0
+    except OSError:
+        error = True  # rebuilt or caught up again on the next start; counted as an analytics.save error
+    metrics.observe('analytics.save', (time.perf_counter() - started) * 1000, error=error)
+
+
+def _load(path: str) -> bool:
+    try:
+        with np.load(path, allow_pickle=False) as z:
+            saved = {k: z[k] for k in z.files}
+        cursor = json.loads(str(saved['cursor']))
+        frames = {}
+        for period, key in (('daily', 'day'), ('monthly', 'month')):
+            df = pd.DataFrame({c: saved[f'{period}.{c}'] for c in ('account_id', key) + COLUMNS})
+            frames[period] = df.set_index(['account_id', key])
+    except (OSError, ValueError, KeyError):
+        return False
+    _state.update(cursor=cursor, unsaved=0, **frames)
+    return True
+
+
+def refresh() -> tuple:
+    # (daily, monthly) rollups, caught up with the ledger; treat as read-only
+    with _lock:
+        path = _rollup_path()
+        if _state['path'] != path:
+            _state.update(path=path, cursor=None, daily=_empty('day'), monthly=_empty('month'), unsaved=0)
+            _load(path)
+        tx, cursor, full = store.ledger_since(_state['cursor'])
+        if full or len(tx):
+            daily, monthly = _rollup(tx)
+            if not full:
+                daily, monthly = _merge(_state['daily'], daily), _merge(_state['monthly'], monthly)
+            _state.update(daily=daily, monthly=monthly, unsaved=_state['unsaved'] + len(tx))
+        _state['cursor'] = cursor
+        if full or _state['unsaved'] >= SAVE_EVERY_ROWS:
+            _save()
+        return _state['daily'], _state['monthly']
+
+
+def rebuild() -> int:
+    # Drops the saved rollups and rebuilds them from the raw ledger; returns the day buckets
+    with _lock:
+        _state.update(path=None)
+        if os.path.exists(_rollup_path()):
+            os.remove(_rollup_path())
+    return len(refresh()[0])
+
+
+# ---------- Queries (rollups only; money in rupees) ----------
+
+
+def _rows(rollup: pd.DataFrame, account_ids) -> pd.DataFrame:
+    ids = rollup.index.get_level_values('account_id')
+    return rollup[ids.isin([int(a) for a in account_ids])].reset_index()
+
+
+def _day_range(days: pd.Series, start: str, end: str) -> pd.DatetimeIndex:
+    first = pd.Timestamp(start) if start else pd.to_datetime(str(days.min()), format='%Y%m%d')
+    last = pd.Timestamp(end) if end else pd.to_datetime(str(days.max()), format='%Y%m%d')
+    return pd.date_range(first.normalize(), last.normalize(), freq='D', name='date')
+
+
+def daily_balances(account_ids, start: str = '', end: str = '') -> pd.DataFrame:
+    # One row per calendar day (index 'date'): closing_balance, deposits,
+    # withdrawals, txns, summed over account_ids
+    daily, _ = refresh()
+    d = _rows(daily, account_ids)
+    if d.empty:
+        return pd.DataFrame(columns=['closing_balance'] + list(SUMS), index=pd.DatetimeIndex([], name='date'))
+    d['date'] = pd.to_datetime(d['day'].astype(str), format='%Y%m%d', errors='coerce')
+    d = d.dropna(subset=['date'])
+    dates = _day_range(d['day'], start, end)
+    # Closing balance carries forward over days without postings; 0 before an account's first posting
+    closing = d.pivot_table(index='date', columns='account_id', values='closing', aggfunc='last').sort_index().ffill()
+    closing = closing.reindex(closing.index.union(dates)).ffill().reindex(dates).fillna(0)
+    flows = d.groupby('date')[list(SUMS)].sum().reindex(dates, fill_value=0)
+    out = pd.DataFrame({'closing_balance': closing.sum(axis=1).map(schema.rupees)}, index=dates)
+    out['deposits'] = flows['deposits'].map(schema.rupees)
+    out['withdrawals'] = flows['withdrawals'].map(schema.rupees)
+    out['txns'] = flows['txns'].astype('int64')
+    return out
+
+
+def account_daily(account_id: int, start: str = '', end: str = '') -> pd.DataFrame:
+    return daily_balances([account_id], start, end)
+
+
+def customer_daily(customer_id: int, start: str = '', end: str = '') -> pd.DataFrame:
+    return daily_balances(store.accounts_for_customer(customer_id)['account_id'].tolist(), start, end)
+
+
+def monthly_flows(account_ids) -> pd.DataFrame:
+    # One row per month ('YYYY-MM'): deposits, withdrawals, net, txns, summed over account_ids
+    _, monthly = refresh()
+    m = _rows(monthly, account_ids)
+    out = m.groupby('month')[list(SUMS)].sum().sort_index()
+    out.index = [f'{v // 100:04d}-{v % 100:02d}' for v in out.index]
+    out.index.name = 'month'
+    for col in ('deposits', 'withdrawals'):
+        out[col] = out[col].map(schema.rupees)
+    out.insert(2, 'net', out['deposits'] - out['withdrawals'])
+    return out
+
+
+def months() -> list:
+    # Months with any postings, newest first ('YYYY-MM')
+    _, monthly = refresh()
+    values = np.unique(monthly.index.get_level_values('month'))[::-1]
+    return [f'{v // 100:04d}-{v % 100:02d}' for v in values if v]
+
+
+def top_movers(month: str = '', by: str = 'net', limit: int = 10, per: str = 'account') -> pd.DataFrame:
+    # Accounts (per='account') or customers (per='customer') ranked by |net| or
+    # by volume (deposits + withdrawals) in month ('YYYY-MM', default latest)
+    _, monthly = refresh()
+    month = month or (months() or [''])[0]
+    if not month:
+        return pd.DataFrame(columns=['deposits', 'withdrawals', 'net', 'txns'])
+    key = int(month.replace('-', ''))
+    m = monthly[monthly.index.get_level_values('month') == key].reset_index()
+    if per == 'customer':
+        owners = store.list_accounts().set_index('account_id')['customer_id']
+        m['customer_id'] = m['account_id'].map(owners)
+        m = m.dropna(subset=['customer_id']).groupby('customer_id')[list(SUMS)].sum().reset_index()
+    m['net'] = m['deposits'] - m['withdrawals']
+    score = m['net'].abs() if by == 'net' else m['deposits'] + m['withdrawals']
+    m = m.loc[score.sort_values(ascending=False, kind='stable').index[:int(limit)]]
+    for col in ('deposits', 'withdrawals', 'net'):
+        m[col] = m[col].map(schema.rupees)
+    return m[[m.columns[0], 'deposits', 'withdrawals', 'net', 'txns']].reset_index(drop=True)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] != ['rebuild']:
+        print('usage: python -m utils.analytics rebuild')
+        return 2
+    store.ensure_data_files()
+    print(f'rebuilt {rebuild()} daily bucket(s) into {_rollup_path()}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+import base64
+import hashlib
+import hmac
+import os
+import sys
+import threading
+from utils import config
+
+
+# Salted password hashes for users.csv / the users table. Stored form:
+#
+#   pbkdf2_sha256$<iterations>$<salt b64>$<hash b64>
+#
+# Rows that still hold a plaintext password keep working until migrated:
+#
+#   python -m utils.auth migrate
+
+
+ALGORITHM = 'pbkdf2_sha256'
+
+_hash_slots = threading.BoundedSemaphore(max(1, config.AUTH_MAX_CONCURRENT_HASHES))
+
+
+def _b64(b: bytes) -> str:
+    return base64.b64encode(b).decode('ascii')
+
+
+def _pbkdf2(password: str, salt: bytes, iterations: int) -> bytes:
+    with _hash_slots:
+        return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, iterations)
+
+
+def hash_password(password: str, iterations: int = 0) -> str:
+    iterations = iterations or config.AUTH_PBKDF2_ITERATIONS
+    salt = os.urandom(16)
+    return f'{ALGORITHM}${iterations}${_b64(salt)}${_b64(_pbkdf2(password, salt, iterations))}'
+
+
+def is_hashed(stored: str) -> bool:
+    return str(stored).startswith(ALGORITHM + '$')
+
+
+# Verified against when the username is unknown, so a miss costs the same as a wrong password
+_DUMMY = None
+
+
+def verify_password(password: str, stored) -> bool:
+    global _DUMMY
+    if stored is None:
+        if _DUMMY is None:
+            _DUMMY = hash_password('')
+        verify_password(password, _DUMMY)
+        return False
+    stored = str(stored)
+    if not is_hashed(stored):
+        return hmac.compare_digest(stored.encode('utf-8'), str(password).encode('utf-8'))
+    try:
+        _, iterations, salt, expected = stored.split('$')
+        digest = _pbkdf2(str(password), base64.b64decode(salt), int(iterations))
+    except ValueError:
+        return False
+    return hmac.compare_digest(digest, base64.b64decode(expected))
+
+
+def migrate_users() -> int:
+    # Hashes every plaintext password in the configured store; returns the count
+    from utils import store
+    store.ensure_data_files()
+    users = store.read_df('users').copy()
+    plain = ~users['password'].map(is_hashed)
+    if not plain.any():
+        return 0
+    users.loc[plain, 'password'] = users.loc[plain, 'password'].map(hash_password)
+    store.write_df('users', users)
+    return int(plain.sum())
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] != ['migrate']:
+        print('usage: python -m utils.auth migrate')
+        return 2
+    print(f'hashed {migrate_users()} plaintext password(s)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
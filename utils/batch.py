@@ -0,0 +1,112 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+
+# Batch postings (salary runs, end-of-day files). The storage backends use
+# load_postings/plan_postings to validate a whole batch with vectorized
+# checks and compute every running balance in one grouped pass, then commit
+# the accepted rows in a single write.
+
+
+TXN_TYPES = ('DEPOSIT', 'WITHDRAW')
+REQUIRED = ('account_id', 'txn_type', 'amount')
+
+
+def load_postings(postings) -> pd.DataFrame:
+    # postings: DataFrame, iterable of dicts, or a path to a .csv/.parquet file
+    if isinstance(postings, pd.DataFrame):
+        df = postings.copy()
+    elif isinstance(postings, (str, os.PathLike)):
+        path = os.fspath(postings)
+        if path.lower().endswith(('.parquet', '.pq')):
+            df = pd.read_parquet(path)
+        else:
+            df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    else:
+        df = pd.DataFrame(list(postings))
+    missing = [c for c in REQUIRED if c not in df.columns]
+    if missing and not df.empty:
+        raise ValueError(f"Postings are missing column(s): {', '.join(missing)}")
+    for c in REQUIRED + ('note',):
+        if c not in df.columns:
+            df[c] = ''
+    return df.reset_index(drop=True)
+
+
+def plan_postings(postings: pd.DataFrame, balances: dict) -> pd.DataFrame:
+    # balances: {account_id (int): current balance in paise}. Returns one report
+    # row per posting with status ACCEPTED/REJECTED, reason and balance_after
+    # (rupees). Running balances are summed in integer paise.
+    aid = pd.to_numeric(postings['account_id'], errors='coerce')
+    ttype = postings['txn_type'].astype(str).str.strip().str.upper()
+    amount = pd.to_numeric(postings['amount'], errors='coerce')
+
+    reason = pd.Series('', index=postings.index, dtype=object)
+    reason[amount.isna() | ~(amount > 0)] = 'Invalid amount'
+    reason[~ttype.isin(TXN_TYPES)] = 'Invalid txn_type'
+    reason[aid.isna() | ~aid.isin(list(balances))] = 'Account not found'
+
+    report = pd.DataFrame({
+        'row': np.arange(len(postings)),
+        'account_id': aid.astype('Int64'),
+        'txn_type': ttype,
+        'amount': amount,
+        'note': postings['note'].fillna('').astype(str),
+        'status': 'ACCEPTED',
+        'reason': reason,
+        'balance_after': np.nan,
+    })
+
+    ok = report[report['reason'] == '']
+    cents = (ok['amount'] * 100).round().astype('int64')
+    report.loc[ok.index, 'amount'] = cents / 100
+    signed = cents.where(ok['txn_type'] == 'DEPOSIT', -cents)
+    opening = ok['account_id'].map(balances).astype('int64')
+    running = opening + signed.groupby(ok['account_id']).cumsum()
+    report.loc[ok.index, 'balance_after'] = running / 100
+
+    # A rejected withdrawal changes every later balance of that account, so
+    # only accounts that would go negative are replayed row by row.
+    overdrawn = set(ok.loc[running < 0, 'account_id'])
+    for acc in overdrawn:
+        bal = int(balances[acc])
+        for i in ok.index[ok['account_id'] == acc]:
+            delta = int(signed.at[i])
+            if bal + delta < 0:
+                report.at[i, 'reason'] = 'Insufficient balance'
+                report.at[i, 'balance_after'] = np.nan
+            else:
+                bal += delta
+                report.at[i, 'balance_after'] = bal / 100
+
+    report.loc[report['reason'] != '', 'status'] = 'REJECTED'
+    return report
+
+
+def final_balances(report: pd.DataFrame) -> dict:
+    # {account_id: closing balance in paise} over the accepted rows
+    acc = report[report['status'] == 'ACCEPTED']
+    last = acc.groupby('account_id')['balance_after'].last()
+    return (last * 100).round().astype('int64').to_dict()
+
+
+def main(argv=None):
+    # python -m utils.batch postings.csv [report.csv]
+    from utils import store
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print('usage: python -m utils.batch POSTINGS.csv|.parquet [REPORT.csv]')
+        return 2
+    store.ensure_data_files()
+    report = store.record_transactions_batch(argv[0])
+    accepted = int((report['status'] == 'ACCEPTED').sum())
+    print(f'accepted: {accepted}  rejected: {len(report) - accepted}')
+    if len(argv) > 1:
+        report.to_csv(argv[1], index=False)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
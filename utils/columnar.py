@@ -0,0 +1,180 @@
+import json
+import os
+import shutil
+import sys
+import pandas as pd
+from utils import csv_store
+from utils import schema
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.feather as feather
+except ImportError:  # optional: pip install pyarrow
+    pa = ds = feather = None
+
+
+# Optional columnar mirror of the CSV tables (BANKING_TABLE_FORMAT=arrow).
+#
+#   data/columnar/<table>.feather           users, customers, accounts (Arrow IPC, memory-mapped)
+#   data/columnar/transactions/account_id=<id>/month=<YYYY-MM>/*.parquet
+#   data/columnar/manifest.json             what the mirror covers
+#
+# The CSV files stay the source of truth. A small table is read from the
+# mirror only while its CSV is unchanged since conversion. The ledger is
+# append-only, so its mirror never goes stale: reads prune partitions by
+# account and month, push the period down as a row filter, and add the CSV
+# rows appended after conversion through the ledger offset index.
+#
+#   python -m utils.columnar convert
+
+
+SMALL_TABLES = ('users', 'customers', 'accounts')
+MAX_OPEN_FILES = 512  # parquet files the converter keeps open at once
+MONTH_PARTITIONING = ds.partitioning(pa.schema([('month', pa.string())]), flavor='hive') if ds else None
+
+
+def available() -> bool:
+    return pa is not None
+
+
+def mirror_dir() -> str:
+    return os.path.join(csv_store.DATA_DIR, 'columnar')
+
+
+def _manifest_path() -> str:
+    return os.path.join(mirror_dir(), 'manifest.json')
+
+
+def load_manifest():
+    p = _manifest_path()
+    if not os.path.exists(p):
+        return None
+    with open(p, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _source_sig(name: str) -> list:
+    st = os.stat(csv_store._path(name))
+    return [st.st_mtime_ns, st.st_size, st.st_ino]
+
+
+# ---------- Conversion ----------
+
+
+def convert_from_csv() -> dict:
+    if not available():
+        raise RuntimeError('pyarrow is required for the columnar format (pip install pyarrow)')
+    csv_store.ensure_data_files()
+    target = mirror_dir()
+    tmp = target + '.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    # Hold the writer locks so the snapshot and the recorded ledger position agree
+    with csv_store.locked(*csv_store.FILES):
+        sources = {}
+        for name in SMALL_TABLES:
+            df = csv_store.read_df(name)
+            feather.write_feather(df, os.path.join(tmp, f'{name}.feather'), compression='uncompressed')
+            sources[name] = _source_sig(name)
+
+        tx = csv_store.read_df('transactions')
+        ledger_sig = _source_sig('transactions')
+        if not tx.empty:
+            tx = tx.assign(month=tx['created_at'].dt.strftime('%Y-%m').fillna('unknown'))
+            # One partition per account and month. Rows are grouped by partition
+            # first, so each partition's file is written in one go even when
+            # the writer has to close files to stay under max_open_files.
+            tx = tx.sort_values(['account_id', 'month'], kind='stable')
+            partitions = int(tx.groupby(['account_id', 'month'], sort=False).ngroups)
+            ds.write_dataset(
+                pa.Table.from_pandas(tx, preserve_index=False),
+                os.path.join(tmp, 'transactions'),
+                format='parquet',
+                partitioning=ds.partitioning(pa.schema([('account_id', pa.int64()), ('month', pa.string())]), flavor='hive'),
+                existing_data_behavior='overwrite_or_ignore',
+                max_partitions=max(1024, partitions),
+                max_open_files=min(max(1, partitions), MAX_OPEN_FILES),
+            )
+        manifest = {
+            'sources': sources,
+            'ledger_ino': ledger_sig[2],
+            'ledger_size': ledger_sig[1],
+            'txn_hwm': int(tx['txn_id'].max()) if not tx.empty else 0,
+            'rows': int(len(tx)),
+        }
+        with open(os.path.join(tmp, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(tmp, target)
+    return manifest
+
+
+# ---------- Reads ----------
+
+
+def read_table(name: str):
+    # Typed frame from the memory-mapped mirror, or None if missing/stale
+    if not available() or name not in SMALL_TABLES:
+        return None
+    manifest = load_manifest()
+    if not manifest or manifest['sources'].get(name) != _source_sig(name):
+        return None
+    with pa.memory_map(os.path.join(mirror_dir(), f'{name}.feather'), 'r') as source:
+        return pa.ipc.open_file(source).read_all().to_pandas()
+
+
+def transactions_for_account(account_id: int, start_iso: str = '', end_iso: str = ''):
+    # Typed ledger rows of one account (unsorted, not period-trimmed beyond
+    # what the filter pushdown removes), or None if the mirror cannot be used
+    if not available():
+        return None
+    manifest = load_manifest()
+    p = csv_store._path('transactions')
+    if not manifest or not os.path.exists(p) or os.stat(p).st_ino != manifest['ledger_ino']:
+        return None
+
+    parts = []
+    root = os.path.join(mirror_dir(), 'transactions')
+    acc_dir = os.path.join(root, f'account_id={int(account_id)}')
+    if os.path.isdir(acc_dir):
+        # Only this account's directory is discovered; its month partitions are pruned by the filter
+        start, end = csv_store.period_key(start_iso), csv_store.period_key(end_iso)
+        flt = None
+        if start:
+            flt = (ds.field('month') >= start[:7]) & (ds.field('created_at') >= pd.Timestamp(start))
+        if end:
+            upto = (ds.field('month') <= end[:7]) & (ds.field('created_at') <= pd.Timestamp(end))
+            flt = upto if flt is None else flt & upto
+        dataset = ds.dataset(acc_dir, format='parquet', partitioning=MONTH_PARTITIONING)
+        cols = [c for c in dataset.schema.names if c != 'month']
+        tx = dataset.to_table(columns=cols, filter=flt).to_pandas()
+        tx.insert(0, 'account_id', int(account_id))
+        parts.append(tx)
+
+    # Rows appended to the CSV after the conversion
+    tail = [off for off in csv_store.ledger_offsets(account_id) if off >= manifest['ledger_size']]
+    if tail:
+        parts.append(csv_store.read_ledger_rows(tail))
+    if not parts:
+        return csv_store.read_ledger_rows([])
+    tx = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+    tx['account_id'] = tx['account_id'].astype('int64')
+    order = list(schema.SCHEMAS['transactions']) + ['created_at' + schema.OFFSET]
+    return schema.normalize('transactions', tx[[c for c in order if c in tx.columns]])
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] != ['convert']:
+        print('usage: python -m utils.columnar convert')
+        return 2
+    m = convert_from_csv()
+    print(f"columnar mirror written to {mirror_dir()} ({m['rows']} ledger rows, txn_hwm={m['txn_hwm']})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
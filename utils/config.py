@@ -0,0 +1,73 @@
+import os
+
+# Runtime settings, overridable through environment variables
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+# Upper bound for the shared in-process table cache (all sessions)
+TABLE_CACHE_MAX_MB = _env_int('BANKING_TABLE_CACHE_MB', 256)
+
+# Storage backend used by the pages: 'csv' (files under data/), 'sqlite', or
+# 'remote' (through the store server, see utils/store_server.py)
+STORE_BACKEND = os.environ.get('BANKING_STORE_BACKEND', 'csv').strip().lower()
+
+# SQLite database file (defaults to data/bank.db) and connection pool size
+SQLITE_PATH = os.environ.get('BANKING_SQLITE_PATH', '')
+SQLITE_POOL_SIZE = _env_int('BANKING_SQLITE_POOL_SIZE', 8)
+
+# On-disk read format: 'csv', or 'arrow' to read through the columnar mirror
+# built by `python -m utils.columnar convert` (requires pyarrow)
+TABLE_FORMAT = os.environ.get('BANKING_TABLE_FORMAT', 'csv').strip().lower()
+
+# Password hashing cost (PBKDF2-SHA256 iterations) and how many hashes may be
+# computed at once, so a login storm queues instead of saturating every core
+AUTH_PBKDF2_ITERATIONS = _env_int('BANKING_AUTH_PBKDF2_ITERATIONS', 120000)
+AUTH_MAX_CONCURRENT_HASHES = _env_int('BANKING_AUTH_MAX_CONCURRENT_HASHES', 4)
+
+# Operation metrics (utils/metrics.py): '1' to record from startup; can also be
+# switched on at runtime from the Metrics page
+METRICS_ENABLED = os.environ.get('BANKING_METRICS', '0').strip() == '1'
+
+# Posting journal (see utils/csv_store.py): group commit of concurrent postings
+# in one writer thread, largest group per fsync, and when ledger rows are
+# folded into accounts.csv (tail size in KB, or age in seconds)
+JOURNAL_GROUP_COMMIT = os.environ.get('BANKING_JOURNAL_GROUP_COMMIT', '1').strip() == '1'
+JOURNAL_MAX_BATCH = _env_int('BANKING_JOURNAL_MAX_BATCH', 512)
+JOURNAL_COMPACT_KB = _env_int('BANKING_JOURNAL_COMPACT_KB', 4096)
+JOURNAL_COMPACT_SECONDS = _env_int('BANKING_JOURNAL_COMPACT_SECONDS', 30)
+
+# Posting queue used by the Deposit/Withdraw pages (utils/posting_queue.py):
+# postings that may wait before new ones are refused, and how long finished
+# tickets are kept for the pages to read back (seconds)
+POSTING_QUEUE_MAX = _env_int('BANKING_POSTING_QUEUE_MAX', 1000)
+POSTING_TICKET_TTL = _env_int('BANKING_POSTING_TICKET_TTL', 600)
+
+# Store server (utils/store_server.py) and the 'remote' backend that talks to
+# it: address ('host:port' or 'unix:/path'), shared token (required when
+# listening beyond loopback), the backend the server uses for the files, its
+# worker threads and the client's socket timeout. The server closes a
+# connection whose request is over STORE_SERVER_MAX_MESSAGE_MB, or that takes
+# longer than STORE_SERVER_READ_TIMEOUT seconds to arrive once started.
+STORE_SERVER_ADDRESS = os.environ.get('BANKING_STORE_SERVER', '127.0.0.1:8765').strip()
+STORE_SERVER_TOKEN = os.environ.get('BANKING_STORE_SERVER_TOKEN', '')
+STORE_SERVER_BACKEND = os.environ.get('BANKING_STORE_SERVER_BACKEND', 'csv').strip().lower()
+STORE_SERVER_THREADS = _env_int('BANKING_STORE_SERVER_THREADS', 8)
+STORE_CLIENT_TIMEOUT = _env_int('BANKING_STORE_CLIENT_TIMEOUT', 60)
+STORE_SERVER_MAX_MESSAGE_MB = _env_int('BANKING_STORE_SERVER_MAX_MESSAGE_MB', 64)
+STORE_SERVER_READ_TIMEOUT = _env_int('BANKING_STORE_SERVER_READ_TIMEOUT', 30)
+
+# Ledger archival (utils/ledger_archive.py): calendar months kept in the hot
+# transactions.csv, counting the current one; older closed months are moved
+# to compressed segments under data/archive/
+ARCHIVE_KEEP_MONTHS = _env_int('BANKING_ARCHIVE_KEEP_MONTHS', 3)
+
+# Rendered statement PDFs (utils/statement_cache.py): memory cache cap, and
+# the cap of data/statement_cache/ where statements of closed periods are kept
+STATEMENT_CACHE_MB = _env_int('BANKING_STATEMENT_CACHE_MB', 64)
+STATEMENT_CACHE_DISK_MB = _env_int('BANKING_STATEMENT_CACHE_DISK_MB', 512)
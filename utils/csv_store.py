@@ -1,7 +1,31 @@
 import os
+import io
+import csv
+import bisect
+import json
+import queue
+import threading
+import time
+import warnings
+from concurrent.futures import Future
+from contextlib import contextmanager
+from collections import OrderedDict
+from array import array
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from dateutil import tz
+from utils import auth
+from utils import config
+from utils import batch
+from utils import fileio
+from utils import metrics
+from utils import schema
+
+try:
+    import fcntl
+except ImportError:  # e.g. Windows: fall back to in-process locks only
+    fcntl = None
 
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
@@ -22,11 +46,31 @@ def _path(name: str) -> str:
     return os.path.join(DATA_DIR, FILES[name])
 
 
+_init_lock = threading.RLock()
+_initialized = set()  # DATA_DIRs already set up by this process
+
+
 def ensure_data_files():
+    # Pages call this on every rerun; the setup (files, crash recovery, journal
+    # replay) runs once per process and DATA_DIR, later calls are a set lookup
+    if DATA_DIR in _initialized:
+        return
+    with _init_lock:
+        if DATA_DIR in _initialized:
+            return
+        _create_data_files()
+        _recover_pending_posting()
+        _recover_archive()
+        # Fold the ledger tail left by the last run into accounts.csv
+        compact_journal()
+        _initialized.add(DATA_DIR)
+
+
+def _create_data_files():
     os.makedirs(DATA_DIR, exist_ok=True)
 # Create empty files with headers if missing
     defaults = {
-    'users': 'user_id,username,password,linked_customer_id,is_active\n1,admin,admin123,,1\n',
+    'users': 'user_id,username,password,linked_customer_id,is_active\n1,admin,{admin_hash},,1\n',
     'customers': 'customer_id,full_name,email,phone,address,dob,created_at\n',
     'accounts': 'account_id,customer_id,account_no,account_type,balance,status,created_at\n',
     'transactions': 'txn_id,account_id,txn_type,amount,balance_after,note,created_at\n',
@@ -34,21 +78,1079 @@ def ensure_data_files():
     for name, fname in FILES.items():
         p = _path(name)
         if not os.path.exists(p):
+            text = defaults[name]
+            if name == 'users':
+                # Seed admin is stored hashed (password: admin123)
+                text = text.format(admin_hash=auth.hash_password('admin123'))
             with open(p, 'w', encoding='utf-8') as f:
-                f.write(defaults[name])
+                f.write(text)
+
+
+# ---------- Locking ----------
+# Writers lock whole tables: a per-table RLock serializes threads in this
+# process and an flock on data/<table>.lock serializes processes. Locks are
+# reentrant per thread and always taken in sorted order.
+
+
+_locks_guard = threading.Lock()
+_thread_locks = {}
+_held = threading.local()
+
+
+def _lock_path(name: str) -> str:
+    return os.path.join(DATA_DIR, f'{name}.lock')
+
+
+def _thread_lock(lp: str):
+    with _locks_guard:
+        return _thread_locks.setdefault(lp, threading.RLock())
+
+
+@contextmanager
+def locked(*names: str):
+    if not hasattr(_held, 'fds'):
+        _held.fds, _held.depth = {}, {}
+    acquired = []
+    try:
+        for name in sorted(set(names)):
+            lp = _lock_path(name)
+            lk = _thread_lock(lp)
+            lk.acquire()
+            acquired.append((lp, lk))
+            if _held.depth.get(lp, 0) == 0 and fcntl is not None:
+                fd = os.open(lp, os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                _held.fds[lp] = fd
+            _held.depth[lp] = _held.depth.get(lp, 0) + 1
+        yield
+    finally:
+        for lp, lk in reversed(acquired):
+            _held.depth[lp] -= 1
+            if _held.depth[lp] == 0 and lp in _held.fds:
+                fd = _held.fds.pop(lp)
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+            lk.release()
+
+
+# ---------- Table cache ----------
+# Parsed tables are shared by every session in the process. An entry is valid
+# while the file's (mtime, size, inode) and the table's write generation are
+# unchanged; least recently used tables are evicted past the memory cap.
+# Cached frames are frozen: their arrays are read-only, so an in-place edit of
+# a frame handed out by read_df raises instead of corrupting the cache.
+
+
+_cache_lock = threading.Lock()
+_table_cache = OrderedDict()  # path -> {'key', 'df', 'nbytes'}
+_cache_bytes = 0
+_write_gen = {}
+
+
+def _file_sig(p: str) -> tuple:
+    st = os.stat(p)
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def bump_generation(name: str):
+    _write_gen[name] = _write_gen.get(name, 0) + 1
+
+
+def _cache_get(p: str, key: tuple):
+    with _cache_lock:
+        entry = _table_cache.get(p)
+        if entry is None or entry['key'] != key:
+            return None
+        _table_cache.move_to_end(p)
+        return entry
+
+
+def _freeze(df: pd.DataFrame):
+    # Marks the column arrays read-only, including the buffers behind
+    # categorical, nullable-int and datetime columns. pandas has no public way
+    # to reach those buffers, so this relies on its internals (checked for the
+    # installed version by _freeze_holds below)
+    for arr in df._mgr.arrays:
+        for buf in (arr, getattr(arr, '_ndarray', None), getattr(arr, '_codes', None),
+                    getattr(arr, '_data', None), getattr(arr, '_mask', None)):
+            if isinstance(buf, np.ndarray):
+                buf.flags.writeable = False
+
+
+def _freeze_holds() -> bool:
+    # Freezes a frame with one column of each kind the schema produces and
+    # checks that an in-place edit of every column is refused
+    df = pd.DataFrame({
+        'id': np.arange(2, dtype='int64'), 'text': ['a', 'b'], 'category': pd.Categorical(['a', 'b']),
+        'opt_id': pd.array([1, None], dtype='Int64'), 'timestamp': pd.to_datetime(['2024-01-01', '2024-01-02']),
+    })
+    _freeze(df)
+    for col in df.columns:
+        value = df[col].iloc[1]
+        try:
+            df.loc[0, col] = value
+        except Exception:
+            continue
+        if df[col].iloc[0] == value:
+            return False
+    return True
+
+
+# When the installed pandas lays its arrays out differently, read_df hands out
+# deep copies instead, so callers still cannot corrupt the shared cache
+_FROZEN = _freeze_holds()
+if not _FROZEN:
+    warnings.warn(f'pandas {pd.__version__}: cached tables cannot be made read-only; read_df returns copies')
+
+
+def _cache_put(p: str, key: tuple, df: pd.DataFrame) -> dict:
+    global _cache_bytes
+    nbytes = int(df.memory_usage(index=True, deep=True).sum())  # (needs writable object arrays)
+    _freeze(df)
+    cap = config.TABLE_CACHE_MAX_MB * 1024 * 1024
+    entry = {'key': key, 'df': df, 'nbytes': nbytes, 'indexes': {}}
+    with _cache_lock:
+        old = _table_cache.pop(p, None)
+        if old is not None:
+            _cache_bytes -= old['nbytes']
+        if nbytes > cap:
+            return entry
+        _table_cache[p] = entry
+        _cache_bytes += nbytes
+        while _cache_bytes > cap and _table_cache:
+            _, evicted = _table_cache.popitem(last=False)
+            _cache_bytes -= evicted['nbytes']
+    return entry
+
+
+def clear_cache():
+    global _cache_bytes
+    with _cache_lock:
+        _table_cache.clear()
+        _cache_bytes = 0
+
+
+def cache_info() -> dict:
+    with _cache_lock:
+        return {
+            'tables': [os.path.basename(p) for p in _table_cache],
+            'bytes': _cache_bytes,
+            'max_bytes': config.TABLE_CACHE_MAX_MB * 1024 * 1024,
+        }
+
+
+def _load(name: str) -> dict:
+    entry = _load_base(name)
+    if name == 'accounts':
+        return _accounts_view(entry)
+    return entry
+
+
+def _load_base(name: str) -> dict:
+    # The table as stored in its file (accounts without the journal overlay)
+    p = _path(name)
+    if not os.path.exists(p):
+        _create_data_files()
+    key = (_file_sig(p), _write_gen.get(name, 0))
+    entry = _cache_get(p, key)
+    if entry is None:
+        # Parsed to typed columns once per table version (see utils/schema.py)
+        mirror = _columnar()
+        df = mirror.read_table(name) if mirror else None
+        if df is None:
+            df = schema.to_typed(name, pd.read_csv(p, dtype=str, keep_default_na=False))
+            metrics.add('bytes_parsed', key[0][1])
+        metrics.add('rows_read', len(df))
+        entry = _cache_put(p, key, df)
+    return entry
+
+
+def _columnar():
+    # The columnar mirror module when BANKING_TABLE_FORMAT=arrow and pyarrow is installed
+    if config.TABLE_FORMAT != 'arrow':
+        return None
+    from utils import columnar
+    return columnar if columnar.available() else None
 
 
 def read_df(name: str) -> pd.DataFrame:
+    # Returns a shallow view of the cached, typed table (money in paise).
+    # Callers may add, drop or replace whole columns; the cached arrays are
+    # read-only, so modifying cells in place (df.loc[...] = ..., df[col] += ...
+    # on a Series) raises ValueError -- take .copy() first.
+    return _load(name)['df'].copy(deep=not _FROZEN)
+
+
+# ---------- Secondary indexes ----------
+# Hash indexes (value -> row positions) hang off the cached table entry, so they
+# are built lazily once per table version and dropped together with it.
+
+
+def _index_key(df: pd.DataFrame, col: str, value):
+    # Raises TypeError/ValueError for values that cannot match the column
+    return int(value) if pd.api.types.is_integer_dtype(df[col]) else str(value)
+
+
+def _cacheable(name: str, col: str) -> bool:
+    # Balances change with every posting (see the journal overlay), so money columns are never cached
+    return col not in schema.money_columns(name)
+
+
+def _positions(name: str, col: str, value):
+    entry = _load(name)
+    df = entry['df']
+    idx = entry['indexes'].get(col)
+    if idx is None:
+        idx = df.groupby(col, sort=False, observed=True).indices
+        if _cacheable(name, col):
+            entry['indexes'][col] = idx
+    try:
+        key = _index_key(df, col, value)
+    except (TypeError, ValueError):
+        return df, []
+    return df, idx.get(key, [])
+
+
+def _sorted_index(name: str, col: str):
+    # (values sorted ascending, their row positions); serves ordered paging and prefix search
+    entry = _load(name)
+    df = entry['df']
+    idx = entry['indexes'].get(('sorted', col))
+    if idx is None:
+        order = np.argsort(df[col].to_numpy(), kind='stable')
+        values = df[col].to_numpy()[order]
+        if values.dtype == object:
+            values = values.astype(str)
+        idx = (values, order)
+        if _cacheable(name, col):
+            entry['indexes'][('sorted', col)] = idx
+    return df, idx
+
+
+def lookup(name: str, col: str, value) -> pd.DataFrame:
+    df, pos = _positions(name, col, value)
+    return df.iloc[pos]
+
+
+def data_version(name: str) -> tuple:
+    # Changes whenever the table changes (file signature + in-process write generation)
     p = _path(name)
     if not os.path.exists(p):
-        ensure_data_files()
-    df = pd.read_csv(p, dtype=str).fillna('')
-    return df
+        _create_data_files()
+    version = (_file_sig(p), _write_gen.get(name, 0))
+    if name == 'accounts':
+        # Balances also move with every ledger append (journal overlay)
+        version += data_version('transactions')
+    return version
 
 
 def write_df(name: str, df: pd.DataFrame):
     p = _path(name)
-    df.to_csv(p, index=False)
+    # df is a typed frame (as returned by read_df); it is written back as CSV text
+    raw = schema.to_raw(name, df)
+    with locked(name):
+        fileio.atomic_write(p, lambda f: raw.to_csv(f, index=False))
+        bump_generation(name)
+    metrics.add('rows_written', len(raw))
+
+
+# ---------- Append-only ledger ----------
+
+
+def _seq_path(name: str) -> str:
+    # Persisted high-water mark of the last id handed out for a table
+    return os.path.join(DATA_DIR, f'{name}.seq')
+
+
+def _replace_text(p: str, text: str):
+    fileio.atomic_write(p, lambda f: f.write(text))
+
+
+def allocate_id(name: str, id_col: str, count: int = 1) -> int:
+    # Reserves count consecutive ids and returns the first one. Callers hold
+    # locked(name) so concurrent allocations cannot collide.
+    p = _seq_path(name)
+    last = None
+    if os.path.exists(p):
+        with open(p, 'r', encoding='utf-8') as f:
+            txt = f.read().strip()
+        if txt.isdigit():
+            last = int(txt)
+    if last is None:
+        # First use: seed the high-water mark from the table once
+        last = next_id(read_df(name), id_col) - 1
+        if name == 'transactions':
+            last = max(last, archive_manifest()['last_txn_id'])
+    # Persist before the rows are written so a crash can only leave a gap, never a duplicate
+    _replace_text(p, f'{last + count}\n')
+    return last + 1
+
+
+def _header(p: str) -> list:
+    with open(p, 'r', newline='', encoding='utf-8') as f:
+        return next(csv.reader(f))
+
+
+def _field_reader(cols: list, col: str):
+    # rec -> text of column `col` in a raw ledger record, at its position in
+    # the header. Splits on commas when no free-text field (which may hold
+    # quoted commas) comes before it, or takes the last field; parses otherwise.
+    i = cols.index(col)
+    if all(schema.kind('transactions', c) != schema.TEXT for c in cols[:i]):
+        return lambda rec: rec.split(b',', i + 1)[i].decode('utf-8').rstrip('\r\n')
+    if i == len(cols) - 1 and schema.kind('transactions', col) != schema.TEXT:
+        return lambda rec: rec.rsplit(b',', 1)[1].decode('utf-8').rstrip('\r\n')
+    return lambda rec: next(csv.reader(io.StringIO(rec.decode('utf-8'))))[i]
+
+
+def _encode_row(cols: list, r: dict) -> bytes:
+    buf = io.StringIO()
+    csv.writer(buf, lineterminator='\n').writerow(['' if r.get(c) is None else str(r.get(c)) for c in cols])
+    return buf.getvalue().encode('utf-8')
+
+
+def append_rows(name: str, rows: list) -> list:
+    # Returns the byte offset at which each row was written
+    p = _path(name)
+    if not os.path.exists(p):
+        _create_data_files()
+    cols = _header(p)
+    with locked(name), open(p, 'ab') as f:
+        pos = f.seek(0, os.SEEK_END)
+        if pos > 0:
+            with open(p, 'rb') as rf:
+                rf.seek(-1, os.SEEK_END)
+                if rf.read(1) != b'\n':
+                    pos += f.write(b'\n')
+        offsets, chunks = [], []
+        for r in rows:
+            line = _encode_row(cols, r)
+            offsets.append(pos)
+            chunks.append(line)
+            pos += len(line)
+        f.write(b''.join(chunks))
+        f.flush()
+        os.fsync(f.fileno())
+    bump_generation(name)
+    metrics.add('rows_written', len(rows))
+    if name == 'transactions':
+        _ledger_index_add(p, rows, offsets, pos)
+        _tail_add(p, rows, offsets, pos)
+    return offsets
+
+
+# ---------- Posting commit & recovery ----------
+# A posting is committed once its ledger rows are appended and fsynced. An
+# intent file written first lets startup (ensure_data_files) and the next
+# commit drop a group whose append was cut short by a crash. Balances need no
+# repair: they are read through the journal overlay below.
+
+
+def _intent_path() -> str:
+    return os.path.join(DATA_DIR, 'posting.intent')
+
+
+def _commit_posting(txns: list):
+    # Caller holds locked('accounts', 'transactions'). A group torn by another
+    # process that crashed since startup is dropped first.
+    _recover_pending_posting()
+    intent = {
+        'last_txn_id': str(txns[-1]['txn_id']),
+        'ledger_size': os.path.getsize(_path('transactions')),
+    }
+    _replace_text(_intent_path(), json.dumps(intent))
+    append_rows('transactions', txns)
+    os.remove(_intent_path())
+
+
+def _recover_pending_posting():
+    ip = _intent_path()
+    if not os.path.exists(ip):
+        return
+    with locked('accounts', 'transactions'):
+        if not os.path.exists(ip):
+            return
+        with open(ip, 'r', encoding='utf-8') as f:
+            try:
+                intent = json.load(f)
+            except ValueError:
+                intent = None  # crashed while writing the intent: nothing was posted
+        if intent:
+            # The group committed if its last row made it into the ledger
+            p = _path('transactions')
+            txn_id_of = _field_reader(_header(p), 'txn_id')
+            with open(p, 'rb') as f:
+                done = any(txn_id_of(rec) == intent['last_txn_id']
+                           for off, rec in _scan_records(f, intent['ledger_size']) if off)
+            if not done:
+                with open(p, 'rb+') as f:
+                    f.truncate(intent['ledger_size'])
+                bump_generation('transactions')
+        os.remove(ip)
+
+
+# ---------- Journal: balance overlay, group commit, compaction ----------
+# The ledger doubles as the write-ahead log and accounts.csv is a checkpoint
+# of the balances as of a ledger position (data/accounts.ckpt). Reads of
+# accounts apply the balance_after of the ledger rows past that position, so
+# a posting never rewrites accounts.csv; compaction folds the tail into it
+# in the background (and once per process in ensure_data_files).
+#
+# record_transaction hands postings to one writer thread per process, which
+# commits everything queued meanwhile with a single intent and fsync.
+
+
+_tail_lock = threading.Lock()
+_tail = {'path': None, 'ino': None, 'start': 0, 'pos': 0, 'balances': {}, 'version': 0, 'ckpt': (None, 0)}
+_writer = {'pid': None, 'queue': None, 'last_compact': time.monotonic()}
+_writer_lock = threading.Lock()
+
+
+def _ckpt_path() -> str:
+    return os.path.join(DATA_DIR, 'accounts.ckpt')
+
+
+def _write_ckpt(ledger_ino: int, ledger_size: int):
+    _replace_text(_ckpt_path(), json.dumps({'ledger_ino': ledger_ino, 'ledger_size': ledger_size}))
+
+
+def _ckpt_start(ino: int, size: int) -> int:
+    # Ledger position already folded into accounts.csv; 0 when unknown or the ledger was replaced
+    p = _ckpt_path()
+    try:
+        sig = _file_sig(p)
+    except OSError:
+        return 0
+    if _tail['ckpt'][0] != sig:
+        try:
+            with open(p, 'r', encoding='utf-8') as f:
+                ck = json.load(f)
+        except (OSError, ValueError):
+            ck = {}
+        _tail['ckpt'] = (sig, int(ck.get('ledger_size', 0)) if ck.get('ledger_ino') == ino else 0)
+    start = _tail['ckpt'][1]
+    return start if start <= size else 0
+
+
+def _tail_catch_up() -> dict:
+    # Caller holds _tail_lock. Brings the balances (paise) of accounts with
+    # ledger rows past the checkpoint up to the end of the ledger.
+    p = _path('transactions')
+    st = os.stat(p)
+    t = _tail
+    start = _ckpt_start(st.st_ino, st.st_size)
+    if t['path'] != p or t['ino'] != st.st_ino or t['start'] != start or st.st_size < t['pos']:
+        t.update(path=p, ino=st.st_ino, start=start, pos=start, balances={}, version=t['version'] + 1)
+    if st.st_size == t['pos']:
+        return t
+    cols = _header(p)
+    a, b = cols.index('account_id'), cols.index('balance_after')
+    with open(p, 'rb') as f:
+        end = t['pos']
+        for off, rec in _scan_records(f, t['pos']):
+            end = off + len(rec)
+            if off == 0:
+                continue  # header
+            fields = rec.split(b',', max(a, b) + 1)
+            t['balances'][int(fields[a])] = schema.paise(fields[b].decode('utf-8'))
+    metrics.add('bytes_parsed', end - t['pos'])
+    if end != t['pos']:
+        t.update(pos=end, version=t['version'] + 1)
+    return t
+
+
+def _tail_add(p: str, rows: list, offsets: list, end: int):
+    with _tail_lock:
+        t = _tail
+        if t['path'] != p or not offsets or t['pos'] != offsets[0]:
+            return  # stale or not built yet; the next read catches up
+        for r in rows:
+            t['balances'][int(r['account_id'])] = schema.paise(r['balance_after'])
+        t.update(pos=end, version=t['version'] + 1)
+
+
+def _accounts_view(entry: dict) -> dict:
+    # accounts.csv with the journal tail applied; hash indexes are shared with
+    # the base entry (same rows in the same order, only balances differ)
+    with _tail_lock:
+        t = _tail_catch_up()
+        version = t['version']
+        view = entry.get('view')
+        if view is not None and view['version'] == version:
+            return view
+        changed = dict(t['balances'])
+    df = entry['df']
+    if changed:
+        pos = pd.Index(df['account_id']).get_indexer(list(changed))
+        found = pos >= 0
+        balance = df['balance'].to_numpy().copy()
+        balance[pos[found]] = np.fromiter(changed.values(), dtype='int64', count=len(changed))[found]
+        df = df.copy(deep=False)
+        df['balance'] = balance
+        _freeze(df)
+    view = {'key': entry['key'], 'df': df, 'nbytes': entry['nbytes'], 'indexes': entry['indexes'], 'version': version}
+    entry['view'] = view
+    return view
+
+
+def _current_balances(account_ids) -> dict:
+    # {account_id: balance in paise} for existing accounts, without building the overlay frame
+    entry = _load_base('accounts')
+    df, idx = entry['df'], entry['indexes'].get('account_id')
+    if idx is None:
+        idx = entry['indexes']['account_id'] = df.groupby('account_id', sort=False, observed=True).indices
+    with _tail_lock:
+        changed = _tail_catch_up()['balances']
+        out = {}
+        for aid in account_ids:
+            pos = idx.get(aid)
+            if pos is not None and len(pos):
+                out[aid] = changed.get(aid, int(df['balance'].iat[pos[0]]))
+    return out
+
+
+def _post(items: list) -> list:
+    # items: (account_id, txn_type, amount, note) in submission order. Caller
+    # holds locked('accounts', 'transactions'). Returns a txn dict or an
+    # exception per item; accepted items commit in one ledger append.
+    ids = []
+    for item in items:
+        try:
+            ids.append(int(item[0]))
+        except (TypeError, ValueError):
+            ids.append(None)
+    balances = _current_balances({a for a in ids if a is not None})
+    results, accepted = [], []
+    for aid, (_, txn_type, amount, note) in zip(ids, items):
+        if aid not in balances:
+            results.append(ValueError('Account not found'))
+            continue
+        # Balances are fixed-point paise in memory
+        curr_bal, amt = balances[aid], schema.paise(amount)
+        if txn_type == 'DEPOSIT':
+            new_bal = curr_bal + amt
+        elif txn_type == 'WITHDRAW':
+            if amt > curr_bal:
+                results.append(ValueError('Insufficient balance'))
+                continue
+            new_bal = curr_bal - amt
+        else:
+            results.append(ValueError('Invalid txn_type'))
+            continue
+        balances[aid] = new_bal
+        txn = {
+            'txn_id': None,
+            'account_id': aid,
+            'txn_type': txn_type,
+            'amount': schema.rupees(amt),
+            'balance_after': schema.rupees(new_bal),
+            'note': note,
+            'created_at': None,
+        }
+        results.append(txn)
+        accepted.append(txn)
+    if accepted:
+        # Ledger is append-only: never reload or rewrite the history
+        first, now = allocate_id('transactions', 'txn_id', len(accepted)), _now_iso()
+        for k, txn in enumerate(accepted):
+            txn.update(txn_id=first + k, created_at=now)
+        _commit_posting(accepted)
+    return results
+
+
+def _holds_lock(name: str) -> bool:
+    return getattr(_held, 'depth', {}).get(_lock_path(name), 0) > 0
+
+
+def _writer_loop(q: queue.Queue):
+    while True:
+        group = [q.get()]
+        while len(group) < config.JOURNAL_MAX_BATCH:
+            try:
+                group.append(q.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            with locked('accounts', 'transactions'):
+                results = _post([item for item, _ in group])
+        except BaseException as e:
+            results = [e] * len(group)
+        for (_, fut), r in zip(group, results):
+            if isinstance(r, BaseException):
+                fut.set_exception(r)
+            else:
+                fut.set_result(r)
+        try:
+            _maybe_compact()
+        except Exception:
+            pass  # retried after the next group; reads stay correct meanwhile
+
+
+def submit_transaction(account_id: int, txn_type: str, amount: float, note: str = '') -> Future:
+    # Queues a posting for the group-commit writer; the Future resolves to the
+    # txn dict once it is durable (or raises ValueError like record_transaction)
+    with _writer_lock:
+        if _writer['pid'] != os.getpid():
+            # First use in this process (or a forked child): start its own writer
+            q = queue.Queue()
+            threading.Thread(target=_writer_loop, args=(q,), name='csv-store-journal', daemon=True).start()
+            _writer.update(pid=os.getpid(), queue=q)
+        q = _writer['queue']
+    fut = Future()
+    q.put(((account_id, txn_type, amount, note), fut))
+    return fut
+
+
+def _maybe_compact():
+    with _tail_lock:
+        t = _tail_catch_up()
+        pending = t['pos'] - t['start']
+    if not pending:
+        return
+    if pending >= config.JOURNAL_COMPACT_KB * 1024 or time.monotonic() - _writer['last_compact'] >= config.JOURNAL_COMPACT_SECONDS:
+        compact_journal()
+
+
+def compact_journal() -> bool:
+    # Folds the ledger rows past the checkpoint into accounts.csv; False if there was nothing to fold
+    with locked('accounts', 'transactions'):
+        with _tail_lock:
+            t = _tail_catch_up()
+            ino, pos, pending = t['ino'], t['pos'], t['pos'] - t['start']
+        if not pending:
+            return False
+        if t['balances']:
+            write_df('accounts', read_df('accounts'))
+        _write_ckpt(ino, pos)
+    _writer['last_compact'] = time.monotonic()
+    return True
+
+
+# ---------- Ledger offset index ----------
+# account_id -> byte offsets of that account's rows in transactions.csv, with a
+# parallel time key per row (created_at wall clock as the integer
+# YYYYMMDDhhmmss). Rows are appended in time order, so a period is a binary
+# search on the keys and a slice of the offsets. Built by one scan, extended by
+# append_rows, caught up from the tail if another writer appended to the file,
+# and persisted to data/transactions.idx.npz so a restart only scans the tail.
+
+
+LEDGER_INDEX_SAVE_BYTES = 1 << 20  # persist after a catch-up scan of at least this much
+_ledger_lock = threading.Lock()
+_ledger_index = {'path': None, 'ino': None, 'gen': None, 'size': 0, 'by_account': {}, 'unsorted': set()}
+
+
+def _ledger_index_path() -> str:
+    return os.path.join(DATA_DIR, 'transactions.idx.npz')
+
+
+def _time_key(iso) -> int:
+    # 'YYYY-MM-DDTHH:MM:SS...' -> YYYYMMDDhhmmss; 0 when unparseable
+    s = str(iso)
+    try:
+        return int(s[0:4] + s[5:7] + s[8:10] + s[11:13] + s[14:16] + s[17:19])
+    except ValueError:
+        return 0
+
+
+def _scan_records(f, start: int):
+    # Yields (offset, raw record) for complete CSV records from start; a quoted
+    # field may span lines. A trailing partial record is not yielded.
+    f.seek(start)
+    pos, rec_start, buf = start, start, b''
+    for line in iter(f.readline, b''):
+        if not buf:
+            rec_start = pos
+        buf += line
+        pos += len(line)
+        if buf.count(b'"') % 2 or not line.endswith(b'\n'):
+            continue
+        yield rec_start, buf
+        buf = b''
+
+
+def _index_row(idx: dict, aid: str, off: int, key: int):
+    entry = idx['by_account'].get(aid)
+    if entry is None:
+        entry = idx['by_account'][aid] = (array('q'), array('q'))
+    offs, keys = entry
+    if keys and key < keys[-1]:
+        idx['unsorted'].add(aid)  # out-of-order clock: periods fall back to filtering
+    offs.append(off)
+    keys.append(key)
+
+
+def _tail_bytes(p: str, size: int) -> bytes:
+    with open(p, 'rb') as f:
+        f.seek(max(0, size - 64))
+        return f.read(min(size, 64))
+
+
+def _save_ledger_index(p: str):
+    idx = _ledger_index
+    ids = list(idx['by_account'])
+    offs = [idx['by_account'][a][0] for a in ids]
+    keys = [idx['by_account'][a][1] for a in ids]
+
+    def write(f):
+        np.savez(f, ino=np.int64(idx['ino']), size=np.int64(idx['size']),
+                 tail=np.frombuffer(_tail_bytes(p, idx['size']), dtype=np.uint8),
+                 accounts=np.array(ids, dtype=str), counts=np.array([len(o) for o in offs], dtype=np.int64),
+                 offsets=np.concatenate([np.frombuffer(o, dtype=np.int64) for o in offs] or [np.zeros(0, np.int64)]),
+                 keys=np.concatenate([np.frombuffer(k, dtype=np.int64) for k in keys] or [np.zeros(0, np.int64)]),
+                 unsorted=np.array(sorted(idx['unsorted']), dtype=str))
+    try:
+        fileio.atomic_write(_ledger_index_path(), write, binary=True)
+    except OSError:
+        pass  # only a cache; the next start scans again
+
+
+def _load_ledger_index(p: str, st) -> bool:
+    # Restores a saved index if it describes a prefix of this ledger file
+    try:
+        with np.load(_ledger_index_path(), allow_pickle=False) as z:
+            saved = {k: z[k] for k in z.files}
+    except (OSError, ValueError, KeyError):
+        return False
+    size = int(saved['size'])
+    if int(saved['ino']) != st.st_ino or size > st.st_size or _tail_bytes(p, size) != saved['tail'].tobytes():
+        return False
+    by_account = {}
+    bounds = np.cumsum(saved['counts'])[:-1]
+    for aid, o, k in zip(saved['accounts'].tolist(), np.split(saved['offsets'], bounds), np.split(saved['keys'], bounds)):
+        by_account[aid] = (array('q', o.tobytes()), array('q', k.tobytes()))
+    _ledger_index.update(size=size, by_account=by_account, unsorted=set(saved['unsorted'].tolist()))
+    return True
+
+
+def _ledger_catch_up(p: str):
+    st = os.stat(p)
+    idx = _ledger_index
+    gen = _write_gen.get('transactions', 0)
+    if idx['path'] != p or idx['ino'] != st.st_ino or idx['gen'] != gen or st.st_size < idx['size']:
+        idx.update(path=p, ino=st.st_ino, gen=gen, size=0, by_account={}, unsorted=set())
+        _load_ledger_index(p, st)
+    if st.st_size == idx['size']:
+        return
+    cols = _header(p)
+    account_of, time_of = _field_reader(cols, 'account_id'), _field_reader(cols, 'created_at')
+    with open(p, 'rb') as f:
+        begin = end = idx['size']
+        for off, rec in _scan_records(f, begin):
+            end = off + len(rec)
+            if off == 0:
+                continue  # header
+            _index_row(idx, account_of(rec), off, _time_key(time_of(rec)))
+    metrics.add('bytes_parsed', end - begin)
+    idx['size'] = end
+    if end - begin >= LEDGER_INDEX_SAVE_BYTES:
+        _save_ledger_index(p)
+
+
+def _ledger_index_add(p: str, rows: list, offsets: list, end: int):
+    with _ledger_lock:
+        idx = _ledger_index
+        if idx['path'] != p or not offsets or idx['size'] != offsets[0]:
+            return  # stale or not built yet; the next lookup catches up
+        for r, off in zip(rows, offsets):
+            _index_row(idx, str(r['account_id']), off, _time_key(r.get('created_at', '')))
+        idx['size'] = end
+        idx['gen'] = _write_gen.get('transactions', 0)
+        idx['ino'] = os.stat(p).st_ino
+
+
+def _ledger_span(account_id: int, start_iso: str = '', end_iso: str = '') -> tuple:
+    # (offsets array, lo, hi, exact): the account's rows are offs[lo:hi], and
+    # exact means they are precisely the rows in [start, end]; otherwise the
+    # caller must still filter. The arrays are only ever appended to (or
+    # replaced), so offs[lo:hi] stays valid after the lock is released.
+    p = _path('transactions')
+    if not os.path.exists(p):
+        _create_data_files()
+    start, end = period_key(start_iso), period_key(end_iso)
+    with _ledger_lock:
+        _ledger_catch_up(p)
+        aid = str(account_id)
+        entry = _ledger_index['by_account'].get(aid)
+        if entry is None:
+            return array('q'), 0, 0, True
+        offs, keys = entry
+        if aid in _ledger_index['unsorted']:
+            return offs, 0, len(offs), not (start or end)
+        lo = bisect.bisect_left(keys, _time_key(start)) if start else 0
+        hi = bisect.bisect_right(keys, _time_key(end)) if end else len(keys)
+        return offs, lo, hi, True
+
+
+def _ledger_range(account_id: int, start_iso: str = '', end_iso: str = '') -> tuple:
+    # (offsets of the account's rows, exact), see _ledger_span
+    offs, lo, hi, exact = _ledger_span(account_id, start_iso, end_iso)
+    return offs[lo:hi].tolist(), exact
+
+
+def ledger_offsets(account_id: int, start_iso: str = '', end_iso: str = '') -> list:
+    # Byte offsets of the account's rows, oldest first; with a period, at least
+    # the rows inside it (exactly those unless the account's clock went backwards)
+    return _ledger_range(account_id, start_iso, end_iso)[0]
+
+
+def ledger_cut_offset(cut_key: int) -> int:
+    # Offset of the first ledger row created at or after cut_key (a _time_key
+    # value), or the end of the ledger if there is none; everything before it
+    # was created earlier
+    p = _path('transactions')
+    with _ledger_lock:
+        _ledger_catch_up(p)
+        cut = _ledger_index['size']
+        for aid, (offs, keys) in _ledger_index['by_account'].items():
+            if aid in _ledger_index['unsorted']:
+                k = np.frombuffer(keys, dtype=np.int64)
+                order = np.argsort(k, kind='stable')
+                later = order[np.searchsorted(k[order], cut_key):]
+                if len(later):
+                    cut = min(cut, int(np.frombuffer(offs, dtype=np.int64)[later].min()))
+                continue
+            i = bisect.bisect_left(keys, cut_key)
+            if i < len(offs):
+                cut = min(cut, offs[i])
+    return cut
+
+
+def read_ledger_rows(offsets: list) -> pd.DataFrame:
+    p = _path('transactions')
+    cols = _header(p)
+    rows, nbytes = [], 0
+    with open(p, 'rb') as f:
+        for off in offsets:
+            rec = next(_scan_records(f, off))[1]
+            nbytes += len(rec)
+            rows.append(next(csv.reader(io.StringIO(rec.decode('utf-8')))))
+    metrics.add('rows_read', len(rows))
+    metrics.add('bytes_parsed', nbytes)
+    return schema.to_typed('transactions', pd.DataFrame(rows, columns=cols, dtype=str).fillna(''))
+
+
+def ledger_since(cursor: dict = None) -> tuple:
+    # (typed ledger rows appended after cursor, new cursor, full). Only complete
+    # records are returned. Without a cursor, or with one that no longer
+    # describes a prefix of the ledger (file replaced or truncated), the whole
+    # ledger is read in one vectorized parse and full is True.
+    p = _path('transactions')
+    if not os.path.exists(p):
+        _create_data_files()
+    st = os.stat(p)
+    cursor = _rebased(p, st, cursor)
+    full = (not cursor or cursor.get('ino') != st.st_ino or cursor['pos'] > st.st_size
+            or _tail_bytes(p, cursor['pos']).hex() != cursor.get('tail'))
+    start = 0 if full else cursor['pos']
+    with open(p, 'rb') as f:
+        f.seek(start)
+        data = f.read(st.st_size - start)
+    end = data.rfind(b'\n') + 1
+    if data[:end].count(b'"') % 2:
+        # A quoted note with line breaks is still being written: stop before it
+        last = 0
+        for off, rec in _scan_records(io.BytesIO(data[:end]), 0):
+            last = off + len(rec)
+        end = last
+    cols = _header(p)
+    if end:
+        raw = pd.read_csv(io.BytesIO(data[:end]), header=0 if start == 0 else None, names=cols, dtype=str,
+                          keep_default_na=False)
+    else:
+        raw = pd.DataFrame(columns=cols, dtype=str)
+    metrics.add('rows_read', len(raw))
+    metrics.add('bytes_parsed', end)
+    pos = start + end
+    tx = schema.to_typed('transactions', raw)
+    if full:
+        # The whole history: archived segments come before the hot file
+        parts = [_segment_df(s)['df'] for s in archive_manifest()['segments']]
+        if parts:
+            tx = schema.normalize('transactions', pd.concat(parts + [tx], ignore_index=True))
+    return tx, {'ino': st.st_ino, 'pos': pos, 'tail': _tail_bytes(p, pos).hex()}, full
+
+
+# ---------- Ledger archive ----------
+# Closed months can be moved out of transactions.csv by utils/ledger_archive.py
+# into immutable gzip segments under data/archive/, one or more per month,
+# listed in data/archive/manifest.json. The archived rows are always a prefix
+# of the ledger, so the hot file keeps its order and the manifest's
+# carry-forward record per account (archived rows, first and last time key,
+# last txn_id, closing balance) tells which segments a query needs at all:
+# statements of recent periods never open a segment, older ones read only the
+# months they overlap. Parsed segments share the table cache.
+
+
+ARCHIVE_DIR = 'archive'
+_archive_lock = threading.Lock()
+_archive = {'path': None, 'sig': None, 'manifest': None}
+
+
+def archive_dir() -> str:
+    return os.path.join(DATA_DIR, ARCHIVE_DIR)
+
+
+def _manifest_path() -> str:
+    return os.path.join(archive_dir(), 'manifest.json')
+
+
+def _archive_intent_path() -> str:
+    return os.path.join(archive_dir(), 'archive.intent')
+
+
+def archive_manifest() -> dict:
+    # The current manifest (an empty one before the first archival); treat as read-only
+    p = _manifest_path()
+    try:
+        sig = _file_sig(p)
+    except OSError:
+        return {'segments': [], 'accounts': {}, 'rows': 0, 'last_txn_id': 0}
+    with _archive_lock:
+        if _archive['path'] != p or _archive['sig'] != sig:
+            with open(p, 'r', encoding='utf-8') as f:
+                _archive.update(path=p, sig=sig, manifest=json.load(f))
+        return _archive['manifest']
+
+
+def _recover_archive():
+    # An archival cut short by a crash: finish it if the new ledger was
+    # already swapped in, otherwise drop its leftovers
+    ip = _archive_intent_path()
+    if not os.path.exists(ip):
+        return
+    with locked('accounts', 'transactions'):
+        if not os.path.exists(ip):
+            return
+        with open(ip, 'r', encoding='utf-8') as f:
+            try:
+                pending = json.load(f)
+            except ValueError:
+                pending = None  # crashed while writing the intent: the ledger was not touched
+        if pending:
+            tmp = pending.pop('ledger_tmp')
+            if os.path.exists(tmp):
+                os.remove(tmp)
+                known = {s['file'] for s in archive_manifest()['segments']}
+                for seg in pending['segments']:
+                    sp = os.path.join(archive_dir(), seg['file'])
+                    if seg['file'] not in known and os.path.exists(sp):
+                        os.remove(sp)
+            else:
+                _replace_text(_manifest_path(), json.dumps(pending))
+        os.remove(ip)
+
+
+def archived_balances() -> tuple:
+    # ({account_id: closing balance in paise}, {account_id: last txn_id}) at the archive boundary
+    accounts = archive_manifest()['accounts']
+    return ({int(a): v['balance'] for a, v in accounts.items()},
+            {int(a): v['last_txn_id'] for a, v in accounts.items()})
+
+
+def _segment_df(seg: dict) -> dict:
+    # Cache entry of a parsed segment; segments never change once written
+    p = os.path.join(archive_dir(), seg['file'])
+    key = (seg['file'], seg['sha256'])
+    entry = _cache_get(p, key)
+    if entry is None:
+        df = schema.to_typed('transactions', pd.read_csv(p, dtype=str, keep_default_na=False, compression='gzip'))
+        metrics.add('rows_read', len(df))
+        metrics.add('bytes_parsed', seg['bytes'])
+        entry = _cache_put(p, key, df)
+    return entry
+
+
+def _segments(lo: int, hi: int) -> list:
+    # Segments holding rows with time keys in [lo, hi], in ledger order
+    return [s for s in archive_manifest()['segments'] if s['max_key'] >= lo and s['min_key'] <= hi]
+
+
+def _key_bounds(start_iso: str, end_iso: str) -> tuple:
+    start, end = period_key(start_iso), period_key(end_iso)
+    return (_time_key(start) if start else 0), (_time_key(end) if end else 99999999999999)
+
+
+def _archived_parts(account_id: int, start_iso: str = '', end_iso: str = ''):
+    # Typed archived rows of the account in [start, end], oldest first, one
+    # month at a time; a segment holds one month's rows, so each part sorts on its own
+    lo, hi = _key_bounds(start_iso, end_iso)
+    acct = archive_manifest()['accounts'].get(str(account_id))
+    if acct is None or acct['last_key'] < lo or acct['first_key'] > hi:
+        return
+    by_month = {}
+    for seg in _segments(max(lo, acct['first_key']), min(hi, acct['last_key'])):
+        by_month.setdefault(seg['month'], []).append(seg)
+    start, end = period_key(start_iso), period_key(end_iso)
+    for month in sorted(by_month):
+        parts = []
+        for seg in by_month[month]:
+            entry = _segment_df(seg)
+            df = entry['df']
+            idx = entry['indexes'].get('account_id')
+            if idx is None:
+                idx = entry['indexes']['account_id'] = df.groupby('account_id', sort=False, observed=True).indices
+            pos = idx.get(int(account_id))
+            if pos is not None and len(pos):
+                parts.append(df.iloc[pos])
+        if not parts:
+            continue
+        tx = schema.normalize('transactions', pd.concat(parts)) if len(parts) > 1 else parts[0]
+        if start:
+            tx = tx[tx['created_at'] >= pd.Timestamp(start)]
+        if end:
+            tx = tx[tx['created_at'] <= pd.Timestamp(end)]
+        if len(tx):
+            yield tx.sort_values('created_at', kind='stable')
+
+
+def _archived_rows(account_id: int, start_iso: str = '', end_iso: str = ''):
+    # Typed archived rows of the account in [start, end], oldest first; None
+    # when there are none
+    parts = list(_archived_parts(account_id, start_iso, end_iso))
+    if not parts:
+        return None
+    return schema.normalize('transactions', pd.concat(parts)) if len(parts) > 1 else parts[0]
+
+
+def _archived_count(account_id: int, start_iso: str = '', end_iso: str = '') -> int:
+    # Archived rows of the account in [start, end]; no segment is read when
+    # the period covers all or none of its archived activity
+    lo, hi = _key_bounds(start_iso, end_iso)
+    acct = archive_manifest()['accounts'].get(str(account_id))
+    if acct is None or acct['last_key'] < lo or acct['first_key'] > hi:
+        return 0
+    if lo <= acct['first_key'] and acct['last_key'] <= hi:
+        return acct['rows']
+    tx = _archived_rows(account_id, start_iso, end_iso)
+    return 0 if tx is None else len(tx)
+
+
+def _rebased(p: str, st, cursor: dict):
+    # A ledger_since cursor taken before the last archival, moved to the same
+    # row of the new hot file, so followers of the ledger need no full reread
+    rebase = archive_manifest().get('rebase')
+    if (not cursor or not rebase or cursor.get('ino') != rebase['from_ino'] or st.st_ino != rebase['to_ino']
+            or cursor['pos'] < rebase['cut']):
+        return cursor
+    pos = cursor['pos'] - rebase['cut'] + rebase['header']
+    return {'ino': st.st_ino, 'pos': pos, 'tail': _tail_bytes(p, pos).hex()}
+
+
+def read_ledger(start_iso: str = '', end_iso: str = '') -> pd.DataFrame:
+    # Typed ledger rows (money in paise) created in [start, end], in ledger
+    # order, including the archived segments that overlap the period;
+    # read_df('transactions') holds the hot file only
+    parts = [_segment_df(s)['df'] for s in _segments(*_key_bounds(start_iso, end_iso))]
+    tx = read_df('transactions')
+    if parts:
+        tx = schema.normalize('transactions', pd.concat(parts + [tx], ignore_index=True))
+    start, end = period_key(start_iso), period_key(end_iso)
+    if start:
+        tx = tx[tx['created_at'] >= pd.Timestamp(start)]
+    if end:
+        tx = tx[tx['created_at'] <= pd.Timestamp(end)]
+    return tx
 
 
 def _now_iso() -> str:
@@ -67,17 +1169,33 @@ def next_id(df: pd.DataFrame, id_col: str) -> int:
 # ---------- Auth (demo) ----------
 
 
+def _credentials() -> dict:
+    # username -> login record for active users; kept on the users cache entry,
+    # so it is rebuilt only when users.csv changes
+    entry = _load('users')
+    creds = entry['indexes'].get('_credentials')
+    if creds is None:
+        df = entry['df']
+        df = df[df['is_active'] == 1]
+        creds = {}
+        for uid, uname, linked, pw in zip(df['user_id'].tolist(), df['username'].tolist(),
+                                          df['linked_customer_id'].tolist(), df['password'].tolist()):
+            creds.setdefault(str(uname), {
+                'user_id': int(uid),
+                'username': uname,
+                'linked_customer_id': None if pd.isna(linked) else int(linked),
+                'password': pw,
+            })
+        entry['indexes']['_credentials'] = creds
+    return creds
+
+
 def validate_user(username: str, password: str):
-    users = read_df('users')
-    row = users[(users['username'] == username) & (users['password'] == password) & (users['is_active'] == '1')]
-    if row.empty:
+    rec = _credentials().get(str(username))
+    # Unknown users still pay for one hash (see utils/auth.py)
+    if not auth.verify_password(password, rec['password'] if rec else None):
         return None
-    r = row.iloc[0]
-    return {
-    'user_id': int(r['user_id']),
-    'username': r['username'],
-    'linked_customer_id': int(r['linked_customer_id']) if str(r['linked_customer_id']).strip() else None,
-    }
+    return {k: rec[k] for k in ('user_id', 'username', 'linked_customer_id')}
 
 
 
@@ -85,26 +1203,33 @@ def validate_user(username: str, password: str):
 
 
 def get_customer(customer_id: int):
-    customers = read_df('customers')
-    row = customers[customers['customer_id'] == str(customer_id)]
-    return None if row.empty else row.iloc[0].to_dict()
+    return schema.public_row('customers', lookup('customers', 'customer_id', customer_id))
 
 
 def accounts_for_customer(customer_id: int) -> pd.DataFrame:
-    accounts = read_df('accounts')
-    return accounts[accounts['customer_id'] == str(customer_id)]
+    return schema.to_public('accounts', lookup('accounts', 'customer_id', customer_id))
 
 
 def get_account_by_no(account_no: str):
-    accounts = read_df('accounts')
-    row = accounts[accounts['account_no'] == account_no]
-    return None if row.empty else row.iloc[0].to_dict()
+    return schema.public_row('accounts', lookup('accounts', 'account_no', account_no))
 
 
 # ---------- Create operations (used later) ----------
 
 
 def create_customer(full_name: str, email: str = '', phone: str = '', address: str = '', dob: str = '') -> int:
+    with locked('customers'):
+        return _create_customer(full_name, email, phone, address, dob)
+
+
+def _with_row(name: str, df: pd.DataFrame, row: dict) -> pd.DataFrame:
+    new = schema.to_typed(name, pd.DataFrame([{k: '' if v is None else str(v) for k, v in row.items()}]))
+    if df.empty:
+        return new
+    return schema.normalize(name, pd.concat([df, new], ignore_index=True))
+
+
+def _create_customer(full_name: str, email: str, phone: str, address: str, dob: str) -> int:
     customers = read_df('customers')
     cid = next_id(customers, 'customer_id')
     new = {
@@ -116,8 +1241,7 @@ def create_customer(full_name: str, email: str = '', phone: str = '', address: s
         'dob': dob,
         'created_at': _now_iso(),
     }
-    customers = pd.concat([customers, pd.DataFrame([new])], ignore_index=True)
-    write_df('customers', customers)
+    write_df('customers', _with_row('customers', customers, new))
     return cid
 
 def _generate_account_no(account_id: int) -> str:
@@ -127,6 +1251,11 @@ def _generate_account_no(account_id: int) -> str:
 
 
 def create_account(customer_id: int, account_type: str = 'SAVINGS', opening_deposit: float = 0.0) -> dict:
+    with locked('accounts', 'transactions'):
+        return _create_account(customer_id, account_type, opening_deposit)
+
+
+def _create_account(customer_id: int, account_type: str, opening_deposit: float) -> dict:
     accounts = read_df('accounts')
     aid = next_id(accounts, 'account_id')
     acc_no = _generate_account_no(aid)
@@ -135,83 +1264,244 @@ def create_account(customer_id: int, account_type: str = 'SAVINGS', opening_depo
         'customer_id': customer_id,
         'account_no': acc_no,
         'account_type': account_type,
-        'balance': float(opening_deposit),
+        'balance': 0.0,  # the opening deposit is posted below
         'status': 'ACTIVE',
         'created_at': _now_iso(),
         }
-    accounts = pd.concat([accounts, pd.DataFrame([new])], ignore_index=True)
-    write_df('accounts', accounts)
+    write_df('accounts', _with_row('accounts', accounts, new))
 
 
     if opening_deposit and float(opening_deposit) > 0:
-        record_transaction(aid, 'DEPOSIT', float(opening_deposit), note='Opening deposit')
+        txn = record_transaction(aid, 'DEPOSIT', float(opening_deposit), note='Opening deposit')
+        new['balance'] = txn['balance_after']
     return new
 
 def record_transaction(account_id: int, txn_type: str, amount: float, note: str = '') -> dict:
-# update balance in accounts and add row in transactions
-    accounts = read_df('accounts')
-    idx = accounts.index[accounts['account_id'] == str(account_id)]
-    if len(idx) == 0:
-        raise ValueError('Account not found')
-    i = idx[0]
-
-
-    curr_bal = float(accounts.at[i, 'balance'] or 0.0)
-    if txn_type == 'DEPOSIT':
-        new_bal = curr_bal + amount
-    elif txn_type == 'WITHDRAW':
-        if amount > curr_bal:
-            raise ValueError('Insufficient balance')
-        new_bal = curr_bal - amount
-    else:
-        raise ValueError('Invalid txn_type')
+    # Balance check and ledger append commit as one unit. Concurrent callers
+    # share a group commit; a thread already holding the store locks (e.g.
+    # create_account) posts directly.
+    if config.JOURNAL_GROUP_COMMIT and not _holds_lock('transactions'):
+        return submit_transaction(account_id, txn_type, amount, note).result()
+    with locked('accounts', 'transactions'):
+        result = _post([(account_id, txn_type, amount, note)])[0]
+    if isinstance(result, Exception):
+        raise result
+    _maybe_compact()
+    return result
 
 
-    accounts.at[i, 'balance'] = new_bal
-    write_df('accounts', accounts)
+# ---------- Batch postings ----------
 
 
-    txns = read_df('transactions')
-    tid = next_id(txns, 'txn_id')
-    new_txn = {
-        'txn_id': tid,
-        'account_id': account_id,
-        'txn_type': txn_type,
-        'amount': float(amount),
-        'balance_after': new_bal,
-        'note': note,
-        'created_at': _now_iso(),
-    }
-    txns = pd.concat([txns, pd.DataFrame([new_txn])], ignore_index=True)
-    write_df('transactions', txns)
-    return new_txn
+def record_transactions_batch(postings) -> pd.DataFrame:
+    # postings: iterable of dicts, DataFrame or .csv/.parquet path with
+    # account_id, txn_type, amount[, note]. All accepted rows commit in one
+    # ledger append; returns the per-row report.
+    df = batch.load_postings(postings)
+    with locked('accounts', 'transactions'):
+        accounts = read_df('accounts')
+        balances = dict(zip(accounts['account_id'].tolist(), accounts['balance'].tolist()))
+        report = batch.plan_postings(df, balances)
+        report['txn_id'] = pd.array([pd.NA] * len(report), dtype='Int64')
+        accepted = report.index[report['status'] == 'ACCEPTED']
+        if len(accepted) == 0:
+            return report
+        first = allocate_id('transactions', 'txn_id', len(accepted))
+        report.loc[accepted, 'txn_id'] = range(first, first + len(accepted))
+        now = _now_iso()
+        txns = [{
+            'txn_id': int(r.txn_id),
+            'account_id': int(r.account_id),
+            'txn_type': r.txn_type,
+            'amount': float(r.amount),
+            'balance_after': float(r.balance_after),
+            'note': r.note,
+            'created_at': now,
+        } for r in report.loc[accepted].itertuples(index=False)]
+        _commit_posting(txns)
+    _maybe_compact()
+    return report
+
 
 # ---------- Listing helpers ----------
 
 def list_customers() -> pd.DataFrame:
-    return read_df('customers')
+    return schema.to_public('customers', read_df('customers'))
 
 def list_accounts() -> pd.DataFrame:
-    df = read_df('accounts')
-    if 'balance' in df.columns:
-        df['balance'] = pd.to_numeric(df['balance'], errors='coerce').fillna(0.0)
-    return df
+    return schema.to_public('accounts', read_df('accounts'))
+
+# ---------- Paging & search ----------
+# Pages fetch one page plus the total row count instead of whole tables, so
+# only page_size rows are sent to the browser.
+
+
+PAGE_SIZE = 50
+
+
+def page_bounds(total: int, page: int, page_size: int) -> tuple:
+    # (start, stop) row slice of a 1-based page, clamped to the last page
+    page_size = max(1, int(page_size))
+    pages = max(1, -(-int(total) // page_size))
+    start = (min(max(1, int(page)), pages) - 1) * page_size
+    return start, start + page_size
+
+
+def query_page(name: str, page: int = 1, page_size: int = PAGE_SIZE, where: dict = None, order_by: str = '',
+               descending: bool = False) -> tuple:
+    # (one page in the public shape, number of matching rows). where holds
+    # column == value filters; the first one is served by its hash index.
+    where = dict(where or {})
+    if where:
+        col = next(iter(where))
+        df, pos = _positions(name, col, where.pop(col))
+        df = df.iloc[pos]
+        for col, value in where.items():
+            try:
+                df = df[df[col] == _index_key(df, col, value)]
+            except (TypeError, ValueError):
+                df = df.iloc[:0]
+        if order_by:
+            df = df.sort_values(order_by, ascending=not descending, kind='stable')
+        elif descending:
+            df = df.iloc[::-1]
+    elif order_by:
+        df, (_, order) = _sorted_index(name, order_by)
+        df = df.iloc[order[::-1] if descending else order]
+    else:
+        df = _load(name)['df']
+        df = df.iloc[::-1] if descending else df
+    start, stop = page_bounds(len(df), page, page_size)
+    return schema.to_public(name, df.iloc[start:stop]), len(df)
+
+
+def search_accounts(prefix: str = '', limit: int = 20) -> tuple:
+    # (accounts whose account_no starts with prefix, ordered by account_no and
+    # capped at limit, number of matches); binary search on the sorted account_no index
+    prefix = str(prefix or '').strip().upper()
+    df, (values, order) = _sorted_index('accounts', 'account_no')
+    lo = int(np.searchsorted(values, prefix, side='left'))
+    hi = int(np.searchsorted(values, prefix + '\U0010ffff', side='left')) if prefix else len(values)
+    return schema.to_public('accounts', df.iloc[order[lo:min(hi, lo + int(limit))]]), hi - lo
+
+
+def transactions_page(account_id: int, start_iso: str = '', end_iso: str = '', page: int = 1,
+                      page_size: int = PAGE_SIZE) -> tuple:
+    # (one page of the account's statement rows, oldest first, total rows in the period)
+    offs, lo, hi, exact = _ledger_span(account_id, start_iso, end_iso)
+    if not exact:
+        tx = transactions_for_account(account_id, start_iso, end_iso)
+        start, stop = page_bounds(len(tx), page, page_size)
+        return tx.iloc[start:stop], len(tx)
+    # Ledger rows are in time order, so only the page's records are read;
+    # archived rows come first and their segments are opened only for pages that show them
+    archived = _archived_count(account_id, start_iso, end_iso)
+    start, stop = page_bounds(archived + hi - lo, page, page_size)
+    tx = read_ledger_rows(offs[lo + max(0, start - archived):lo + max(0, stop - archived)].tolist())
+    if start < archived:
+        older = _archived_rows(account_id, start_iso, end_iso).iloc[start:stop]
+        tx = schema.normalize('transactions', pd.concat([older, tx])) if len(tx) else older
+    return prepare_transactions(tx), archived + hi - lo
+
+
+def period_summary(account_id: int, start_iso: str = '', end_iso: str = '') -> dict:
+    # {'rows', 'last_txn_id'} of the account's statement rows in the period;
+    # from the time index, reading at most the period's last ledger record
+    offs, lo, hi, exact = _ledger_span(account_id, start_iso, end_iso)
+    if not exact:
+        tx = transactions_for_account(account_id, start_iso, end_iso)
+        return {'rows': len(tx), 'last_txn_id': int(tx['txn_id'].iloc[-1]) if len(tx) else 0}
+    archived = _archived_count(account_id, start_iso, end_iso)
+    if hi > lo:
+        last = read_ledger_rows([offs[hi - 1]])
+    elif archived:
+        last = _archived_rows(account_id, start_iso, end_iso).iloc[-1:]
+    else:
+        last = None
+    return {'rows': archived + hi - lo, 'last_txn_id': int(last['txn_id'].iloc[-1]) if last is not None else 0}
+
 
 # ---------- Transactions querying ----------
 
 def transactions_for_account(account_id: int, start_iso: str = '', end_iso: str = '') -> pd.DataFrame:
-    tx = read_df('transactions')
-    if tx.empty:
-        return tx
-    tx = tx[tx['account_id'] == str(account_id)].copy()
-    if tx.empty:
-        return tx
-    tx['created_at'] = pd.to_datetime(tx['created_at'], errors='coerce')
-    tx = tx.sort_values('created_at')
-    if start_iso:
-        tx = tx[tx['created_at'] >= pd.to_datetime(start_iso, errors='coerce')]
-    if end_iso:
-        tx = tx[tx['created_at'] <= pd.to_datetime(end_iso, errors='coerce')]
-    tx['amount'] = pd.to_numeric(tx['amount'], errors='coerce').fillna(0.0)
-    tx['balance_after'] = pd.to_numeric(tx['balance_after'], errors='coerce').fillna(0.0)
-    return tx
+    archived = _archived_rows(account_id, start_iso, end_iso)
+    mirror = _columnar()
+    tx = mirror.transactions_for_account(account_id, start_iso, end_iso) if mirror else None
+    if tx is None:
+        offsets, exact = _ledger_range(account_id, start_iso, end_iso)
+        tx = read_ledger_rows(offsets)
+        if exact and archived is None:
+            return schema.to_public('transactions', tx)
+    if archived is not None:
+        tx = schema.normalize('transactions', pd.concat([archived, tx])) if len(tx) else archived
+    return prepare_transactions(tx, start_iso, end_iso)
+
+
+def period_key(iso: str) -> str:
+    # Period bounds compare on the wall-clock time as written in created_at
+    # ('YYYY-MM-DDTHH:MM:SS'), so dates picked in the UI match local postings.
+    if not iso:
+        return ''
+    ts = pd.to_datetime(iso, errors='coerce')
+    return '' if pd.isna(ts) else ts.strftime('%Y-%m-%dT%H:%M:%S')
+
+
+def prepare_transactions(tx: pd.DataFrame, start_iso: str = '', end_iso: str = '') -> pd.DataFrame:
+    # Shared by the storage backends: period-filter and sort typed ledger rows,
+    # returned with money in rupees
+    start, end = period_key(start_iso), period_key(end_iso)
+    if start:
+        tx = tx[tx['created_at'] >= pd.Timestamp(start)]
+    if end:
+        tx = tx[tx['created_at'] <= pd.Timestamp(end)]
+    return schema.to_public('transactions', tx.sort_values('created_at', kind='stable'))
+
+
+STREAM_CHUNK_ROWS = 1000  # archived rows converted at a time when streaming
+
+
+def _as_float(v) -> float:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _streamed_row(row: dict) -> dict:
+    # Raw ledger text -> the values transactions_for_account has (ids as int,
+    # money as float rupees); created_at stays the ledger text, as printed
+    for col in ('txn_id', 'account_id'):
+        row[col] = int(row[col]) if str(row.get(col, '')).strip() else None
+    row['amount'] = _as_float(row.get('amount'))
+    row['balance_after'] = _as_float(row.get('balance_after'))
+    return row
+
+
+def iter_transactions_for_account(account_id: int, start_iso: str = '', end_iso: str = ''):
+    # Streams the account's ledger rows (oldest first) as dicts, reading one
+    # record at a time through the offset index, and archived months one at a
+    # time in chunks; memory does not grow with the length of the history.
+    start, end = period_key(start_iso), period_key(end_iso)
+    for part in _archived_parts(account_id, start_iso, end_iso):
+        for i in range(0, len(part), STREAM_CHUNK_ROWS):
+            for row in schema.to_raw('transactions', part.iloc[i:i + STREAM_CHUNK_ROWS]).to_dict(orient='records'):
+                yield _streamed_row(row)
+    offs, lo, hi, exact = _ledger_span(account_id, start_iso, end_iso)
+    p = _path('transactions')
+    cols = _header(p)
+    with open(p, 'rb') as f:
+        for i in range(lo, hi):
+            rec = next(_scan_records(f, offs[i]))[1]
+            row = dict(zip(cols, next(csv.reader(io.StringIO(rec.decode('utf-8'))))))
+            if not exact:
+                # The account's clock went backwards: these are all its rows, in file order
+                when = row.get('created_at', '')[:19]
+                if (start and when < start) or (end and when > end):
+                    continue
+            yield _streamed_row(row)
+
+
+# ---------- Instrumentation ----------
+# Every public function above is timed under 'csv_store.<name>' (see utils/metrics.py)
+
+metrics.instrument(globals(), 'csv_store', exclude=('locked',))
@@ -0,0 +1,75 @@
+import threading
+import pandas as pd
+from utils import store
+
+
+# Account directory shared by the pages: accounts joined with their customer's
+# name, with the picker labels. Accounts are found through the store's
+# account_no index (store.search_accounts) and only the rows returned are
+# labelled, so a posting (which moves a balance, and with it the accounts
+# data version) costs no rebuild. The customer names are built once per data
+# version of customers.
+#
+#   label          BA-2025-0001 — Kumar Vishnu
+#   balance_label  BA-2025-0001 — SAVINGS — Balance: ₹1200.00
+
+
+_lock = threading.Lock()
+_cache = {}  # what -> (version key, value)
+
+
+def _cached(what: str, tables: tuple, build):
+    key = tuple(store.data_version(t) for t in tables)
+    with _lock:
+        hit = _cache.get(what)
+    if hit and hit[0] == key:
+        return hit[1]
+    value = build()
+    with _lock:
+        _cache[what] = (key, value)
+    return value
+
+
+def _build_names() -> pd.Series:
+    c = store.list_customers()
+    return pd.Series(c['full_name'].fillna('').astype(str).to_numpy(), index=c['customer_id'].to_numpy())
+
+
+def _labelled(accounts: pd.DataFrame) -> pd.DataFrame:
+    # A few account rows with their customer's name and the picker labels
+    names = _cached('names', ('customers',), _build_names)
+    d = accounts.copy()
+    d['full_name'] = d['customer_id'].map(names).fillna('').astype(str)
+    d['label'] = d['account_no'] + ' — ' + d['full_name']
+    d['balance_label'] = (d['account_no'] + ' — ' + d['account_type'].astype(str) + ' — Balance: ₹'
+                          + d['balance'].map('{:.2f}'.format))
+    return d
+
+
+def has_accounts() -> bool:
+    return store.search_accounts('', 1)[1] > 0
+
+
+def search(prefix: str = '', limit: int = 20) -> tuple:
+    # (directory rows whose account_no starts with prefix, number of matches);
+    # same contract as store.search_accounts, for utils.ui.account_picker
+    rows, total = store.search_accounts(prefix, limit)
+    return _labelled(rows), total
+
+
+def account_labels(account_ids) -> pd.Series:
+    # account_id -> label, for the given accounts only
+    accounts = store.list_accounts()
+    rows = _labelled(accounts[accounts['account_id'].isin(list(account_ids))])
+    return pd.Series(rows['label'].to_numpy(), index=rows['account_id'].to_numpy())
+
+
+def _build_customer_labels() -> pd.Series:
+    c = store.list_customers()
+    return pd.Series((c['full_name'].astype(str) + ' (ID ' + c['customer_id'].astype(str) + ')').to_numpy(),
+                     index=c['customer_id'].to_numpy())
+
+
+def customer_labels() -> pd.Series:
+    # customer_id -> 'Full Name (ID n)'
+    return _cached('customer_labels', ('customers',), _build_customer_labels)
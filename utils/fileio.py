@@ -0,0 +1,30 @@
+import os
+import tempfile
+
+
+# File helpers shared by the CSV store and the caches kept beside its data
+# (statement PDFs, analytics rollups, the ledger archive).
+#
+#   fileio.data_dir()                                 the CSV store's data directory
+#   fileio.atomic_write(path, lambda f: ..., binary)  all-or-nothing file replace
+
+
+def data_dir() -> str:
+    # Read on every call: benchmarks and tools point csv_store.DATA_DIR elsewhere
+    from utils import csv_store
+    return csv_store.DATA_DIR
+
+
+def atomic_write(p: str, write, binary: bool = False):
+    # write(f) fills a temp file in the same directory, which then replaces p
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(p), prefix=os.path.basename(p) + '.', suffix='.tmp')
+    try:
+        with (os.fdopen(fd, 'wb') if binary else os.fdopen(fd, 'w', newline='', encoding='utf-8')) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, p)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
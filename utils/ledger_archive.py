@@ -0,0 +1,220 @@
+import argparse
+import copy
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import sys
+from datetime import datetime
+import pandas as pd
+from utils import config
+from utils import csv_store
+from utils import fileio
+from utils import schema
+
+
+# Archival of closed months out of the hot ledger (CSV store). The oldest
+# rows of transactions.csv -- the ledger prefix created before the cutoff
+# month -- are written to immutable, gzip-compressed per-month segments under
+# data/archive/ and the hot file is rewritten to keep only the rest. The
+# manifest (data/archive/manifest.json) lists the segments with their time
+# range, row count and sha256, and carries forward per account the archived
+# row count, time span, last txn_id and closing balance. Reads pick segments
+# up transparently (see the ledger archive section of utils/csv_store.py).
+#
+#   python -m utils.ledger_archive archive [--keep-months N | --before YYYY-MM]
+#   python -m utils.ledger_archive status | verify
+#
+# The swap is crash-safe: an intent file (the new manifest plus the path of
+# the rewritten ledger) is written before the ledger is replaced, and startup
+# either completes the archival or drops its leftovers.
+
+
+MONTH = re.compile(r'\d{4}-\d{2}$')
+
+
+def cutoff_month(keep_months: int = None) -> str:
+    # First month kept hot: keep_months calendar months back, counting the current one
+    n = max(1, config.ARCHIVE_KEEP_MONTHS if keep_months is None else int(keep_months))
+    today = datetime.now()
+    m = today.year * 12 + today.month - 1 - (n - 1)
+    return f'{m // 12:04d}-{m % 12 + 1:02d}'
+
+
+def _time_keys(created_at: pd.Series) -> pd.Series:
+    # Vectorized csv_store._time_key
+    s = created_at.astype(str)
+    digits = s.str[0:4] + s.str[5:7] + s.str[8:10] + s.str[11:13] + s.str[14:16] + s.str[17:19]
+    return pd.to_numeric(digits, errors='coerce').fillna(0).astype('int64')
+
+
+def _write_segment(month: int, raw: pd.DataFrame) -> dict:
+    ids = pd.to_numeric(raw['txn_id'], errors='coerce').fillna(0).astype('int64')
+    name = f'transactions_{month // 100:04d}-{month % 100:02d}_{int(ids.iloc[0])}.csv.gz'
+    data = gzip.compress(raw.drop(columns=['_key']).to_csv(index=False, lineterminator='\n').encode('utf-8'), mtime=0)
+    p = os.path.join(csv_store.archive_dir(), name)
+    if os.path.exists(p):
+        os.chmod(p, 0o644)  # left by an archival that was rolled back
+    fileio.atomic_write(p, lambda f: f.write(data), binary=True)
+    os.chmod(p, 0o444)
+    return {
+        'file': name,
+        'month': f'{month // 100:04d}-{month % 100:02d}',
+        'rows': int(len(raw)),
+        'first_txn_id': int(ids.min()),
+        'last_txn_id': int(ids.max()),
+        'min_key': int(raw['_key'].min()),
+        'max_key': int(raw['_key'].max()),
+        'bytes': len(data),
+        'sha256': hashlib.sha256(data).hexdigest(),
+    }
+
+
+def _carry_forward(accounts: dict, typed: pd.DataFrame, keys: pd.Series):
+    # Folds the archived rows into the per-account carry-forward records (in place)
+    g = pd.DataFrame({'account_id': typed['account_id'], 'key': keys, 'txn_id': typed['txn_id'],
+                      'balance': typed['balance_after']}).groupby('account_id', sort=False)
+    summary = pd.DataFrame({'rows': g.size(), 'first_key': g['key'].min(), 'last_key': g['key'].max(),
+                            'last_txn_id': g['txn_id'].last(), 'balance': g['balance'].last()})
+    for aid, r in zip(summary.index.tolist(), summary.itertuples(index=False)):
+        old = accounts.get(str(aid))
+        accounts[str(aid)] = {
+            'rows': int(r.rows) + (old['rows'] if old else 0),
+            'first_key': min(int(r.first_key), old['first_key']) if old else int(r.first_key),
+            'last_key': max(int(r.last_key), old['last_key']) if old else int(r.last_key),
+            'last_txn_id': int(r.last_txn_id),
+            'balance': int(r.balance),
+        }
+
+
+def archive_ledger(before: str = '', keep_months: int = None) -> dict:
+    # Moves the ledger rows created before month `before` ('YYYY-MM', default
+    # from keep_months / config.ARCHIVE_KEEP_MONTHS) into segments
+    before = before or cutoff_month(keep_months)
+    if not MONTH.match(before) or before > datetime.now().strftime('%Y-%m'):
+        raise ValueError(f"Cutoff must be a month no later than the current one (YYYY-MM), got '{before}'")
+    cut_key = int(before.replace('-', '')) * 10 ** 8
+    csv_store.ensure_data_files()
+    os.makedirs(csv_store.archive_dir(), exist_ok=True)
+
+    with csv_store.locked('accounts', 'transactions'):
+        csv_store._recover_pending_posting()
+        csv_store._recover_archive()
+        # accounts.csv then holds every balance, so the rewritten ledger needs no journal replay
+        csv_store.compact_journal()
+        p = csv_store._path('transactions')
+        st = os.stat(p)
+        with open(p, 'rb') as f:
+            header = f.readline()
+        cut = csv_store.ledger_cut_offset(cut_key)
+        if cut <= len(header):
+            return {'before': before, 'rows': 0, 'segments': 0, 'hot_bytes': st.st_size}
+
+        with open(p, 'rb') as f:
+            prefix = f.read(cut)
+        raw = pd.read_csv(io.BytesIO(prefix), dtype=str, keep_default_na=False)
+        raw['_key'] = _time_keys(raw['created_at'])
+        typed = schema.to_typed('transactions', raw.drop(columns=['_key']))
+
+        manifest = copy.deepcopy(csv_store.archive_manifest())
+        months = raw['_key'] // 10 ** 8
+        segments = [_write_segment(int(m), raw[months == m]) for m in sorted(months.unique())]
+        _carry_forward(manifest['accounts'], typed, raw['_key'])
+
+        # The new hot ledger: header plus everything from the cut, written beside the old one
+        tmp = p + '.archive.tmp'
+        with open(p, 'rb') as src, open(tmp, 'wb') as dst:
+            dst.write(header)
+            src.seek(cut)
+            shutil.copyfileobj(src, dst, 1 << 20)
+            dst.flush()
+            os.fsync(dst.fileno())
+        manifest.update(
+            segments=manifest['segments'] + segments,
+            rows=manifest['rows'] + len(raw),
+            last_txn_id=max(manifest['last_txn_id'], max(s['last_txn_id'] for s in segments)),
+            before=before,
+            archived_at=csv_store._now_iso(),
+            rebase={'from_ino': st.st_ino, 'cut': cut, 'to_ino': os.stat(tmp).st_ino, 'header': len(header)},
+        )
+        csv_store._replace_text(csv_store._archive_intent_path(), json.dumps(dict(manifest, ledger_tmp=tmp)))
+        os.replace(tmp, p)
+        csv_store._replace_text(csv_store._manifest_path(), json.dumps(manifest))
+        os.remove(csv_store._archive_intent_path())
+        new = os.stat(p)
+        csv_store._write_ckpt(new.st_ino, new.st_size)
+        csv_store.bump_generation('transactions')
+    return {'before': before, 'rows': int(len(raw)), 'segments': len(segments),
+            'archived_bytes': cut - len(header), 'segment_bytes': sum(s['bytes'] for s in segments),
+            'hot_bytes': new.st_size}
+
+
+def status() -> dict:
+    m = csv_store.archive_manifest()
+    segs = m['segments']
+    return {
+        'segments': len(segs),
+        'rows': m['rows'],
+        'months': sorted({s['month'] for s in segs}),
+        'segment_bytes': sum(s['bytes'] for s in segs),
+        'accounts': len(m['accounts']),
+        'last_txn_id': m['last_txn_id'],
+        'hot_bytes': os.path.getsize(csv_store._path('transactions')),
+    }
+
+
+def verify() -> list:
+    # Problems found: missing or altered segments, row counts off the manifest
+    problems = []
+    m = csv_store.archive_manifest()
+    for seg in m['segments']:
+        p = os.path.join(csv_store.archive_dir(), seg['file'])
+        try:
+            with open(p, 'rb') as f:
+                data = f.read()
+        except OSError:
+            problems.append(f"{seg['file']}: missing")
+            continue
+        if hashlib.sha256(data).hexdigest() != seg['sha256']:
+            problems.append(f"{seg['file']}: checksum mismatch")
+            continue
+        rows = len(pd.read_csv(io.BytesIO(gzip.decompress(data)), dtype=str, keep_default_na=False))
+        if rows != seg['rows']:
+            problems.append(f"{seg['file']}: {rows} rows, manifest says {seg['rows']}")
+    if sum(a['rows'] for a in m['accounts'].values()) != m['rows']:
+        problems.append('carry-forward row counts do not add up to the archived rows')
+    return problems
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Archive closed months of the ledger into compressed segments.')
+    ap.add_argument('command', choices=('archive', 'status', 'verify'))
+    ap.add_argument('--keep-months', type=int, default=None,
+                    help=f'months kept in the hot ledger, counting the current one (default {config.ARCHIVE_KEEP_MONTHS})')
+    ap.add_argument('--before', default='', help='archive rows created before this month (YYYY-MM)')
+    args = ap.parse_args(argv)
+
+    csv_store.ensure_data_files()
+    if args.command == 'archive':
+        r = archive_ledger(args.before, args.keep_months)
+        if not r['rows']:
+            print(f"nothing to archive before {r['before']}")
+        else:
+            print(f"archived {r['rows']} rows before {r['before']} into {r['segments']} segment(s): "
+                  f"{r['archived_bytes']} -> {r['segment_bytes']} bytes; hot ledger now {r['hot_bytes']} bytes")
+        return 0
+    if args.command == 'status':
+        print(json.dumps(status(), indent=2))
+        return 0
+    problems = verify()
+    for line in problems:
+        print(line)
+    print(f"{len(csv_store.archive_manifest()['segments'])} segment(s) checked, {len(problems)} problem(s)")
+    return 0 if not problems else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
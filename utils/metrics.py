@@ -0,0 +1,188 @@
+import bisect
+import functools
+import inspect
+import threading
+import time
+from utils import config
+
+
+# In-process operation metrics: call counts, errors, latency histograms and
+# work counters (rows_read, rows_written, bytes_parsed) per operation.
+#
+#   @metrics.timed('pdf.build_statement_pdf')   one function
+#   metrics.instrument(globals(), 'csv_store')  every public function of a module
+#   metrics.add('rows_read', n)                 counted against the running operation
+#   metrics.snapshot()                          one dict per operation, with p50/p95/p99
+#
+# Off unless BANKING_METRICS=1 or enable() is called; while off, a wrapped
+# call costs one flag check.
+
+
+# Histogram bucket upper bounds in ms: 10 log-spaced buckets per decade, 1 us .. 100 s
+BOUNDS = tuple(10 ** (k / 10) for k in range(-30, 51))
+COUNTERS = ('rows_read', 'rows_written', 'bytes_parsed')
+
+_enabled = config.METRICS_ENABLED
+_lock = threading.Lock()
+_ops = {}
+_active = threading.local()
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable(flag: bool = True):
+    global _enabled
+    _enabled = bool(flag)
+
+
+def reset():
+    with _lock:
+        _ops.clear()
+
+
+def _op(name: str) -> dict:
+    op = _ops.get(name)
+    if op is None:
+        op = _ops[name] = {
+            'calls': 0, 'errors': 0, 'total_ms': 0.0, 'min_ms': None, 'max_ms': 0.0,
+            'buckets': [0] * (len(BOUNDS) + 1), 'counters': dict.fromkeys(COUNTERS, 0),
+        }
+    return op
+
+
+def observe(name: str, ms: float, error: bool = False):
+    if not _enabled:
+        return
+    with _lock:
+        op = _op(name)
+        op['calls'] += 1
+        op['errors'] += int(error)
+        op['total_ms'] += ms
+        op['min_ms'] = ms if op['min_ms'] is None else min(op['min_ms'], ms)
+        op['max_ms'] = max(op['max_ms'], ms)
+        op['buckets'][bisect.bisect_left(BOUNDS, ms)] += 1
+
+
+def add(counter: str, n: int):
+    # Adds to the innermost operation running on this thread (if any)
+    if not _enabled:
+        return
+    stack = getattr(_active, 'stack', None)
+    if not stack:
+        return
+    _count(stack[-1], counter, n)
+
+
+def _count(name: str, counter: str, n: int):
+    with _lock:
+        counters = _op(name)['counters']
+        counters[counter] = counters.get(counter, 0) + int(n)
+
+
+class _Span:
+    __slots__ = ('name', 't0')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        stack = getattr(_active, 'stack', None)
+        if stack is None:
+            stack = _active.stack = []
+        stack.append(self.name)
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ms = (time.perf_counter() - self.t0) * 1000
+        _active.stack.pop()
+        observe(self.name, ms, error=exc_type is not None)
+        return False
+
+
+def span(name: str):
+    # Context manager timing a block as operation `name`
+    return _Span(name)
+
+
+def timed(name: str):
+    def wrap(fn):
+        if inspect.isgeneratorfunction(fn):
+            # Generators are timed over the whole iteration; yielded items count as
+            # rows_read. They may be resumed on different threads, so the timing
+            # is kept locally and never enters the thread's operation stack.
+            @functools.wraps(fn)
+            def gen_wrapper(*args, **kwargs):
+                if not _enabled:
+                    yield from fn(*args, **kwargs)
+                    return
+                t0, n, error = time.perf_counter(), 0, True
+                try:
+                    for item in fn(*args, **kwargs):
+                        n += 1
+                        yield item
+                    error = False
+                except GeneratorExit:
+                    error = False  # closed early by the consumer
+                    raise
+                finally:
+                    observe(name, (time.perf_counter() - t0) * 1000, error=error)
+                    _count(name, 'rows_read', n)
+            return gen_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return wrap
+
+
+def instrument(namespace: dict, prefix: str, exclude=()):
+    # Replaces every public function defined in the module owning `namespace`
+    # with a timed wrapper named '<prefix>.<function>'
+    module = namespace['__name__']
+    for attr, fn in list(namespace.items()):
+        if attr.startswith('_') or attr in exclude or not inspect.isfunction(fn) or fn.__module__ != module:
+            continue
+        namespace[attr] = timed(f'{prefix}.{attr}')(fn)
+
+
+def _percentile(op: dict, q: float) -> float:
+    rank = q * op['calls']
+    seen = 0
+    for i, n in enumerate(op['buckets']):
+        if n and seen + n >= rank:
+            lo = BOUNDS[i - 1] if i > 0 else 0.0
+            hi = BOUNDS[i] if i < len(BOUNDS) else op['max_ms']
+            est = lo + (hi - lo) * (rank - seen) / n
+            return round(min(max(est, op['min_ms']), op['max_ms']), 3)
+        seen += n
+    return round(op['max_ms'], 3)
+
+
+def snapshot() -> list:
+    # One dict per operation, slowest total first
+    with _lock:
+        ops = {name: dict(op, buckets=list(op['buckets']), counters=dict(op['counters'])) for name, op in _ops.items()}
+    out = []
+    for name, op in ops.items():
+        if not op['calls']:
+            continue
+        out.append({
+            'operation': name,
+            'calls': op['calls'],
+            'errors': op['errors'],
+            'total_ms': round(op['total_ms'], 3),
+            'mean_ms': round(op['total_ms'] / op['calls'], 3),
+            'p50_ms': _percentile(op, 0.50),
+            'p95_ms': _percentile(op, 0.95),
+            'p99_ms': _percentile(op, 0.99),
+            'max_ms': round(op['max_ms'], 3),
+            **op['counters'],
+        })
+    return sorted(out, key=lambda r: r['total_ms'], reverse=True)
@@ -0,0 +1,157 @@
+import functools
+import itertools
+import os
+import queue
+import threading
+import time
+from utils import config
+from utils import metrics
+from utils import store
+
+
+# In-process posting service for the Deposit/Withdraw pages. submit() puts a
+# posting on a bounded queue and returns a ticket at once; one worker thread
+# per process drains the queue in arrival order, so the page never waits on
+# store I/O. With a backend that has a group-commit writer (csv), every
+# posting drained is handed to it at once and the tickets complete from its
+# futures, so postings waiting together share one ledger append; other
+# backends get one store.record_transaction call per posting.
+#
+#   ticket = posting_queue.submit(account_id, 'DEPOSIT', 500.0, note='cash')
+#   posting_queue.status(ticket)   {'state': 'queued' | 'running' | 'done' | 'failed', 'txn', 'error', ...}
+#   posting_queue.wait(ticket, 1)  same, after waiting up to 1 s for it to finish
+#   posting_queue.stats()          depth, capacity, totals, rejections, wait times
+#
+# When POSTING_QUEUE_MAX postings are waiting or in flight, submit() raises
+# QueueFullError instead of blocking the page (backpressure). Finished tickets are kept for POSTING_TICKET_TTL
+# seconds so the page can pick up the result on a later rerun.
+
+
+class QueueFullError(RuntimeError):
+    pass
+
+
+_lock = threading.Lock()
+_done = threading.Condition(_lock)
+_tickets = {}  # ticket -> status dict
+_ids = itertools.count(1)
+_worker = {'pid': None, 'queue': None}
+_stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'rejected': 0, 'max_depth': 0, 'in_flight': 0}
+
+
+def _queue() -> queue.Queue:
+    with _lock:
+        if _worker['pid'] != os.getpid():
+            # First use in this process (or a forked child): start its own worker
+            q = queue.Queue(maxsize=max(1, config.POSTING_QUEUE_MAX))
+            threading.Thread(target=_work, args=(q,), name='posting-queue', daemon=True).start()
+            _worker.update(pid=os.getpid(), queue=q)
+        return _worker['queue']
+
+
+def _prune(now: float):
+    # Caller holds _lock
+    expired = [t for t, s in _tickets.items() if s['finished_at'] and now - s['finished_at'] > config.POSTING_TICKET_TTL]
+    for t in expired:
+        del _tickets[t]
+
+
+def submit(account_id: int, txn_type: str, amount: float, note: str = '') -> str:
+    q = _queue()
+    now = time.time()
+    with _lock:
+        _prune(now)
+        if _stats['in_flight'] >= max(1, config.POSTING_QUEUE_MAX):
+            _stats['rejected'] += 1
+            raise QueueFullError('Too many postings are waiting; please try again in a moment.')
+        _stats['in_flight'] += 1
+        ticket = f'{os.getpid()}-{next(_ids)}'
+        _tickets[ticket] = {
+            'ticket': ticket, 'state': 'queued', 'account_id': account_id, 'txn_type': txn_type,
+            'amount': amount, 'txn': None, 'error': None, 'submitted_at': now, 'finished_at': None,
+        }
+    try:
+        q.put_nowait((ticket, (account_id, txn_type, amount, note), time.perf_counter()))
+    except queue.Full:
+        with _lock:
+            del _tickets[ticket]
+            _stats['rejected'] += 1
+            _stats['in_flight'] -= 1
+        raise QueueFullError('Too many postings are waiting; please try again in a moment.')
+    with _lock:
+        _stats['submitted'] += 1
+        _stats['max_depth'] = max(_stats['max_depth'], _stats['in_flight'])
+    return ticket
+
+
+def _finish(ticket: str, started: float, txn, error):
+    metrics.observe('posting_queue.post', (time.perf_counter() - started) * 1000, error=error is not None)
+    with _lock:
+        s = _tickets.get(ticket)
+        if s is not None:
+            s.update(state='failed' if error else 'done', txn=txn, error=error, finished_at=time.time())
+        _stats['failed' if error else 'completed'] += 1
+        _stats['in_flight'] -= 1
+        _done.notify_all()
+
+
+def _finished(ticket: str, started: float, fut):
+    # Runs on the store's writer thread once the posting is durable (or refused)
+    e = fut.exception()
+    _finish(ticket, started, None if e else fut.result(), (str(e) or type(e).__name__) if e else None)
+
+
+def _work(q: queue.Queue):
+    post = getattr(store.backend, 'submit_transaction', None) if config.JOURNAL_GROUP_COMMIT else None
+    while True:
+        batch = [q.get()]
+        while True:
+            try:
+                batch.append(q.get_nowait())
+            except queue.Empty:
+                break
+        for ticket, (account_id, txn_type, amount, note), queued_at in batch:
+            started = time.perf_counter()
+            metrics.observe('posting_queue.wait', (started - queued_at) * 1000)
+            with _lock:
+                if ticket in _tickets:
+                    _tickets[ticket]['state'] = 'running'
+            try:
+                if post is not None:
+                    post(account_id, txn_type, amount, note).add_done_callback(functools.partial(_finished, ticket, started))
+                    continue
+                txn, error = store.record_transaction(account_id, txn_type, amount, note=note), None
+            except Exception as e:
+                txn, error = None, str(e) or type(e).__name__
+            _finish(ticket, started, txn, error)
+
+
+def status(ticket: str) -> dict:
+    # Copy of the ticket's status; state 'unknown' for expired or foreign tickets
+    with _lock:
+        s = _tickets.get(ticket)
+        return dict(s) if s is not None else {'ticket': ticket, 'state': 'unknown', 'txn': None, 'error': None}
+
+
+def wait(ticket: str, timeout: float = None) -> dict:
+    deadline = None if timeout is None else time.monotonic() + timeout
+    with _lock:
+        while ticket in _tickets and _tickets[ticket]['state'] in ('queued', 'running'):
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            _done.wait(remaining)
+    return status(ticket)
+
+
+def stats() -> dict:
+    q = _worker['queue'] if _worker['pid'] == os.getpid() else None
+    with _lock:
+        now = time.time()
+        waiting = [s['submitted_at'] for s in _tickets.values() if s['state'] == 'queued']
+        return dict(
+            _stats,
+            depth=_stats['in_flight'] if q is not None else 0,
+            capacity=max(1, config.POSTING_QUEUE_MAX),
+            oldest_wait_ms=round((now - min(waiting)) * 1000, 1) if waiting else 0.0,
+        )
@@ -0,0 +1,164 @@
+import io
+import json
+import os
+import sys
+import time
+import pandas as pd
+from utils import csv_store
+from utils import schema
+
+
+# Ledger reconciliation for the CSV store. The ledger (transactions.csv) is
+# the source of truth; accounts.csv balances are checked against it.
+#
+#   rebuild_balances()   replays the whole ledger in chunks with a grouped
+#                        cumulative sum of amounts signed by txn_type, starting
+#                        from the carry-forward balances of archived months
+#   verify_incremental() starts from the last checkpoint and replays only the
+#                        ledger bytes appended since then
+#
+# A checkpoint (data/balance_checkpoints.json) stores, per account, the last
+# txn_id and balance at a known ledger byte offset. Clean runs advance it,
+# so a periodic verify (cron: python -m utils.reconcile verify) stays cheap.
+#
+#   python -m utils.reconcile verify | rebuild
+
+
+CHUNK_ROWS = 500_000
+
+
+def _checkpoint_path() -> str:
+    return os.path.join(csv_store.DATA_DIR, 'balance_checkpoints.json')
+
+
+def load_checkpoint():
+    p = _checkpoint_path()
+    if not os.path.exists(p):
+        return None
+    with open(p, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_checkpoint(ledger_ino: int, ledger_size: int, balances: dict, last_txn: dict):
+    ckpt = {
+        'ledger_ino': ledger_ino,
+        'ledger_size': ledger_size,
+        'created_at': csv_store._now_iso(),
+        'accounts': {str(a): [int(last_txn.get(a, 0)), int(b)] for a, b in balances.items()},
+    }
+    csv_store._replace_text(_checkpoint_path(), json.dumps(ckpt))
+
+
+class _Window(io.RawIOBase):
+    # Read-only view of bytes [start, end) of a file, so pandas parses
+    # exactly the ledger range that was snapshotted
+    def __init__(self, f, start: int, end: int):
+        f.seek(start)
+        self.f, self.left = f, end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        n = min(len(b), self.left)
+        data = self.f.read(n)
+        b[:len(data)] = data
+        self.left -= len(data)
+        return len(data)
+
+
+def _snapshot():
+    # Accounts, ledger end offset and the archive's carry-forward balances
+    # taken together under the writer lock; ledger bytes before that offset
+    # never change afterwards.
+    p = csv_store._path('transactions')
+    with csv_store.locked('accounts', 'transactions'):
+        accounts = csv_store.read_df('accounts')
+        st = os.stat(p)
+        carried = csv_store.archived_balances()
+    return accounts, st.st_ino, st.st_size, carried
+
+
+def _replay(start: int, end: int, balances: dict, last_txn: dict) -> dict:
+    # Applies ledger bytes [start, end) to balances/last_txn in place (paise);
+    # returns {account_id: rows whose balance_after disagrees with the replay}
+    breaks = {}
+    if end <= start:
+        return breaks
+    p = csv_store._path('transactions')
+    cols = csv_store._header(p)
+    with open(p, 'rb') as f:
+        src = io.BufferedReader(_Window(f, start, end))
+        reader = pd.read_csv(src, dtype=str, keep_default_na=False, chunksize=CHUNK_ROWS,
+                             header=0 if start == 0 else None, names=None if start == 0 else cols)
+        for chunk in reader:
+            tx = schema.to_typed('transactions', chunk)
+            signed = tx['amount'].where(tx['txn_type'] == 'DEPOSIT', -tx['amount'])
+            base = tx['account_id'].map(balances).fillna(0).astype('int64')
+            running = base + signed.groupby(tx['account_id']).cumsum()
+            bad = (running != tx['balance_after']).groupby(tx['account_id']).sum()
+            for a, n in bad[bad > 0].items():
+                breaks[a] = breaks.get(a, 0) + int(n)
+            balances.update(running.groupby(tx['account_id']).last().to_dict())
+            last_txn.update(tx['txn_id'].groupby(tx['account_id']).last().to_dict())
+    return breaks
+
+
+def _report(accounts: pd.DataFrame, balances: dict, last_txn: dict, breaks: dict) -> pd.DataFrame:
+    aid = accounts['account_id']
+    expected = aid.map(balances).fillna(0).astype('int64')
+    report = pd.DataFrame({
+        'account_id': aid,
+        'account_no': accounts['account_no'],
+        'recorded': accounts['balance'] / 100,
+        'expected': expected / 100,
+        'drift': (accounts['balance'] - expected) / 100,
+        'last_txn_id': aid.map(last_txn).fillna(0).astype('int64'),
+        'chain_breaks': aid.map(breaks).fillna(0).astype('int64'),
+    })
+    report['ok'] = (report['drift'] == 0) & (report['chain_breaks'] == 0)
+    return report.reset_index(drop=True)
+
+
+def rebuild_balances(checkpoint: bool = True) -> pd.DataFrame:
+    accounts, ino, size, (balances, last_txn) = _snapshot()
+    # Archived months are not replayed: the hot ledger starts from their closing balances
+    breaks = _replay(0, size, balances, last_txn)
+    report = _report(accounts, balances, last_txn, breaks)
+    if checkpoint and report['ok'].all():
+        save_checkpoint(ino, size, balances, last_txn)
+    return report
+
+
+def verify_incremental(advance: bool = True) -> pd.DataFrame:
+    ckpt = load_checkpoint()
+    accounts, ino, size, _ = _snapshot()
+    if not ckpt or ckpt['ledger_ino'] != ino or ckpt['ledger_size'] > size:
+        # No usable checkpoint (first run, or the ledger file was replaced)
+        return rebuild_balances(checkpoint=advance)
+    balances = {int(a): v[1] for a, v in ckpt['accounts'].items()}
+    last_txn = {int(a): v[0] for a, v in ckpt['accounts'].items()}
+    breaks = _replay(ckpt['ledger_size'], size, balances, last_txn)
+    report = _report(accounts, balances, last_txn, breaks)
+    if advance and report['ok'].all():
+        save_checkpoint(ino, size, balances, last_txn)
+    return report
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    mode = argv[0] if argv else 'verify'
+    if mode not in ('verify', 'rebuild'):
+        print('usage: python -m utils.reconcile [verify|rebuild]')
+        return 2
+    t0 = time.perf_counter()
+    report = verify_incremental() if mode == 'verify' else rebuild_balances()
+    bad = report[~report['ok']]
+    print(f'{mode}: {len(report)} accounts, {len(bad)} with drift ({time.perf_counter() - t0:.2f}s)')
+    if not bad.empty:
+        print(bad.to_string(index=False))
+    return 0 if bad.empty else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
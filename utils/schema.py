@@ -0,0 +1,134 @@
+import pandas as pd
+
+
+# Typed in-memory representation of the store tables. Files keep their CSV
+# text format; to_typed parses a table once at load time and to_raw turns a
+# typed frame back into the exact CSV text for writes.
+#
+#   ids        -> int64 (nullable Int64 where blank is allowed)
+#   money      -> int64 paise (fixed point, 1 rupee = 100)
+#   timestamps -> datetime64 of the wall-clock time as written, plus a
+#                 categorical '<col>_offset' with the UTC offset suffix
+#   enums      -> category
+
+
+ID, OPT_ID, FLAG, MONEY, TIMESTAMP, CATEGORY, TEXT = 'id', 'opt_id', 'flag', 'money', 'timestamp', 'category', 'text'
+
+SCHEMAS = {
+    'users': {
+        'user_id': ID, 'username': TEXT, 'password': TEXT, 'linked_customer_id': OPT_ID, 'is_active': FLAG,
+    },
+    'customers': {
+        'customer_id': ID, 'full_name': TEXT, 'email': TEXT, 'phone': TEXT, 'address': TEXT, 'dob': TEXT,
+        'created_at': TIMESTAMP,
+    },
+    'accounts': {
+        'account_id': ID, 'customer_id': ID, 'account_no': TEXT, 'account_type': CATEGORY, 'balance': MONEY,
+        'status': CATEGORY, 'created_at': TIMESTAMP,
+    },
+    'transactions': {
+        'txn_id': ID, 'account_id': ID, 'txn_type': CATEGORY, 'amount': MONEY, 'balance_after': MONEY,
+        'note': TEXT, 'created_at': TIMESTAMP,
+    },
+}
+
+OFFSET = '_offset'
+TS_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+
+def kind(name: str, col: str) -> str:
+    return SCHEMAS.get(name, {}).get(col, TEXT)
+
+
+def money_columns(name: str) -> list:
+    return [c for c, k in SCHEMAS.get(name, {}).items() if k == MONEY]
+
+
+def to_paise(values) -> pd.Series:
+    amount = pd.to_numeric(pd.Series(values), errors='coerce').fillna(0.0)
+    return (amount * 100).round().astype('int64')
+
+
+def paise(amount: float) -> int:
+    return int(round(float(amount or 0.0) * 100))
+
+
+def rupees(p) -> float:
+    return p / 100
+
+
+def to_typed(name: str, raw: pd.DataFrame) -> pd.DataFrame:
+    # raw: all-string frame as read from CSV (blank cells as '')
+    out = {}
+    for col in raw.columns:
+        s = raw[col]
+        k = kind(name, col)
+        if k == ID:
+            out[col] = pd.to_numeric(s, errors='coerce').fillna(0).astype('int64')
+        elif k == OPT_ID:
+            out[col] = pd.to_numeric(s, errors='coerce').astype('Int64')
+        elif k == FLAG:
+            out[col] = pd.to_numeric(s, errors='coerce').fillna(0).astype('int8')
+        elif k == MONEY:
+            out[col] = to_paise(s).set_axis(raw.index)
+        elif k == CATEGORY:
+            out[col] = s.astype('category')
+        elif k == TIMESTAMP:
+            s = s.astype(str)
+            out[col] = pd.to_datetime(s.str[:19], format='ISO8601', errors='coerce')
+            out[col + OFFSET] = s.str[19:].astype('category')
+        else:
+            out[col] = s.astype(object)
+    return pd.DataFrame(out, index=raw.index)
+
+
+def normalize(name: str, df: pd.DataFrame) -> pd.DataFrame:
+    # Re-applies category dtypes after a concat merged differing categories
+    for col in df.columns:
+        if (kind(name, col) == CATEGORY or col.endswith(OFFSET)) and df[col].dtype != 'category':
+            df[col] = df[col].astype('category')
+    return df
+
+
+def to_raw(name: str, df: pd.DataFrame) -> pd.DataFrame:
+    # Inverse of to_typed: the all-string frame written to the CSV file
+    out = {}
+    for col in df.columns:
+        if col.endswith(OFFSET) and col[:-len(OFFSET)] in df.columns:
+            continue
+        s = df[col]
+        k = kind(name, col)
+        if k == MONEY:
+            out[col] = (s.astype('int64') / 100).astype(str)
+        elif k == TIMESTAMP:
+            offset = df[col + OFFSET].astype(str) if col + OFFSET in df.columns else ''
+            text = s.dt.strftime(TS_FORMAT) + offset
+            out[col] = text.where(s.notna(), '')
+        elif k == OPT_ID:
+            out[col] = s.astype(object).where(s.notna(), '').astype(str)
+        else:
+            out[col] = s.astype(object).where(s.notna(), '').astype(str)
+    return pd.DataFrame(out, index=df.index)
+
+
+def to_public(name: str, df: pd.DataFrame) -> pd.DataFrame:
+    # Shape handed to pages: money as float rupees, no offset sidecars
+    df = df.drop(columns=[c for c in df.columns if c.endswith(OFFSET)])
+    for col in money_columns(name):
+        if col in df.columns:
+            df[col] = df[col] / 100
+    return df
+
+
+def public_row(name: str, df: pd.DataFrame):
+    # First row as a dict; timestamps as written in the file (ISO text with
+    # the UTC offset), the shape single-row lookups have always returned
+    if df.empty:
+        return None
+    first = df.iloc[[0]]
+    row = to_public(name, first).iloc[0].to_dict()
+    stamps = [c for c in first.columns if kind(name, c) == TIMESTAMP]
+    if stamps:
+        raw = to_raw(name, first[stamps + [c + OFFSET for c in stamps if c + OFFSET in first.columns]])
+        row.update(raw.iloc[0].to_dict())
+    return row
@@ -0,0 +1,488 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+import pandas as pd
+from utils import config
+from utils import auth
+from utils import batch
+from utils import csv_store
+from utils import metrics
+from utils import schema
+
+
+# SQLite implementation of the store API (see utils/store.py). Same function
+# names, arguments and return shapes as utils/csv_store.py; tables are typed
+# and indexed, the database runs in WAL mode behind a small connection pool.
+
+
+FILES = csv_store.FILES
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL,
+    password TEXT NOT NULL,
+    linked_customer_id INTEGER,
+    is_active INTEGER NOT NULL DEFAULT 1
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_users_username ON users(username);
+
+CREATE TABLE IF NOT EXISTS customers (
+    customer_id INTEGER PRIMARY KEY,
+    full_name TEXT NOT NULL,
+    email TEXT, phone TEXT, address TEXT, dob TEXT,
+    created_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS accounts (
+    account_id INTEGER PRIMARY KEY,
+    customer_id INTEGER NOT NULL,
+    account_no TEXT,
+    account_type TEXT,
+    balance REAL NOT NULL DEFAULT 0,
+    status TEXT,
+    created_at TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_accounts_account_no ON accounts(account_no);
+CREATE INDEX IF NOT EXISTS ix_accounts_customer_id ON accounts(customer_id);
+
+CREATE TABLE IF NOT EXISTS transactions (
+    txn_id INTEGER PRIMARY KEY,
+    account_id INTEGER NOT NULL,
+    txn_type TEXT NOT NULL,
+    amount REAL NOT NULL,
+    balance_after REAL NOT NULL,
+    note TEXT,
+    created_at TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_transactions_account ON transactions(account_id, txn_id);
+
+CREATE TABLE IF NOT EXISTS table_versions (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# users/customers/accounts bump a version counter on every change (see
+# data_version); the append-only ledger is versioned by its highest txn_id.
+VERSIONED = ('users', 'customers', 'accounts')
+SCHEMA += ''.join(
+    f"INSERT OR IGNORE INTO table_versions (name, version) VALUES ('{t}', 0);\n"
+    + ''.join(
+        f'CREATE TRIGGER IF NOT EXISTS tv_{t}_{op.lower()} AFTER {op} ON {t} BEGIN '
+        f"UPDATE table_versions SET version = version + 1 WHERE name = '{t}'; END;\n"
+        for op in ('INSERT', 'UPDATE', 'DELETE'))
+    for t in VERSIONED)
+
+COLUMNS = {
+    'users': ['user_id', 'username', 'password', 'linked_customer_id', 'is_active'],
+    'customers': ['customer_id', 'full_name', 'email', 'phone', 'address', 'dob', 'created_at'],
+    'accounts': ['account_id', 'customer_id', 'account_no', 'account_type', 'balance', 'status', 'created_at'],
+    'transactions': ['txn_id', 'account_id', 'txn_type', 'amount', 'balance_after', 'note', 'created_at'],
+}
+
+# Statements are constant strings with ? parameters, so sqlite3's per-connection
+# statement cache prepares each of them once.
+SQL = {
+    'validate_user': 'SELECT user_id, username, linked_customer_id, password FROM users WHERE username = ? AND is_active = 1',
+    'get_customer': 'SELECT * FROM customers WHERE customer_id = ?',
+    'accounts_for_customer': 'SELECT * FROM accounts WHERE customer_id = ? ORDER BY account_id',
+    'get_account_by_no': 'SELECT * FROM accounts WHERE account_no = ?',
+    'insert_customer': 'INSERT INTO customers (full_name, email, phone, address, dob, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+    'insert_account': 'INSERT INTO accounts (customer_id, account_type, balance, status, created_at) VALUES (?, ?, ?, ?, ?)',
+    'set_account_no': 'UPDATE accounts SET account_no = ? WHERE account_id = ?',
+    'get_balance': 'SELECT balance FROM accounts WHERE account_id = ?',
+    'set_balance': 'UPDATE accounts SET balance = ? WHERE account_id = ?',
+    'insert_txn': 'INSERT INTO transactions (account_id, txn_type, amount, balance_after, note, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+    'transactions_for_account': 'SELECT * FROM transactions WHERE account_id = ? ORDER BY txn_id',
+    'all_balances': 'SELECT account_id, balance FROM accounts',
+    'insert_txn_with_id': 'INSERT INTO transactions (txn_id, account_id, txn_type, amount, balance_after, note, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+    'max_txn_id': 'SELECT COALESCE(MAX(txn_id), 0) FROM transactions',
+    'transactions_since': 'SELECT * FROM transactions WHERE txn_id > ? ORDER BY txn_id',
+}
+
+
+# ---------- Connection pool ----------
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def db_path() -> str:
+    return config.SQLITE_PATH or os.path.join(csv_store.DATA_DIR, 'bank.db')
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False, cached_statements=256)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA busy_timeout=30000')
+    return conn
+
+
+@contextmanager
+def _conn():
+    path = db_path()
+    with _pools_lock:
+        pool = _pools.setdefault(path, queue.LifoQueue())
+    try:
+        conn = pool.get_nowait()
+    except queue.Empty:
+        conn = _connect(path)
+    try:
+        yield conn
+    finally:
+        if pool.qsize() < config.SQLITE_POOL_SIZE:
+            pool.put(conn)
+        else:
+            conn.close()
+
+
+@contextmanager
+def _write_txn():
+    # BEGIN IMMEDIATE takes the write lock up front, so read-check-update
+    # sequences (balance checks) cannot interleave across sessions/processes.
+    with _conn() as conn:
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+
+def _as_str(v) -> str:
+    return '' if v is None else str(v)
+
+
+def _query_df(conn, sql: str, params=()) -> pd.DataFrame:
+    cur = conn.execute(sql, params)
+    cols = [c[0] for c in cur.description]
+    rows = [[_as_str(v) for v in r] for r in cur.fetchall()]
+    metrics.add('rows_read', len(rows))
+    return pd.DataFrame(rows, columns=cols, dtype=str)
+
+
+def _typed_query(conn, name: str, sql: str, params=()) -> pd.DataFrame:
+    return schema.to_typed(name, _query_df(conn, sql, params))
+
+
+# ---------- Core helpers ----------
+
+
+_init_lock = threading.Lock()
+_initialized = set()  # database files already set up by this process
+
+
+def ensure_data_files():
+    # Schema setup and first-start import run once per process and database;
+    # pages call this on every rerun
+    path = db_path()
+    if path in _initialized:
+        return
+    with _init_lock:
+        if path in _initialized:
+            return
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with _conn() as conn:
+            conn.executescript(SCHEMA)
+        with _write_txn() as conn:
+            if conn.execute('SELECT COUNT(*) FROM users').fetchone()[0] == 0:
+                _import_csv_tables(conn)
+        _initialized.add(path)
+
+
+def _import_csv_tables(conn):
+    # First start: take over whatever the CSV store holds (or its defaults)
+    csv_store.ensure_data_files()
+    for name, cols in COLUMNS.items():
+        _insert_df(conn, name, schema.to_raw(name, csv_store.read_df(name)))
+
+
+def _insert_df(conn, name: str, df: pd.DataFrame):
+    # df: all-string frame in CSV text form (see schema.to_raw)
+    cols = COLUMNS[name]
+    marks = ', '.join('?' * len(cols))
+    rows = [[None if v == '' else v for v in r] for r in df[cols].fillna('').astype(str).itertuples(index=False)]
+    conn.executemany(f'INSERT INTO {name} ({", ".join(cols)}) VALUES ({marks})', rows)
+
+
+def read_df(name: str) -> pd.DataFrame:
+    if name not in COLUMNS:
+        raise KeyError(name)
+    with _conn() as conn:
+        return _typed_query(conn, name, f'SELECT {", ".join(COLUMNS[name])} FROM {name}')
+
+
+def write_df(name: str, df: pd.DataFrame):
+    if name not in COLUMNS:
+        raise KeyError(name)
+    with _write_txn() as conn:
+        conn.execute(f'DELETE FROM {name}')
+        _insert_df(conn, name, schema.to_raw(name, df))
+
+
+def ledger_since(cursor: dict = None) -> tuple:
+    # (typed ledger rows with txn_id past the cursor, new cursor, full); same
+    # contract as csv_store.ledger_since
+    path = db_path()
+    with _conn() as conn:
+        last = conn.execute(SQL['max_txn_id']).fetchone()[0]
+        full = not cursor or cursor.get('db') != path or cursor['txn_id'] > last
+        since = 0 if full else cursor['txn_id']
+        tx = _typed_query(conn, 'transactions', SQL['transactions_since'], (since,))
+    return tx, {'db': path, 'txn_id': int(tx['txn_id'].max()) if len(tx) else since}, full
+
+
+def read_ledger(start_iso: str = '', end_iso: str = '') -> pd.DataFrame:
+    # Typed ledger rows created in [start, end], oldest first; the table keeps the whole history
+    start, end = csv_store.period_key(start_iso), csv_store.period_key(end_iso)
+    where_sql, params = '', []
+    if start:
+        where_sql, params = ' WHERE substr(created_at, 1, 19) >= ?', [start]
+    if end:
+        where_sql, params = where_sql + (' AND' if where_sql else ' WHERE') + ' substr(created_at, 1, 19) <= ?', params + [end]
+    with _conn() as conn:
+        return _typed_query(conn, 'transactions', f'SELECT * FROM transactions{where_sql} ORDER BY txn_id', params)
+
+
+def data_version(name: str) -> tuple:
+    # Changes whenever the table changes; cheap enough to call on every page run
+    if name not in COLUMNS:
+        raise KeyError(name)
+    with _conn() as conn:
+        if name == 'transactions':
+            v = conn.execute(SQL['max_txn_id']).fetchone()[0]
+        else:
+            v = conn.execute('SELECT version FROM table_versions WHERE name = ?', (name,)).fetchone()[0]
+    return (db_path(), v)
+
+
+# ---------- Auth (demo) ----------
+
+
+def validate_user(username: str, password: str):
+    with _conn() as conn:
+        r = conn.execute(SQL['validate_user'], (username,)).fetchone()
+    if not auth.verify_password(password, None if r is None else r[3]):
+        return None
+    return {
+    'user_id': int(r[0]),
+    'username': r[1],
+    'linked_customer_id': int(r[2]) if r[2] is not None and str(r[2]).strip() else None,
+    }
+
+
+# ---------- Query helpers ----------
+
+
+def get_customer(customer_id: int):
+    with _conn() as conn:
+        row = _typed_query(conn, 'customers', SQL['get_customer'], (int(customer_id),))
+    return schema.public_row('customers', row)
+
+
+def accounts_for_customer(customer_id: int) -> pd.DataFrame:
+    with _conn() as conn:
+        return schema.to_public('accounts', _typed_query(conn, 'accounts', SQL['accounts_for_customer'], (int(customer_id),)))
+
+
+def get_account_by_no(account_no: str):
+    with _conn() as conn:
+        row = _typed_query(conn, 'accounts', SQL['get_account_by_no'], (account_no,))
+    return schema.public_row('accounts', row)
+
+
+# ---------- Create operations ----------
+
+
+def create_customer(full_name: str, email: str = '', phone: str = '', address: str = '', dob: str = '') -> int:
+    with _write_txn() as conn:
+        cur = conn.execute(SQL['insert_customer'], (full_name, email, phone, address, dob, csv_store._now_iso()))
+        return int(cur.lastrowid)
+
+
+def create_account(customer_id: int, account_type: str = 'SAVINGS', opening_deposit: float = 0.0) -> dict:
+    created_at = csv_store._now_iso()
+    with _write_txn() as conn:
+        cur = conn.execute(SQL['insert_account'], (int(customer_id), account_type, 0.0, 'ACTIVE', created_at))
+        aid = int(cur.lastrowid)
+        acc_no = csv_store._generate_account_no(aid)
+        conn.execute(SQL['set_account_no'], (acc_no, aid))
+    new = {
+        'account_id': aid,
+        'customer_id': customer_id,
+        'account_no': acc_no,
+        'account_type': account_type,
+        'balance': float(opening_deposit),
+        'status': 'ACTIVE',
+        'created_at': created_at,
+        }
+
+    if opening_deposit and float(opening_deposit) > 0:
+        record_transaction(aid, 'DEPOSIT', float(opening_deposit), note='Opening deposit')
+    return new
+
+
+def record_transaction(account_id: int, txn_type: str, amount: float, note: str = '') -> dict:
+    with _write_txn() as conn:
+        r = conn.execute(SQL['get_balance'], (int(account_id),)).fetchone()
+        if r is None:
+            raise ValueError('Account not found')
+        # Balance arithmetic in fixed-point paise, stored as rupees
+        curr_bal = schema.paise(r[0])
+        amt = schema.paise(amount)
+        if txn_type == 'DEPOSIT':
+            new_bal = curr_bal + amt
+        elif txn_type == 'WITHDRAW':
+            if amt > curr_bal:
+                raise ValueError('Insufficient balance')
+            new_bal = curr_bal - amt
+        else:
+            raise ValueError('Invalid txn_type')
+
+        created_at = csv_store._now_iso()
+        conn.execute(SQL['set_balance'], (schema.rupees(new_bal), int(account_id)))
+        cur = conn.execute(SQL['insert_txn'], (int(account_id), txn_type, schema.rupees(amt), schema.rupees(new_bal), note, created_at))
+    return {
+        'txn_id': int(cur.lastrowid),
+        'account_id': account_id,
+        'txn_type': txn_type,
+        'amount': schema.rupees(amt),
+        'balance_after': schema.rupees(new_bal),
+        'note': note,
+        'created_at': created_at,
+    }
+
+
+# ---------- Batch postings ----------
+
+
+def record_transactions_batch(postings) -> pd.DataFrame:
+    df = batch.load_postings(postings)
+    with _write_txn() as conn:
+        balances = {int(a): schema.paise(b) for a, b in conn.execute(SQL['all_balances'])}
+        report = batch.plan_postings(df, balances)
+        report['txn_id'] = pd.array([pd.NA] * len(report), dtype='Int64')
+        accepted = report.index[report['status'] == 'ACCEPTED']
+        if len(accepted) == 0:
+            return report
+        first = conn.execute(SQL['max_txn_id']).fetchone()[0] + 1
+        report.loc[accepted, 'txn_id'] = range(first, first + len(accepted))
+        now = csv_store._now_iso()
+        conn.executemany(SQL['insert_txn_with_id'], [
+            (int(r.txn_id), int(r.account_id), r.txn_type, float(r.amount), float(r.balance_after), r.note, now)
+            for r in report.loc[accepted].itertuples(index=False)
+        ])
+        conn.executemany(SQL['set_balance'], [(schema.rupees(b), int(a)) for a, b in batch.final_balances(report).items()])
+    return report
+
+
+# ---------- Listing helpers ----------
+
+
+def list_customers() -> pd.DataFrame:
+    return schema.to_public('customers', read_df('customers'))
+
+
+def list_accounts() -> pd.DataFrame:
+    return schema.to_public('accounts', read_df('accounts'))
+
+
+# ---------- Paging & search ----------
+
+
+def _page(conn, name: str, where_sql: str, params: list, order_sql: str, page: int, page_size: int) -> tuple:
+    total = conn.execute(f'SELECT COUNT(*) FROM {name}{where_sql}', params).fetchone()[0]
+    start, stop = csv_store.page_bounds(total, page, page_size)
+    sql = f'SELECT {", ".join(COLUMNS[name])} FROM {name}{where_sql}{order_sql} LIMIT ? OFFSET ?'
+    return _typed_query(conn, name, sql, params + [stop - start, start]), total
+
+
+def query_page(name: str, page: int = 1, page_size: int = csv_store.PAGE_SIZE, where: dict = None, order_by: str = '',
+               descending: bool = False) -> tuple:
+    if name not in COLUMNS:
+        raise KeyError(name)
+    where = where or {}
+    for col in list(where) + ([order_by] if order_by else []):
+        if col not in COLUMNS[name]:
+            raise KeyError(col)
+    where_sql = ' WHERE ' + ' AND '.join(f'{c} = ?' for c in where) if where else ''
+    order_sql = f' ORDER BY {order_by or COLUMNS[name][0]}{" DESC" if descending else ""}'
+    if order_by:
+        order_sql += f', {COLUMNS[name][0]}'
+    with _conn() as conn:
+        df, total = _page(conn, name, where_sql, [str(v) for v in where.values()], order_sql, page, page_size)
+    return schema.to_public(name, df), total
+
+
+def search_accounts(prefix: str = '', limit: int = 20) -> tuple:
+    # Range scan on the unique account_no index
+    prefix = str(prefix or '').strip().upper()
+    with _conn() as conn:
+        df, total = _page(conn, 'accounts', ' WHERE account_no >= ? AND account_no < ?', [prefix, prefix + '\U0010ffff'],
+                          ' ORDER BY account_no', 1, limit)
+    return schema.to_public('accounts', df), total
+
+
+def _period_where(account_id: int, start_iso: str, end_iso: str) -> tuple:
+    start, end = csv_store.period_key(start_iso), csv_store.period_key(end_iso)
+    where_sql, params = ' WHERE account_id = ?', [int(account_id)]
+    if start:
+        where_sql, params = where_sql + ' AND substr(created_at, 1, 19) >= ?', params + [start]
+    if end:
+        where_sql, params = where_sql + ' AND substr(created_at, 1, 19) <= ?', params + [end]
+    return where_sql, params
+
+
+def transactions_page(account_id: int, start_iso: str = '', end_iso: str = '', page: int = 1,
+                      page_size: int = csv_store.PAGE_SIZE) -> tuple:
+    where_sql, params = _period_where(account_id, start_iso, end_iso)
+    with _conn() as conn:
+        tx, total = _page(conn, 'transactions', where_sql, params, ' ORDER BY txn_id', page, page_size)
+    return csv_store.prepare_transactions(tx), total
+
+
+def period_summary(account_id: int, start_iso: str = '', end_iso: str = '') -> dict:
+    where_sql, params = _period_where(account_id, start_iso, end_iso)
+    with _conn() as conn:
+        rows, last = conn.execute(f'SELECT COUNT(*), MAX(txn_id) FROM transactions{where_sql}', params).fetchone()
+    return {'rows': int(rows), 'last_txn_id': int(last or 0)}
+
+
+# ---------- Transactions querying ----------
+
+
+def transactions_for_account(account_id: int, start_iso: str = '', end_iso: str = '') -> pd.DataFrame:
+    with _conn() as conn:
+        tx = _typed_query(conn, 'transactions', SQL['transactions_for_account'], (int(account_id),))
+    return csv_store.prepare_transactions(tx, start_iso, end_iso)
+
+
+def iter_transactions_for_account(account_id: int, start_iso: str = '', end_iso: str = ''):
+    start, end = csv_store.period_key(start_iso), csv_store.period_key(end_iso)
+    with _conn() as conn:
+        cur = conn.execute(SQL['transactions_for_account'], (int(account_id),))
+        cols = [c[0] for c in cur.description]
+        while True:
+            chunk = cur.fetchmany(1000)
+            if not chunk:
+                break
+            for r in chunk:
+                row = {c: _as_str(v) for c, v in zip(cols, r)}
+                when = row['created_at'][:19]
+                if (start and when < start) or (end and when > end):
+                    continue
+                row['txn_id'], row['account_id'] = int(r[cols.index('txn_id')]), int(r[cols.index('account_id')])
+                row['amount'] = float(r[cols.index('amount')] or 0.0)
+                row['balance_after'] = float(r[cols.index('balance_after')] or 0.0)
+                yield row
+
+
+# ---------- Instrumentation ----------
+
+metrics.instrument(globals(), 'sqlite_store')
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from utils import config
+from utils import csv_store
+from utils import fileio
+from utils import metrics
+from utils import store
+from utils.pdf import build_statement_pdf
+
+
+# Rendered statement PDFs, keyed by what they show: account, period, the
+# labels printed on them and the ledger state of that period (its row count
+# and last txn_id, from store.period_summary). A repeat download is a
+# dict lookup; a posting inside the period changes the key, so a stale PDF is
+# never served. Recent statements are kept in memory (LRU, capped in MB);
+# statements of closed periods (ending before now, so no new posting can
+# fall inside) are also written to data/statement_cache/ and survive restarts.
+#
+#   statement_cache.statement_pdf(bank, account_id, account_no, name, start_iso, end_iso, period)
+#   statement_cache.stats()   hits, disk_hits, misses, entries and bytes in memory
+
+
+FORMAT = 1  # bump when the PDF layout changes, so cached files are not reused
+
+_lock = threading.Lock()
+_memory = OrderedDict()  # key -> pdf bytes
+_state = {'bytes': 0, 'hits': 0, 'disk_hits': 0, 'misses': 0}
+
+
+def cache_dir() -> str:
+    return os.path.join(fileio.data_dir(), 'statement_cache')
+
+
+def _key(bank_name: str, account_id: int, account_no: str, cust_name: str, start_iso: str, end_iso: str,
+         period: str) -> str:
+    ledger = store.period_summary(account_id, start_iso, end_iso)
+    parts = [FORMAT, bank_name, int(account_id), account_no, cust_name, csv_store.period_key(start_iso),
+             csv_store.period_key(end_iso), period, ledger['last_txn_id'], ledger['rows']]
+    return hashlib.sha256(json.dumps(parts).encode('utf-8')).hexdigest()
+
+
+def _closed(end_iso: str) -> bool:
+    end = csv_store.period_key(end_iso)
+    return bool(end) and end < datetime.now().strftime('%Y-%m-%dT%H:%M:%S')
+
+
+def _remember(key: str, pdf: bytes):
+    cap = config.STATEMENT_CACHE_MB * 1024 * 1024
+    if len(pdf) > cap:
+        return
+    with _lock:
+        old = _memory.pop(key, None)
+        if old is not None:
+            _state['bytes'] -= len(old)
+        _memory[key] = pdf
+        _state['bytes'] += len(pdf)
+        while _state['bytes'] > cap:
+            _, evicted = _memory.popitem(last=False)
+            _state['bytes'] -= len(evicted)
+
+
+def _disk_get(key: str):
+    p = os.path.join(cache_dir(), f'{key}.pdf')
+    try:
+        with open(p, 'rb') as f:
+            pdf = f.read()
+        os.utime(p)  # recently used files are pruned last
+        return pdf
+    except OSError:
+        return None
+
+
+def _disk_put(key: str, pdf: bytes):
+    d = cache_dir()
+    try:
+        os.makedirs(d, exist_ok=True)
+        fileio.atomic_write(os.path.join(d, f'{key}.pdf'), lambda f: f.write(pdf), binary=True)
+        _prune_disk(d)
+    except OSError:
+        pass  # only a cache; the statement is rendered again next time
+
+
+def _prune_disk(d: str):
+    # Least recently used files go first once the directory is over its cap
+    files = []
+    for entry in os.scandir(d):
+        if entry.name.endswith('.pdf'):
+            st = entry.stat()
+            files.append((st.st_mtime, st.st_size, entry.path))
+    total = sum(size for _, size, _ in files)
+    cap = config.STATEMENT_CACHE_DISK_MB * 1024 * 1024
+    for _, size, path in sorted(files):
+        if total <= cap:
+            break
+        os.remove(path)
+        total -= size
+
+
+@metrics.timed('statement_cache.statement_pdf')
+def statement_pdf(bank_name: str, account_id: int, account_no: str, cust_name: str, start_iso: str = '',
+                  end_iso: str = '', period: str = '') -> bytes:
+    key = _key(bank_name, account_id, account_no, cust_name, start_iso, end_iso, period)
+    with _lock:
+        pdf = _memory.get(key)
+        if pdf is not None:
+            _memory.move_to_end(key)
+            _state['hits'] += 1
+            return pdf
+    closed = _closed(end_iso)
+    pdf = _disk_get(key) if closed else None
+    if pdf is not None:
+        with _lock:
+            _state['disk_hits'] += 1
+    else:
+        with _lock:
+            _state['misses'] += 1
+        # Stream ledger rows straight into the PDF instead of materializing them
+        rows = store.iter_transactions_for_account(account_id, start_iso, end_iso)
+        pdf = build_statement_pdf(bank_name, account_no, cust_name, rows, period=period)
+        if closed:
+            _disk_put(key, pdf)
+    _remember(key, pdf)
+    return pdf
+
+
+def stats() -> dict:
+    with _lock:
+        lookups = _state['hits'] + _state['disk_hits'] + _state['misses']
+        return {
+            'hits': _state['hits'],
+            'disk_hits': _state['disk_hits'],
+            'misses': _state['misses'],
+            'hit_rate': round((_state['hits'] + _state['disk_hits']) / lookups, 3) if lookups else 0.0,
+            'entries': len(_memory),
+            'bytes': _state['bytes'],
+            'max_bytes': config.STATEMENT_CACHE_MB * 1024 * 1024,
+        }
+
+
+def clear():
+    # Empties the memory cache and resets the counters; files on disk are kept
+    with _lock:
+        _memory.clear()
+        _state.update(bytes=0, hits=0, disk_hits=0, misses=0)
@@ -0,0 +1,103 @@
+import argparse
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from utils import schema
+from utils import store
+from utils.pdf import build_statement_pdf
+
+
+# Month-end bulk statements: one PDF per account for a period, rendered in a
+# process pool. The ledger is read and grouped by account once; workers only
+# receive their own rows.
+#
+#   python -m utils.statement_export --start 2025-10-01 --end 2025-10-31 --out statements/
+#   python -m utils.statement_export --start 2025-10-01 --end 2025-10-31 --zip statements.zip
+
+
+BANK_NAME = 'Streamlit Bank'
+
+
+def _render(job: dict):
+    pdf = build_statement_pdf(BANK_NAME, job['account_no'], job['customer_name'], job['rows'], period=job['period'])
+    name = f"statement_{job['account_no']}.pdf"
+    if job['out_dir']:
+        with open(os.path.join(job['out_dir'], name), 'wb') as f:
+            f.write(pdf)
+        return name, None
+    return name, pdf
+
+
+def _ledger_by_account(account_ids: set, start_iso: str, end_iso: str) -> dict:
+    # The period's rows only, including archived months it reaches back into
+    tx = store.read_ledger(start_iso, end_iso)
+    tx = tx[tx['account_id'].isin(account_ids)].sort_values('txn_id')
+    # created_at as written in the ledger, the text streamed statements print
+    stamps = [c for c in ('created_at', 'created_at' + schema.OFFSET) if c in tx.columns]
+    created = schema.to_raw('transactions', tx[stamps])['created_at']
+    tx = schema.to_public('transactions', tx).assign(created_at=created)
+    cols = ['created_at', 'txn_type', 'amount', 'balance_after', 'note']
+    return {aid: g[cols].to_dict(orient='records') for aid, g in tx.groupby('account_id', sort=False)}
+
+
+def export_statements(start_iso: str = '', end_iso: str = '', account_nos=None, out_dir: str = '', zip_path: str = '',
+                      workers: int = 0, skip_empty: bool = False) -> dict:
+    accounts = store.list_accounts()
+    if account_nos:
+        accounts = accounts[accounts['account_no'].isin(set(account_nos))]
+    customers = store.list_customers()
+    names = dict(zip(customers['customer_id'], customers['full_name']))
+    ledger = _ledger_by_account(set(accounts['account_id']), start_iso, end_iso)
+    period = f"{start_iso or 'beginning'} to {end_iso or 'now'}" if (start_iso or end_iso) else ''
+
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    jobs = []
+    for acc in accounts[['account_id', 'account_no', 'customer_id']].itertuples(index=False):
+        rows = ledger.get(acc.account_id, [])
+        if skip_empty and not rows:
+            continue
+        jobs.append({
+            'account_no': acc.account_no,
+            'customer_name': names.get(acc.customer_id, ''),
+            'rows': rows,
+            'period': period,
+            'out_dir': '' if zip_path else out_dir,
+        })
+
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers or None) as ex:
+        results = ex.map(_render, jobs, chunksize=max(1, len(jobs) // (4 * (workers or os.cpu_count() or 1))))
+        if zip_path:
+            with zipfile.ZipFile(zip_path, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+                for name, pdf in results:
+                    zf.writestr(name, pdf)
+        else:
+            for _ in results:
+                pass
+    return {'statements': len(jobs), 'seconds': round(time.perf_counter() - t0, 3), 'output': zip_path or out_dir}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Generate account statements for a period in bulk.')
+    ap.add_argument('--start', default='', help='period start, YYYY-MM-DD')
+    ap.add_argument('--end', default='', help='period end, YYYY-MM-DD (inclusive)')
+    ap.add_argument('--accounts', default='', help='comma-separated account numbers (default: all)')
+    ap.add_argument('--out', default='statements', help='output directory for the PDFs')
+    ap.add_argument('--zip', default='', help='write a single zip archive instead of a directory')
+    ap.add_argument('--workers', type=int, default=0, help='worker processes (default: CPU count)')
+    ap.add_argument('--skip-empty', action='store_true', help='skip accounts without transactions in the period')
+    args = ap.parse_args(argv)
+
+    end_iso = f'{args.end}T23:59:59' if len(args.end) == 10 else args.end
+    store.ensure_data_files()
+    result = export_statements(args.start, end_iso, [a.strip() for a in args.accounts.split(',') if a.strip()],
+                               out_dir=args.out, zip_path=args.zip, workers=args.workers, skip_empty=args.skip_empty)
+    print(f"{result['statements']} statements in {result['seconds']}s -> {result['output']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,72 @@
+import importlib
+from utils import config
+
+
+# Storage backend selection. Pages import the store API from here; the
+# implementation is picked once per process from config.STORE_BACKEND.
+# Every backend module provides all names in API with the same signatures.
+
+
+BACKENDS = {
+    'csv': 'utils.csv_store',
+    'sqlite': 'utils.sqlite_store',
+    'remote': 'utils.store_client',
+}
+
+API = (
+    'ensure_data_files',
+    'read_df',
+    'write_df',
+    'data_version',
+    'validate_user',
+    'get_customer',
+    'accounts_for_customer',
+    'get_account_by_no',
+    'create_customer',
+    'create_account',
+    'record_transaction',
+    'record_transactions_batch',
+    'list_customers',
+    'list_accounts',
+    'query_page',
+    'search_accounts',
+    'transactions_page',
+    'period_summary',
+    'transactions_for_account',
+    'iter_transactions_for_account',
+    'ledger_since',
+    'read_ledger',
+)
+
+
+def load_backend(name: str = ''):
+    name = name or config.STORE_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown store backend '{name}' (expected one of: {', '.join(BACKENDS)})")
+    return importlib.import_module(BACKENDS[name])
+
+
+backend = load_backend()
+
+ensure_data_files = backend.ensure_data_files
+read_df = backend.read_df
+write_df = backend.write_df
+data_version = backend.data_version
+validate_user = backend.validate_user
+get_customer = backend.get_customer
+accounts_for_customer = backend.accounts_for_customer
+get_account_by_no = backend.get_account_by_no
+create_customer = backend.create_customer
+create_account = backend.create_account
+record_transaction = backend.record_transaction
+record_transactions_batch = backend.record_transactions_batch
+list_customers = backend.list_customers
+list_accounts = backend.list_accounts
+query_page = backend.query_page
+search_accounts = backend.search_accounts
+transactions_page = backend.transactions_page
+period_summary = backend.period_summary
+transactions_for_account = backend.transactions_for_account
+iter_transactions_for_account = backend.iter_transactions_for_account
+ledger_since = backend.ledger_since
+read_ledger = backend.read_ledger
@@ -0,0 +1,335 @@
+import json
+import socket
+import struct
+import threading
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from utils import batch
+from utils import config
+from utils import metrics
+
+try:
+    import pyarrow as pa
+except ImportError:  # ships with streamlit; needed only by the remote backend
+    pa = None
+
+
+# Remote store backend (BANKING_STORE_BACKEND=remote): every store API call is
+# forwarded to the store server (python -m utils.store_server), the single
+# process that owns DATA_DIR. Any number of Streamlit workers, on this host or
+# others, can then share one data set: the server serializes writes and keeps
+# the only file caches, so no worker can act on stale balances.
+#
+# Wire format, both directions: a message is a JSON frame followed by the
+# binary frames it references, each frame prefixed with its 4-byte length.
+# DataFrames travel as Arrow IPC streams (dtypes and index preserved), so
+# nothing on the wire is executable. A request is
+#   {"op": "<API name>", "args": [...], "kwargs": {...}}
+# and its response {"ok": true, "result": ...} or {"ok": false, "error": "<type>", "message": "..."}.
+# Generator results arrive as several {"ok": true, "chunk": [...], "more": true}
+# messages. The first message on a connection is {"hello": "<BANKING_STORE_SERVER_TOKEN>"}.
+
+
+# ---------- Framing & encoding (shared with utils/store_server.py) ----------
+
+
+HEADER = struct.Struct('>I')
+CHUNK_ROWS = 1000  # rows per message when streaming a generator
+
+
+def parse_address(address: str):
+    # 'unix:/path/store.sock' -> (AF_UNIX, path); 'host:port' -> (AF_INET, (host, port))
+    if address.startswith('unix:'):
+        return socket.AF_UNIX, address[5:]
+    host, _, port = address.rpartition(':')
+    return socket.AF_INET, (host or '127.0.0.1', int(port))
+
+
+def _frame_to_bytes(df: pd.DataFrame) -> bytes:
+    if pa is None:
+        raise RuntimeError('pyarrow is required for the remote store (pip install pyarrow)')
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as w:
+        w.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _bytes_to_frame(data: bytes) -> pd.DataFrame:
+    if pa is None:
+        raise RuntimeError('pyarrow is required for the remote store (pip install pyarrow)')
+    return pa.ipc.open_stream(data).read_all().to_pandas()
+
+
+def encode(obj) -> list:
+    # [json frame, binary frames...]
+    blobs = []
+
+    def conv(o):
+        if o is None or isinstance(o, (bool, str)):
+            return o
+        if isinstance(o, (int, np.integer)):
+            return int(o)
+        if isinstance(o, (float, np.floating)):
+            return None if np.isnan(o) else float(o)
+        if isinstance(o, pd.DataFrame):
+            blobs.append(_frame_to_bytes(o))
+            return {'__frame__': len(blobs) - 1}
+        if isinstance(o, (bytes, bytearray)):
+            blobs.append(bytes(o))
+            return {'__bytes__': len(blobs) - 1}
+        if isinstance(o, tuple):
+            return {'__tuple__': [conv(v) for v in o]}
+        if isinstance(o, (list, np.ndarray)):
+            return [conv(v) for v in o]
+        if isinstance(o, dict):
+            if all(isinstance(k, str) for k in o):
+                return {k: conv(v) for k, v in o.items()}
+            return {'__dict__': [[conv(k), conv(v)] for k, v in o.items()]}
+        if o is pd.NaT or o is pd.NA:
+            return None
+        if isinstance(o, (pd.Timestamp, datetime)):
+            return {'__ts__': o.isoformat()}
+        raise TypeError(f'cannot send {type(o).__name__} to the store')
+
+    head = json.dumps(conv(obj), separators=(',', ':')).encode('utf-8')
+    return [json.dumps({'frames': len(blobs)}).encode('utf-8'), head] + blobs
+
+
+def decode(head: bytes, blobs: list):
+    def conv(o):
+        if isinstance(o, list):
+            return [conv(v) for v in o]
+        if not isinstance(o, dict):
+            return o
+        if '__frame__' in o:
+            return _bytes_to_frame(blobs[o['__frame__']])
+        if '__bytes__' in o:
+            return blobs[o['__bytes__']]
+        if '__tuple__' in o:
+            return tuple(conv(v) for v in o['__tuple__'])
+        if '__dict__' in o:
+            return {conv(k): conv(v) for k, v in o['__dict__']}
+        if '__ts__' in o:
+            return pd.Timestamp(o['__ts__'])
+        return {k: conv(v) for k, v in o.items()}
+
+    return conv(json.loads(head))
+
+
+def pack(obj) -> bytes:
+    return b''.join(HEADER.pack(len(f)) + f for f in encode(obj))
+
+
+def _read_exact(sock: socket.socket, n: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(min(n - len(buf), 1 << 20))
+        if not chunk:
+            raise ConnectionError('store server closed the connection')
+        buf += chunk
+    return bytes(buf)
+
+
+def _read_frame(sock: socket.socket) -> bytes:
+    return _read_exact(sock, HEADER.unpack(_read_exact(sock, HEADER.size))[0])
+
+
+def read_message(sock: socket.socket):
+    meta = json.loads(_read_frame(sock))
+    head = _read_frame(sock)
+    return decode(head, [_read_frame(sock) for _ in range(meta['frames'])])
+
+
+# ---------- Connection ----------
+# One connection per thread; calls on it are sequential.
+
+
+ERRORS = {'ValueError': ValueError, 'KeyError': KeyError, 'TypeError': TypeError,
+          'FileNotFoundError': FileNotFoundError, 'PermissionError': PermissionError}
+
+_local = threading.local()
+
+
+def _connect() -> socket.socket:
+    family, addr = parse_address(config.STORE_SERVER_ADDRESS)
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.settimeout(config.STORE_CLIENT_TIMEOUT)
+    sock.connect(addr)
+    if family == socket.AF_INET:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.sendall(pack({'hello': config.STORE_SERVER_TOKEN}))
+    reply = read_message(sock)
+    if not reply.get('ok'):
+        sock.close()
+        raise PermissionError(reply.get('message', 'store server refused the connection'))
+    return sock
+
+
+def _socket() -> socket.socket:
+    sock = getattr(_local, 'sock', None)
+    if sock is None:
+        sock = _local.sock = _connect()
+    return sock
+
+
+def _drop():
+    sock = getattr(_local, 'sock', None)
+    _local.sock = None
+    if sock is not None:
+        sock.close()
+
+
+def _raise(reply: dict):
+    raise ERRORS.get(reply.get('error'), RuntimeError)(reply.get('message', 'store server error'))
+
+
+def _send(op: str, args: tuple, kwargs: dict) -> socket.socket:
+    msg = pack({'op': op, 'args': list(args), 'kwargs': kwargs})
+    try:
+        sock = _socket()
+        sock.sendall(msg)
+    except OSError:
+        # Stale connection (server restarted): nothing was sent, so one retry is safe
+        _drop()
+        sock = _socket()
+        sock.sendall(msg)
+    return sock
+
+
+def call(op: str, *args, **kwargs):
+    try:
+        reply = read_message(_send(op, args, kwargs))
+    except OSError:
+        _drop()
+        raise
+    if not reply.get('ok'):
+        _raise(reply)
+    return reply.get('result')
+
+
+def _stream(op: str, *args, **kwargs):
+    sock = _send(op, args, kwargs)
+    try:
+        while True:
+            reply = read_message(sock)
+            if not reply.get('ok'):
+                _raise(reply)
+            yield from reply.get('chunk', ())
+            if not reply.get('more'):
+                return
+    except GeneratorExit:
+        _drop()  # abandoned mid-stream: the rest of the reply is still in flight
+        raise
+    except OSError:
+        _drop()
+        raise
+
+
+# ---------- Store API ----------
+
+
+_initialized = set()
+
+
+def ensure_data_files():
+    # The server sets up its data once; this just checks it is reachable
+    if config.STORE_SERVER_ADDRESS not in _initialized:
+        call('ensure_data_files')
+        _initialized.add(config.STORE_SERVER_ADDRESS)
+
+
+def read_df(name: str) -> pd.DataFrame:
+    return call('read_df', name)
+
+
+def write_df(name: str, df: pd.DataFrame):
+    # Refused by the server (PermissionError): bulk writes run on the server host
+    call('write_df', name, df)
+
+
+def data_version(name: str) -> tuple:
+    return call('data_version', name)
+
+
+def validate_user(username: str, password: str):
+    return call('validate_user', username, password)
+
+
+def get_customer(customer_id: int):
+    return call('get_customer', customer_id)
+
+
+def accounts_for_customer(customer_id: int) -> pd.DataFrame:
+    return call('accounts_for_customer', customer_id)
+
+
+def get_account_by_no(account_no: str):
+    return call('get_account_by_no', account_no)
+
+
+def create_customer(full_name: str, email: str = '', phone: str = '', address: str = '', dob: str = '') -> int:
+    return call('create_customer', full_name, email, phone, address, dob)
+
+
+def create_account(customer_id: int, account_type: str = 'SAVINGS', opening_deposit: float = 0.0) -> dict:
+    return call('create_account', customer_id, account_type, opening_deposit)
+
+
+def record_transaction(account_id: int, txn_type: str, amount: float, note: str = '') -> dict:
+    return call('record_transaction', account_id, txn_type, amount, note)
+
+
+def record_transactions_batch(postings) -> pd.DataFrame:
+    # Paths are read here: the server may not see this machine's files
+    return call('record_transactions_batch', batch.load_postings(postings))
+
+
+def list_customers() -> pd.DataFrame:
+    return call('list_customers')
+
+
+def list_accounts() -> pd.DataFrame:
+    return call('list_accounts')
+
+
+def query_page(name: str, page: int = 1, page_size: int = 50, where: dict = None, order_by: str = '',
+               descending: bool = False) -> tuple:
+    return call('query_page', name, page, page_size, where, order_by, descending)
+
+
+def search_accounts(prefix: str = '', limit: int = 20) -> tuple:
+    return call('search_accounts', prefix, limit)
+
+
+def transactions_page(account_id: int, start_iso: str = '', end_iso: str = '', page: int = 1,
+                      page_size: int = 50) -> tuple:
+    return call('transactions_page', account_id, start_iso, end_iso, page, page_size)
+
+
+def period_summary(account_id: int, start_iso: str = '', end_iso: str = '') -> dict:
+    return call('period_summary', account_id, start_iso, end_iso)
+
+
+def transactions_for_account(account_id: int, start_iso: str = '', end_iso: str = '') -> pd.DataFrame:
+    return call('transactions_for_account', account_id, start_iso, end_iso)
+
+
+def iter_transactions_for_account(account_id: int, start_iso: str = '', end_iso: str = ''):
+    # Streamed in chunks of CHUNK_ROWS rows; memory stays flat like the local backends
+    yield from _stream('iter_transactions_for_account', account_id, start_iso, end_iso)
+
+
+def ledger_since(cursor: dict = None) -> tuple:
+    return call('ledger_since', cursor)
+
+
+def read_ledger(start_iso: str = '', end_iso: str = '') -> pd.DataFrame:
+    return call('read_ledger', start_iso, end_iso)
+
+
+# ---------- Instrumentation ----------
+# Round trips are timed under 'store_client.<name>' (see utils/metrics.py)
+
+metrics.instrument(globals(), 'store_client', exclude=('parse_address', 'encode', 'decode', 'pack', 'read_message', 'call'))
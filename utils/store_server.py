@@ -0,0 +1,228 @@
+import argparse
+import asyncio
+import functools
+import hmac
+import ipaddress
+import json
+import os
+import socket
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from utils import config
+from utils import store
+from utils.store_client import CHUNK_ROWS, HEADER, decode, pack, parse_address
+
+
+# Store server: the one process that owns DATA_DIR. Streamlit workers use
+# BANKING_STORE_BACKEND=remote (utils/store_client.py) and reach the store API
+# through it, so several workers -- on this host or others -- can run behind
+# a load balancer without racing on the files.
+#
+#   python -m utils.store_server                        listens on BANKING_STORE_SERVER (127.0.0.1:8765)
+#   python -m utils.store_server --address unix:/run/bank/store.sock
+#
+# Requests are handled on an asyncio loop; store calls run on a thread pool,
+# streamed results are drained on a thread of their own per stream,
+# and record_transaction is handed straight to the backend's group-commit
+# writer when it has one (csv), so postings arriving from all connections at
+# once are committed together in one ledger append. Set
+# BANKING_STORE_SERVER_TOKEN on the server and every worker; the server
+# refuses to listen beyond loopback without one.
+#
+# Requests are bounded before they are read: at most MAX_FRAMES frames and
+# STORE_SERVER_MAX_MESSAGE_MB in total (HELLO_MAX_BYTES for the handshake),
+# and once a message starts it must arrive within STORE_SERVER_READ_TIMEOUT;
+# the handshake as a whole must too. Otherwise the connection is closed.
+#
+# Bulk table access stays on the server host: write_df and read_df('users')
+# (password hashes) are refused over the wire. Logins go through validate_user.
+
+
+MAX_FRAMES = 64
+HELLO_MAX_BYTES = 4096
+
+
+class ProtocolError(ConnectionError):
+    pass
+
+
+async def _read_body(reader: asyncio.StreamReader, size: bytes, max_bytes: int):
+    total = 0
+
+    async def frame(header: bytes) -> bytes:
+        nonlocal total
+        n = HEADER.unpack(header)[0]
+        total += n
+        if total > max_bytes:
+            raise ProtocolError(f'message over {max_bytes} bytes')
+        return await reader.readexactly(n)
+
+    try:
+        meta = json.loads(await frame(size))
+        frames = meta['frames']
+    except (ValueError, TypeError, KeyError):
+        raise ProtocolError('malformed message header')
+    if not isinstance(frames, int) or not 0 <= frames <= MAX_FRAMES:
+        raise ProtocolError(f'message with {frames!r} frames')
+    head = await frame(await reader.readexactly(HEADER.size))
+    blobs = [await frame(await reader.readexactly(HEADER.size)) for _ in range(frames)]
+    try:
+        return decode(head, blobs)
+    except (ValueError, TypeError, KeyError, IndexError):
+        raise ProtocolError('malformed message')
+
+
+async def _read_message(reader: asyncio.StreamReader, max_bytes: int):
+    # Waits as long as the client stays idle; the message itself must then
+    # arrive within the read timeout
+    size = await reader.readexactly(HEADER.size)
+    return await asyncio.wait_for(_read_body(reader, size, max_bytes), config.STORE_SERVER_READ_TIMEOUT)
+
+
+async def _read_hello(reader: asyncio.StreamReader):
+    return await asyncio.wait_for(_read_message(reader, HELLO_MAX_BYTES), config.STORE_SERVER_READ_TIMEOUT)
+
+
+LOCAL_ONLY = ('write_df',)
+PRIVATE_TABLES = ('users',)
+
+
+def _check_op(op: str, args: list, kwargs: dict):
+    if op not in store.API:
+        raise ValueError(f"Unknown store operation '{op}'")
+    if op in LOCAL_ONLY:
+        raise PermissionError(f"'{op}' is not served remotely; run it on the store server host")
+    if op == 'read_df' and (args[0] if args else kwargs.get('name')) in PRIVATE_TABLES:
+        raise PermissionError('The users table is not served remotely')
+
+
+def _is_loopback(host: str) -> bool:
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class StoreServer:
+    def __init__(self, backend, threads: int = 8):
+        self.backend = backend
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='store-server')
+        self.submit = getattr(backend, 'submit_transaction', None) if config.JOURNAL_GROUP_COMMIT else None
+
+    async def _run(self, fn, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, functools.partial(fn, *args, **kwargs))
+
+    async def _reply(self, writer: asyncio.StreamWriter, msg: dict):
+        writer.write(await self._run(pack, msg))
+        await writer.drain()
+
+    async def _stream(self, writer: asyncio.StreamWriter, rows):
+        # One message per CHUNK_ROWS rows. The generator runs on one thread of
+        # its own from start to close (it may hold thread-bound state such as
+        # an open file or a metrics timing), a couple of chunks ahead of the socket.
+        loop = asyncio.get_running_loop()
+        chunks = asyncio.Queue(maxsize=2)
+        stop = threading.Event()
+
+        def drain():
+            try:
+                while not stop.is_set():
+                    chunk = list(islice(rows, CHUNK_ROWS))
+                    asyncio.run_coroutine_threadsafe(chunks.put((chunk, None)), loop).result()
+                    if len(chunk) < CHUNK_ROWS:
+                        return
+            except Exception as e:
+                asyncio.run_coroutine_threadsafe(chunks.put((None, e)), loop)
+            finally:
+                rows.close()
+
+        threading.Thread(target=drain, name='store-server-stream', daemon=True).start()
+        try:
+            while True:
+                chunk, error = await chunks.get()
+                if error is not None:
+                    raise error
+                more = len(chunk) == CHUNK_ROWS
+                await self._reply(writer, {'ok': True, 'chunk': chunk, 'more': more})
+                if not more:
+                    return
+        finally:
+            # Client gone or stream failed: unblock the drain thread so it can stop
+            stop.set()
+            while not chunks.empty():
+                chunks.get_nowait()
+
+    async def _call(self, writer: asyncio.StreamWriter, op: str, args: list, kwargs: dict):
+        if op == 'iter_transactions_for_account':
+            return await self._stream(writer, self.backend.iter_transactions_for_account(*args, **kwargs))
+        if op == 'record_transaction' and self.submit is not None:
+            result = await asyncio.wrap_future(self.submit(*args, **kwargs))
+        else:
+            result = await self._run(getattr(self.backend, op), *args, **kwargs)
+        await self._reply(writer, {'ok': True, 'result': result})
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            hello = await _read_hello(reader)
+            token = str(hello.get('hello', '')) if isinstance(hello, dict) else ''
+            if not hmac.compare_digest(token.encode('utf-8'), config.STORE_SERVER_TOKEN.encode('utf-8')):
+                await self._reply(writer, {'ok': False, 'error': 'PermissionError', 'message': 'Invalid store server token'})
+                return
+            await self._reply(writer, {'ok': True})
+            while True:
+                msg = await _read_message(reader, config.STORE_SERVER_MAX_MESSAGE_MB * 1024 * 1024)
+                if not isinstance(msg, dict):
+                    raise ProtocolError('request is not an object')
+                op = msg.get('op')
+                try:
+                    _check_op(op, msg.get('args', []), msg.get('kwargs', {}))
+                    await self._call(writer, op, msg.get('args', []), msg.get('kwargs', {}))
+                except Exception as e:
+                    await self._reply(writer, {'ok': False, 'error': type(e).__name__, 'message': str(e)})
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass  # client went away, or broke the protocol limits (ProtocolError)
+        except asyncio.TimeoutError:
+            pass  # handshake or request not received in time
+        finally:
+            writer.close()
+
+    async def serve(self, address: str):
+        family, addr = parse_address(address)
+        if family == socket.AF_UNIX:
+            if os.path.exists(addr):
+                os.remove(addr)  # left by a previous run
+            server = await asyncio.start_unix_server(self.handle, path=addr)
+        else:
+            server = await asyncio.start_server(self.handle, host=addr[0], port=addr[1])
+        print(f'store server ({self.backend.__name__}) listening on {address}', flush=True)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Serve the store API to BANKING_STORE_BACKEND=remote workers')
+    ap.add_argument('--address', default=config.STORE_SERVER_ADDRESS, help="'host:port' or 'unix:/path/to.sock'")
+    ap.add_argument('--backend', default=config.STORE_SERVER_BACKEND, help='backend that owns the data (csv or sqlite)')
+    ap.add_argument('--threads', type=int, default=config.STORE_SERVER_THREADS, help='threads running store calls')
+    args = ap.parse_args(argv)
+
+    if args.backend == 'remote':
+        ap.error('the server needs a local backend (csv or sqlite)')
+    family, addr = parse_address(args.address)
+    if family == socket.AF_INET and not _is_loopback(addr[0]) and not config.STORE_SERVER_TOKEN:
+        ap.error('listening beyond localhost requires BANKING_STORE_SERVER_TOKEN')
+    backend = store.load_backend(args.backend)
+    backend.ensure_data_files()
+    try:
+        asyncio.run(StoreServer(backend, args.threads).serve(args.address))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
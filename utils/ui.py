@@ -1,4 +1,5 @@
 import streamlit as st
+from utils import posting_queue
 
 
 def require_login():
@@ -11,4 +12,52 @@ def logout_button():
     if st.button('Logout'):
         st.session_state['user'] = None
         st.success('Logged out')
-        st.rerun()
\ No newline at end of file
+        st.rerun()
+
+def paged(fetch, key: str, page_size: int = 50):
+    # fetch(page, page_size) -> (df, total). Renders a page selector when there is
+    # more than one page and returns the current page's (df, total).
+    page = int(st.session_state.get(key, 1))
+    df, total = fetch(page, page_size)
+    pages = max(1, -(-total // page_size))
+    if page > pages:
+        st.session_state[key] = pages
+        df, total = fetch(pages, page_size)
+    if pages > 1:
+        st.number_input(f'Page (of {pages}, {total} rows)', min_value=1, max_value=pages, step=1, key=key)
+    return df, total
+
+
+def account_picker(search, format_func, key: str = 'account', limit: int = 20):
+    # Search-as-you-type on the account_no index instead of one selectbox over
+    # every account. search(prefix, limit) -> (matches, total). Returns the chosen
+    # account as a dict, or None.
+    prefix = st.text_input('Search account no', key=f'{key}_search', placeholder='e.g. BA-2025-00')
+    matches, total = search(prefix, limit)
+    if matches.empty:
+        st.info('No matching accounts.')
+        return None
+    rows = matches.to_dict('records')
+    i = st.selectbox('Select account', options=range(len(rows)), format_func=lambda i: format_func(rows[i]), key=f'{key}_pick')
+    if total > len(rows):
+        st.caption(f'Showing {len(rows)} of {total} matches. Type more of the account number to narrow the list.')
+    return rows[min(i or 0, len(rows) - 1)]
+
+
+def posting_status(key: str, done_message, failed_prefix: str):
+    # Shows the outcome of the posting ticket kept in st.session_state[key]
+    # (see utils/posting_queue.py). Waits briefly so a quick posting reports on
+    # the same run; otherwise offers a refresh to poll again.
+    ticket = st.session_state.get(key)
+    if not ticket:
+        return
+    s = posting_queue.wait(ticket, timeout=0.25)
+    if s['state'] in ('queued', 'running'):
+        st.info(f"Posting {s['state']} (ticket {ticket}). It will be applied shortly.")
+        st.button('Refresh status', key=f'{key}_refresh')
+        return
+    st.session_state[key] = None
+    if s['state'] == 'done':
+        st.success(done_message(s['txn']))
+    elif s['state'] == 'failed':
+        st.error(f"{failed_prefix}: {s['error']}")